@@ -0,0 +1,383 @@
+import io
+import os
+import mmap
+import struct
+import hashlib
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, QEvent, Signal
+
+# =========================
+# ASSET PACK
+# =========================
+# Imagens e áudios do projeto ficam dentro de um arquivo só, do lado do
+# projeto (board.infinityu -> board.assets), endereçados pelo hash do
+# conteúdo. A mesma imagem posta duas vezes entra uma vez; mover ou apagar
+# o arquivo original não quebra o board.
+#
+#   cabeçalho: b"IFA\0" + versão (u16)
+#   registro:  b"ASET" + digest (16 bytes) + tamanho (u64) + bytes do arquivo
+#
+# Só anexa no fim. Abrir lê só os cabeçalhos dos registros (pula os dados
+# com seek), então um pack de 2 GB abre lendo alguns KB. Os dados são lidos
+# sob demanda pelo mmap (view/reader, o cache de páginas do SO é o mesmo
+# pra todo mundo) ou, pras imagens, pelo QImageReader direto num QFile
+# posicionado no registro (ver image_loader.py): o PySide6 não embrulha um
+# buffer Python num QByteArray sem copiar.
+#
+# No card o conteúdo vira "asset:<digest>/<nome original>"; caminho comum
+# continua funcionando (projeto sem pack, arquivo que não deu pra importar).
+#
+# Importar (hash do arquivo inteiro, cópia, fsync) roda no AssetImporter,
+# fora da thread da interface: o card nasce com o caminho e troca pra ref
+# quando o import termina. Leitura (view/reader/locate) é de qualquer
+# thread; escrita é uma de cada vez.
+
+MAGIC = b"IFA\0"
+FORMAT_VERSION = 1
+PACK_EXTENSION = ".assets"
+ASSET_SCHEME = "asset:"
+
+_HEADER = struct.Struct("<4sH")
+_RECORD = struct.Struct("<4s16sQ")
+
+COPY_CHUNK = 1024 * 1024
+
+
+def pack_path_for(project_path):
+    return os.path.splitext(project_path)[0] + PACK_EXTENSION
+
+
+def make_ref(digest, name):
+    return f"{ASSET_SCHEME}{digest}/{name}"
+
+
+def split_ref(content):
+    # (digest, nome) ou None se for caminho comum
+    if not content or not content.startswith(ASSET_SCHEME):
+        return None
+    digest, _, name = content[len(ASSET_SCHEME):].partition("/")
+    return digest, name
+
+
+def asset_key(content):
+    # mesma chave pra mesma imagem, com qualquer nome (cache do image_loader)
+    ref = split_ref(content)
+    return content if ref is None else ASSET_SCHEME + ref[0]
+
+
+def hash_file(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(COPY_CHUNK)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class AssetPackError(Exception):
+    pass
+
+
+class _BlobReader(io.RawIOBase):
+    # arquivo só leitura em cima de um pedaço do mmap (wave.open etc.)
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        buffer[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        self._pos = max(0, offset)
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        self._view = memoryview(b"")
+        super().close()
+
+
+class AssetPack:
+    def __init__(self, path):
+        self.path = path
+        self._entries = {}   # digest -> (offset dos dados, tamanho)
+        self._size = 0       # bytes válidos do arquivo
+        self._map = None     # mmap de [0, _mapped)
+        self._mapped = 0
+        # _map/_mapped/_size/_entries mudam sob _lock (leitores em várias
+        # threads); _append inteiro sob _write_lock
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # pack de onde este ainda está copiando (salvar como em outra
+        # pasta): o que não está aqui é lido de lá enquanto isso
+        self.fallback = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, digest):
+        return digest in self._entries
+
+    def _owner(self, digest):
+        if digest in self._entries or self.fallback is None:
+            return self
+        return self.fallback._owner(digest)
+
+    def open(self):
+        # lê só os cabeçalhos. Se não existe, o arquivo só é criado no
+        # primeiro asset (projeto só com texto não ganha um .assets vazio)
+        if not os.path.exists(self.path):
+            return self
+
+        entries = {}
+        with open(self.path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise AssetPackError("pack de assets vazio ou cortado")
+            magic, version = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise AssetPackError("não é um pack de assets do infinityu")
+            if version > FORMAT_VERSION:
+                raise AssetPackError(f"versão {version} do pack não suportada")
+
+            end = os.fstat(f.fileno()).st_size
+            pos = _HEADER.size
+            while pos + _RECORD.size <= end:
+                f.seek(pos)
+                kind, digest, size = _RECORD.unpack(f.read(_RECORD.size))
+                if kind != b"ASET" or pos + _RECORD.size + size > end:
+                    break
+                entries[digest.hex()] = (pos + _RECORD.size, size)
+                pos += _RECORD.size + size
+
+        # registro pela metade no fim (caiu no meio de um import): corta
+        if pos < end:
+            with open(self.path, "r+b") as f:
+                f.truncate(pos)
+        self._entries = entries
+        self._size = pos
+        return self
+
+    def close(self):
+        # views que ainda estão por aí seguram o mmap antigo até soltarem;
+        # uma leitura depois disso mapeia de novo
+        with self._lock:
+            self._map = None
+            self._mapped = 0
+
+    # --- escrita (thread da interface) ---
+
+    def add_file(self, path):
+        # -> digest; se o conteúdo já está no pack não escreve nada
+        digest = hash_file(path)
+        if digest in self._entries:
+            return digest
+        with open(path, "rb") as src:
+            self._append(digest, os.fstat(src.fileno()).st_size, iter(lambda: src.read(COPY_CHUNK), b""))
+        return digest
+
+    def add_from(self, other, digest):
+        # copia um asset de outro pack (salvar como em outra pasta)
+        if digest in self._entries:
+            return digest
+        view = other.view(digest)
+        if view is None:
+            return None
+        self._append(digest, len(view), (view[i:i + COPY_CHUNK] for i in range(0, len(view), COPY_CHUNK)))
+        return digest
+
+    def _append(self, digest, size, blocks):
+        with self._write_lock:
+            if digest not in self._entries:
+                self._append_locked(digest, size, blocks)
+
+    def _append_locked(self, digest, size, blocks):
+        if self._size == 0:
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, FORMAT_VERSION))
+            self._size = _HEADER.size
+        start = self._size
+        with open(self.path, "r+b") as f:
+            f.seek(start)
+            f.write(_RECORD.pack(b"ASET", bytes.fromhex(digest), size))
+            written = 0
+            for block in blocks:
+                f.write(block)
+                written += len(block)
+            if written != size:
+                # arquivo mudou enquanto copiava
+                f.truncate(start)
+                raise AssetPackError("o arquivo mudou durante a importação")
+            f.flush()
+            os.fsync(f.fileno())
+        # só aparece pros leitores depois de escrito e no disco
+        with self._lock:
+            self._entries[digest] = (start + _RECORD.size, size)
+            self._size = start + _RECORD.size + size
+
+    # --- leitura (qualquer thread) ---
+
+    def locate(self, digest):
+        # (arquivo, offset, tamanho) dos bytes, ou None
+        owner = self._owner(digest)
+        entry = owner._entries.get(digest)
+        return None if entry is None else (owner.path, entry[0], entry[1])
+
+    def view(self, digest):
+        # memoryview dos bytes, sem copiar (None se não tem)
+        owner = self._owner(digest)
+        if owner is not self:
+            return owner.view(digest)
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        offset, size = entry
+        if size == 0:
+            return memoryview(b"")
+        # close() em outra thread pode zerar _map a qualquer hora: lê uma
+        # vez só, sob o lock
+        with self._lock:
+            m = self._map
+            if m is None or offset + size > self._mapped:
+                m = self._remap()
+        return memoryview(m)[offset:offset + size]
+
+    def reader(self, digest):
+        view = self.view(digest)
+        return None if view is None else _BlobReader(view)
+
+    def _remap(self):
+        # o pack cresceu: mapeia de novo (o mmap antigo fica vivo enquanto
+        # alguma view dele existir). Chamado com _lock
+        with open(self.path, "rb") as f:
+            m = mmap.mmap(f.fileno(), self._size, access=mmap.ACCESS_READ)
+        self._map = m
+        self._mapped = self._size
+        return m
+
+
+def needs_import(pack, content):
+    # caminho solto, ou ref que ainda não está neste pack
+    if not content:
+        return False
+    ref = split_ref(content)
+    return ref is None or ref[0] not in pack
+
+
+def import_content(pack, content, source=None):
+    # conteúdo de card de imagem/áudio -> ref no pack. Caminho que não dá
+    # pra ler fica como está; ref de outro pack (salvar como) é copiada.
+    # Lento (hash + cópia + fsync): roda no AssetImporter
+    if not content:
+        return content
+    ref = split_ref(content)
+    if ref is not None:
+        if ref[0] not in pack and source is not None and source is not pack:
+            pack.add_from(source, ref[0])
+        return content
+    try:
+        digest = pack.add_file(content)
+    except (OSError, AssetPackError) as e:
+        print(f"não deu pra guardar {content} no projeto: {e}")
+        return content
+    return make_ref(digest, os.path.basename(content))
+
+
+_pack = None
+
+def asset_pack():
+    # pack do projeto aberto (None = projeto ainda sem arquivo)
+    return _pack
+
+
+def set_asset_pack(pack):
+    global _pack
+    if _pack is not None and _pack is not pack:
+        _pack.close()
+    _pack = pack
+
+
+class _ImportJob(QRunnable):
+    def __init__(self, importer, pack, content, source):
+        super().__init__()
+        self.importer = importer
+        self.pack = pack
+        self.content = content
+        self.source = source
+
+    def run(self):
+        result = self.content
+        try:
+            result = import_content(self.pack, self.content, self.source)
+        except Exception as e:
+            print(f"não deu pra guardar {self.content} no projeto: {e!r}")
+        finally:
+            # sempre volta, senão o conteúdo fica pendente pra sempre
+            self.importer._finished.emit(self.pack, self.content, result)
+
+
+class AssetImporter(QObject):
+    # (pack, conteúdo de antes, conteúdo novo) na thread da interface.
+    # Conteúdo novo igual ao de antes = não deu pra importar
+    imported = Signal(object, str, str)
+    _finished = Signal(object, str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # uma thread: escrita no pack é sequencial mesmo, e o disco não
+        # ganha nada com duas cópias grandes ao mesmo tempo
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._pending = set()
+        self._finished.connect(self._on_finished)
+
+    def request(self, pack, content, source=None):
+        key = (pack.path, content)
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        self.pool.start(_ImportJob(self, pack, content, source))
+
+    def pending(self):
+        return len(self._pending)
+
+    def wait(self):
+        # termina os imports e já entrega as trocas (fechar, abrir outro
+        # projeto): o sinal ainda está na fila da thread da interface
+        self.pool.waitForDone()
+        QCoreApplication.sendPostedEvents(self, QEvent.MetaCall)
+
+    def _on_finished(self, pack, content, result):
+        self._pending.discard((pack.path, content))
+        self.imported.emit(pack, content, result)
+
+
+_importer = None
+
+def asset_importer():
+    global _importer
+    if _importer is None:
+        _importer = AssetImporter()
+    return _importer
@@ -0,0 +1,193 @@
+import time
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+# =========================
+# AUTOSAVE
+# =========================
+# Salvar não pode travar o canvas. Na thread da interface só acontece o
+# snapshot do store (CardStore.snapshot: cópia das colunas, ~2 ms com 100k
+# cards) mais o texto que ainda está sendo digitado; codificar e escrever
+# (ProjectWriter.save, com fsync) roda num QRunnable.
+#
+# Edições em sequência (digitar, arrastar) empurram o save pra frente até
+# AUTOSAVE_DELAY_MS sem mexer, mas nunca mais que AUTOSAVE_MAX_WAIT_MS
+# depois da primeira. Só um save por vez: se pedir outro no meio, ele sai
+# quando o atual terminar, já com tudo que mudou até lá.
+#
+# O arquivo em si é seguro contra queda no meio: a compactação escreve num
+# .tmp, fsync e rename; o save incremental só anexa e vale a partir do
+# COMT (ver project_file.py).
+
+AUTOSAVE_DELAY_MS = 2000
+AUTOSAVE_MAX_WAIT_MS = 15000
+
+
+class _SaveJob(QRunnable):
+    def __init__(self, saver, writer, snapshot, meta):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.saver = saver
+        self.writer = writer
+        self.snapshot = snapshot
+        self.meta = meta
+        self.written = 0
+        self.error = None
+        self.seconds = 0.0
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            self.written = self.writer.save(self.snapshot, self.meta)
+        except Exception as e:
+            # disco cheio, mas também bug no encode (struct.error etc.):
+            # qualquer erro que morresse aqui virava save que deu certo.
+            # O arquivo pode ter ficado pela metade: o próximo é completo
+            self.error = e
+            self.writer.synced = False
+        finally:
+            self.seconds = time.perf_counter() - t0
+            self.saver._finished.emit(self)
+
+
+class Autosaver(QObject):
+    # (bytes escritos, latência em ms) depois de cada save que deu certo
+    saved = Signal(int, float)
+    _finished = Signal(object)
+
+    def __init__(self, scene, meta, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.meta = meta            # função -> dict do META (câmera etc.)
+        self.writer = None          # ProjectWriter; None = projeto sem arquivo
+        self.enabled = True
+
+        # uma thread só: saves saem na ordem em que foram pedidos
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timer)
+        self._first_edit = None
+        self._last_edit = 0.0
+        self._job = None
+        self._again = False
+
+        self._finished.connect(self._on_finished)
+        scene.store.on_dirty = self.mark
+        scene.on_edit = self.mark
+
+        self.saves = 0
+        self.failures = 0
+        self.last_bytes = 0
+        self.last_ms = 0.0
+        self.last_snapshot_ms = 0.0
+        self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "saves": self.saves,
+            "failures": self.failures,
+            "last_bytes": self.last_bytes,
+            "last_ms": round(self.last_ms, 2),
+            "last_snapshot_ms": round(self.last_snapshot_ms, 2),
+            "total_bytes": self.total_bytes,
+        }
+
+    def set_writer(self, writer):
+        # trocar de arquivo. Quem chama decide se o antigo precisa de flush()
+        # antes; o que estiver agendado aqui é descartado (abrir projeto
+        # troca o store inteiro antes de chegar aqui)
+        self.wait()
+        self._timer.stop()
+        self._first_edit = None
+        self._again = False
+        self.writer = writer
+
+    # --- agendar ---
+
+    def mark(self):
+        # chamado a cada edição, às vezes milhares por frame (arrastar
+        # seleção grande): só anota a hora, o timer confere quando disparar
+        if self.writer is None or not self.enabled:
+            return
+        now = time.monotonic()
+        self._last_edit = now
+        if self._first_edit is None:
+            self._first_edit = now
+            self._timer.start(AUTOSAVE_DELAY_MS)
+
+    def _on_timer(self):
+        now = time.monotonic()
+        quiet = (now - self._last_edit) * 1000
+        waited = (now - self._first_edit) * 1000
+        if quiet < AUTOSAVE_DELAY_MS and waited < AUTOSAVE_MAX_WAIT_MS:
+            # ainda mexendo: espera mais um pouco
+            self._timer.start(int(min(AUTOSAVE_DELAY_MS - quiet, AUTOSAVE_MAX_WAIT_MS - waited)) + 1)
+            return
+        self.save_now()
+
+    def pending(self):
+        return self._first_edit is not None or self._job is not None
+
+    # --- salvar ---
+
+    def save_now(self):
+        self._timer.stop()
+        if self.writer is None:
+            return
+        if self._job is not None:
+            self._again = True
+            return
+        self._first_edit = None
+
+        t0 = time.perf_counter()
+        snapshot = self.scene.store.snapshot()
+        # texto em edição vai só pro snapshot: no store ele entra quando a
+        # edição termina (e vira um registro no histórico)
+        for card_id, content in self.scene.unsaved_edits().items():
+            snapshot.set_content(card_id, content)
+        self.last_snapshot_ms = (time.perf_counter() - t0) * 1000
+
+        self._job = _SaveJob(self, self.writer, snapshot, self.meta())
+        self.pool.start(self._job)
+
+    def wait(self):
+        # bloqueia até o save em andamento terminar (trocar de arquivo, sair)
+        while self._job is not None:
+            self.pool.waitForDone()
+            # o sinal ainda está na fila da thread da interface; e o
+            # _on_finished pode soltar o save que estava esperando a vez
+            self._on_finished(self._job)
+
+    def flush(self):
+        # salva o que falta e espera (fechar o app)
+        self.wait()
+        if self.writer is not None and (self._first_edit is not None or self._again):
+            self._again = False
+            self.save_now()
+            self.wait()
+
+    def _on_finished(self, job):
+        if job is not self._job:
+            return
+        self._job = None
+
+        if job.error is not None:
+            self.failures += 1
+            print(f"não deu pra salvar {job.writer.path}: {job.error!r}")
+            if job.writer is self.writer:
+                # o que estava sujo no snapshot volta pro store e o save
+                # é tentado de novo depois do debounce
+                self.scene.store.restore_dirty(job.snapshot)
+        else:
+            self.saves += 1
+            self.last_bytes = job.written
+            self.last_ms = job.seconds * 1000
+            self.total_bytes += job.written
+            self.saved.emit(job.written, self.last_ms)
+
+        if self._again:
+            self._again = False
+            self.save_now()
@@ -0,0 +1,134 @@
+# Benchmark do autosave (autosave.py): monta um board com N cards de texto,
+# deixa um TextCard em edição e digita sem parar enquanto o autosave salva
+# em outra thread. Mede o snapshot na thread da interface, quanto o save
+# levou e escreveu, e o maior buraco no event loop durante a digitação
+# (comparado com digitar sem save nenhum rodando).
+#
+#   python benchmarks/bench_autosave.py
+#   python benchmarks/bench_autosave.py --cards 100000 --edits 5000
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QPointF, QTimer
+from PySide6.QtWidgets import QApplication
+
+import autosave
+from main import CanvasView, CardType
+from project_file import ProjectWriter
+
+WORDS = ("ideia", "lista", "tarefa", "nota", "rever", "reunião", "prazo", "rascunho")
+SPACING_X = 240
+SPACING_Y = 165
+# digitando por quanto tempo em cada rodada (s)
+TYPING_SECONDS = 0.6
+# pra contar um frame travado
+HITCH_MS = 16.0
+
+
+def settle(app, seconds):
+    # deixa indexação, margem do viewport etc. terminarem
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents()
+
+
+def type_while(app, view, card, save):
+    # digita uma letra por volta do event loop; um timer de 1 ms mede o
+    # intervalo entre voltas
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append((now - last[0]) * 1000)
+        last[0] = now
+
+    timer = QTimer()
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.timeout.connect(tick)
+    timer.start(1)
+
+    saver = view.autosave
+    if save:
+        saver.save_now()
+    deadline = time.perf_counter() + TYPING_SECONDS
+    while time.perf_counter() < deadline or saver._job is not None:
+        card.text_item.textCursor().insertText("x")
+        app.processEvents()
+    timer.stop()
+
+    gaps.sort()
+    return {
+        "max_gap_ms": gaps[-1] if gaps else 0.0,
+        "p99_gap_ms": gaps[int(len(gaps) * 0.99)] if gaps else 0.0,
+        "hitches": sum(1 for g in gaps if g > HITCH_MS),
+    }
+
+
+def row(name, result, stats=None):
+    line = (f"{name:<22} gap máx {result['max_gap_ms']:6.1f} ms   p99 {result['p99_gap_ms']:6.1f} ms"
+            f"   >{HITCH_MS:.0f} ms: {result['hitches']}")
+    if stats is not None:
+        line += (f"   snapshot {stats['last_snapshot_ms']:5.2f} ms   save {stats['last_ms']:7.1f} ms"
+                 f"   {stats['last_bytes'] / 1024:8.1f} KB")
+    print(line)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=50_000)
+    parser.add_argument("--edits", type=int, default=2000, help="cards movidos antes do save incremental")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(args.seed)
+    # o benchmark chama save_now na hora certa
+    autosave.AUTOSAVE_DELAY_MS = autosave.AUTOSAVE_MAX_WAIT_MS = 10 ** 8
+
+    view = CanvasView()
+    view.resize(1600, 900)
+    view.show()
+    app.processEvents()
+
+    n = args.cards
+    columns = max(1, int(n ** 0.5 * 1.6))
+    view.scene.create_cards([
+        (QPointF((i % columns) * SPACING_X, (i // columns) * SPACING_Y), CardType.TEXT,
+         f"card {i}\n" + " ".join(rng.choice(WORDS) for _ in range(12)))
+        for i in range(n)
+    ])
+    settle(app, 2.0)
+
+    folder = tempfile.mkdtemp(prefix="bench_autosave_")
+    view.project_path = os.path.join(folder, "board.infinityu")
+    view.autosave.set_writer(ProjectWriter(view.project_path))
+
+    card = view.scene.live[min(view.scene.live)]
+    card.text_item.setFocus()
+    settle(app, 0.2)
+
+    print(f"{n} cards, digitando num TextCard enquanto salva")
+    row("sem save", type_while(app, view, card, False))
+    row("save completo", type_while(app, view, card, True), view.autosave.stats())
+
+    ids = view.scene.store.ids()
+    for card_id in rng.sample(ids, min(args.edits, len(ids))):
+        view.scene.store.move(card_id, view.scene.store.xs[card_id] + 20, view.scene.store.ys[card_id])
+    settle(app, 0.3)
+    row(f"incremental ({args.edits})", type_while(app, view, card, True), view.autosave.stats())
+
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,599 @@
+# Benchmark do canvas inteiro: monta CanvasView + CanvasScene com N cards
+# sintéticos (texto, imagem e áudio) e repete roteiros de pan, zoom, drag e
+# duplo clique passando pelos handlers de verdade (wheelEvent,
+# mouseMoveEvent, gestureEvent, itemChange). Cada passo do roteiro é um
+# frame; por frame mede o tempo total, o drawBackground, o paint dos cards,
+# quanto do viewport foi repintado e o que o idle_scheduler rodou (fora do
+# tempo do frame).
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_canvas.py
+#   python benchmarks/bench_canvas.py --cards 20000 --out resultado.json
+#   python benchmarks/bench_canvas.py --save-baseline   # grava o baseline
+#   python benchmarks/bench_canvas.py --backends raster,opengl-software
+#
+# Sem --save-baseline o resultado é comparado com benchmarks/baseline_canvas.json
+# e o script sai com código 1 se algum cenário piorou mais que o limite.
+#
+import gc
+import os
+import sys
+import json
+import time
+import wave
+import struct
+import random
+import platform
+import tempfile
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import PySide6
+from PySide6.QtCore import Qt, QEvent, QPoint, QPointF
+from PySide6.QtGui import QColor, QImage, QMouseEvent, QWheelEvent
+from PySide6.QtWidgets import QApplication, QGestureEvent, QPanGesture, QPinchGesture
+
+import main
+import image_loader
+import waveform
+from viewport_backend import BACKENDS, prepare_application
+from paint_cache import card_cache
+from idle_scheduler import idle_scheduler, IdleScheduler
+from main import CanvasView, CanvasScene, CanvasCard, CardTextItem, CardPixmapItem, CardType, CARD_CLASSES
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline_canvas.json")
+
+# quanto pode piorar (fração) antes de contar como regressão, e abaixo de
+# quantos ms a diferença é ruído
+THRESHOLD = 0.25
+MIN_DELTA_MS = 1.0
+COMPARED = ("frame_ms", "background_ms", "cards_ms")
+# fração do viewport repintada: abaixo disso a diferença não conta
+MIN_DELTA_DAMAGE = 0.05
+# o idle roda entre frames e sai do frame_ms, então é checado à parte: uma
+# volta do idle_scheduler maior que um frame inteiro é regressão sempre, e
+# estouros do budget contam se subirem mais que o limite e que MIN_DELTA_OVERRUNS
+MAX_TICK_MS = 16.0
+MIN_DELTA_OVERRUNS = 5
+
+# proporção de cada tipo nos cards sintéticos
+CARD_MIX = ((CardType.TEXT, 0.6), (CardType.IMAGE, 0.25), (CardType.AUDIO, 0.15))
+SPACING_X = 240
+SPACING_Y = 165
+
+
+# =========================
+# MEDIÇÃO
+# =========================
+class FrameProbe:
+    # embrulha os paints pra somar quanto cada parte levou no frame atual
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.background = 0.0
+        self.cards = 0.0
+        self.idle = 0.0
+        self.painted = 0
+
+    def _wrap(self, cls, name, bucket, count=False):
+        original = getattr(cls, name)
+        probe = self
+
+        def wrapper(*args):
+            t0 = time.perf_counter()
+            try:
+                return original(*args)
+            finally:
+                dt = time.perf_counter() - t0
+                setattr(probe, bucket, getattr(probe, bucket) + dt)
+                if count:
+                    probe.painted += 1
+
+        setattr(cls, name, wrapper)
+
+    def install(self):
+        self._wrap(CanvasScene, "drawBackground", "background")
+        # paint dos filhos conta junto com o card
+        self._wrap(CardTextItem, "paint", "cards")
+        self._wrap(CardPixmapItem, "paint", "cards")
+        for cls in {CanvasCard, *CARD_CLASSES.values()}:
+            if "paint" in cls.__dict__:
+                self._wrap(cls, "paint", "cards", count=True)
+        # trabalho do idle_scheduler: no app ele roda no intervalo entre
+        # frames; aqui os frames vêm colados, então sai do tempo do frame
+        # e vira coluna própria
+        self._wrap(IdleScheduler, "_tick", "idle")
+
+
+def percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    s = sorted(values)
+
+    def at(p):
+        return s[min(len(s) - 1, int(round(p * (len(s) - 1))))]
+
+    return {
+        "p50": round(at(0.50), 4),
+        "p95": round(at(0.95), 4),
+        "p99": round(at(0.99), 4),
+        "max": round(s[-1], 4),
+        "mean": round(sum(s) / len(s), 4),
+    }
+
+
+# =========================
+# CONTEÚDO SINTÉTICO
+# =========================
+def make_assets(folder, images=8, sounds=3):
+    rng = random.Random(1)
+    image_paths = []
+    for i in range(images):
+        image = QImage(1600, 1000, QImage.Format_RGB32)
+        image.fill(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        path = os.path.join(folder, f"img{i}.png")
+        image.save(path)
+        image_paths.append(path)
+
+    sound_paths = []
+    for i in range(sounds):
+        path = os.path.join(folder, f"snd{i}.wav")
+        rate = 22050
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(rate)
+            frames = bytearray()
+            for n in range(rate * 20):
+                frames += struct.pack("<h", int(12000 * ((n * (i + 3)) % 200 - 100) / 100))
+            w.writeframes(bytes(frames))
+        sound_paths.append(path)
+
+    return image_paths, sound_paths
+
+
+def populate(scene, count, image_paths, sound_paths):
+    rng = random.Random(2)
+    kinds = [t for t, _ in CARD_MIX]
+    weights = [w for _, w in CARD_MIX]
+    columns = max(1, int(count ** 0.5 * 1.6))
+    left = -(columns // 2) * SPACING_X
+    top = -(count // columns // 2) * SPACING_Y
+
+    records = []
+    for i in range(count):
+        card_type = rng.choices(kinds, weights)[0]
+        if card_type == CardType.TEXT:
+            content = f"card {i}\n" + " ".join(rng.choice(("ideia", "lista", "tarefa", "nota", "rever")) for _ in range(8))
+        elif card_type == CardType.IMAGE:
+            content = rng.choice(image_paths)
+        else:
+            content = rng.choice(sound_paths)
+        x = left + (i % columns) * SPACING_X
+        y = top + (i // columns) * SPACING_Y
+        records.append((QPointF(x, y), card_type, content))
+
+    scene.create_cards(records)
+
+
+def wait_loaders(app, timeout=60.0):
+    # espera as imagens e ondas que estão decodificando nas threads
+    images = image_loader.image_loader()
+    waves = waveform.waveform_loader()
+    deadline = time.perf_counter() + timeout
+    while (images._pending or waves._waiters) and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+    app.processEvents()
+
+
+# =========================
+# EVENTOS
+# =========================
+def mouse(kind, pos, button, buttons):
+    pos = QPointF(pos)
+    return QMouseEvent(kind, pos, pos, button, buttons, Qt.NoModifier)
+
+
+def wheel(pos, steps):
+    pos = QPointF(pos)
+    return QWheelEvent(pos, pos, QPoint(0, 0), QPoint(0, 120 * steps), Qt.NoButton,
+                       Qt.NoModifier, Qt.NoScrollPhase, False)
+
+
+def pan_gesture(dx, dy):
+    gesture = QPanGesture()
+    gesture.setLastOffset(QPointF(0, 0))
+    gesture.setOffset(QPointF(dx, dy))
+    return QGestureEvent([gesture]), gesture
+
+
+def pinch_gesture(scale, center):
+    gesture = QPinchGesture()
+    gesture.setScaleFactor(scale)
+    gesture.setCenterPoint(QPointF(center))
+    return QGestureEvent([gesture]), gesture
+
+
+# =========================
+# ROTEIROS
+# =========================
+# cada roteiro é um gerador: cada yield = um frame
+
+def scenario_pan_mouse(view, frames):
+    center = view.viewport().rect().center()
+    view.mousePressEvent(mouse(QEvent.MouseButtonPress, center, Qt.MiddleButton, Qt.MiddleButton))
+    pos = QPointF(center)
+    for i in range(frames):
+        # vai e volta pra ficar na mesma região
+        step = QPointF(-18, -7) if (i // 40) % 2 == 0 else QPointF(18, 7)
+        pos += step
+        view.mouseMoveEvent(mouse(QEvent.MouseMove, pos, Qt.NoButton, Qt.MiddleButton))
+        yield
+    view.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, pos, Qt.MiddleButton, Qt.NoButton))
+
+
+def scenario_pan_trackpad(view, frames):
+    for i in range(frames):
+        dx = 25 if (i // 30) % 2 == 0 else -25
+        event, _gesture = pan_gesture(dx, 9)
+        view.gestureEvent(event)
+        yield
+
+
+def scenario_pan_burst(view, frames):
+    # trackpad de alta frequência: vários eventos chegam dentro de um frame
+    for i in range(frames):
+        dx = 6 if (i // 30) % 2 == 0 else -6
+        for _ in range(4):
+            event, _gesture = pan_gesture(dx, 2)
+            view.gestureEvent(event)
+        yield
+
+
+def scenario_zoom_wheel(view, frames):
+    center = view.viewport().rect().center()
+    for i in range(frames):
+        # in/out até os limites do wheel
+        steps = 1 if (i // 12) % 2 == 0 else -1
+        view.wheelEvent(wheel(center, steps))
+        yield
+
+
+def scenario_zoom_pinch(view, frames):
+    center = view.mapToGlobal(view.viewport().rect().center())
+    for i in range(frames):
+        scale = 0.93 if (i // 20) % 2 == 0 else 1 / 0.93
+        event, _gesture = pinch_gesture(scale, center)
+        view.gestureEvent(event)
+        yield
+
+
+def scenario_drag(view, frames):
+    scene = view.scene
+    # pega o card mais perto do centro (o movimento passa pelo itemChange)
+    center = view.camera.center
+    card = min(scene.live.values(), key=lambda c: (c.pos() - center).manhattanLength())
+    grab = card.mapToScene(QPointF(main.CARD_WIDTH / 2, main.CARD_HEIGHT - 12))
+    pos = QPointF(view.mapFromScene(grab))
+
+    view.mousePressEvent(mouse(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton))
+    for i in range(frames):
+        pos += QPointF(6, 3) if (i // 25) % 2 == 0 else QPointF(-6, -3)
+        view.mouseMoveEvent(mouse(QEvent.MouseMove, pos, Qt.NoButton, Qt.LeftButton))
+        yield
+    view.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, pos, Qt.LeftButton, Qt.NoButton))
+    scene.clearSelection()
+
+
+def scenario_group_drag(view, frames):
+    # seleciona tudo que está materializado e arrasta pelo card do meio
+    scene = view.scene
+    for card in scene.live.values():
+        card.setSelected(True)
+    center = view.camera.center
+    card = min(scene.live.values(), key=lambda c: (c.pos() - center).manhattanLength())
+    grab = card.mapToScene(QPointF(main.CARD_WIDTH / 2, main.CARD_HEIGHT - 12))
+    pos = QPointF(view.mapFromScene(grab))
+
+    view.mousePressEvent(mouse(QEvent.MouseButtonPress, pos, Qt.LeftButton, Qt.LeftButton))
+    for i in range(frames):
+        pos += QPointF(6, 3) if (i // 25) % 2 == 0 else QPointF(-6, -3)
+        view.mouseMoveEvent(mouse(QEvent.MouseMove, pos, Qt.NoButton, Qt.LeftButton))
+        yield
+    view.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, pos, Qt.LeftButton, Qt.NoButton))
+    scene.clearSelection()
+
+
+def scenario_double_click(view, frames):
+    vp = view.viewport().rect()
+    rng = random.Random(3)
+    view.current_card_type = CardType.TEXT
+    for _ in range(frames):
+        pos = QPointF(rng.uniform(20, vp.width() - 20), rng.uniform(20, vp.height() - 20))
+        view.mouseDoubleClickEvent(mouse(QEvent.MouseButtonDblClick, pos, Qt.LeftButton, Qt.LeftButton))
+        yield
+
+
+SCENARIOS = {
+    "pan_mouse": (scenario_pan_mouse, 240),
+    "pan_trackpad": (scenario_pan_trackpad, 240),
+    "pan_burst": (scenario_pan_burst, 240),
+    "zoom_wheel": (scenario_zoom_wheel, 96),
+    "zoom_pinch": (scenario_zoom_pinch, 120),
+    "drag": (scenario_drag, 150),
+    "group_drag": (scenario_group_drag, 100),
+    "double_click": (scenario_double_click, 40),
+}
+
+
+def reset_view(view):
+    view.camera.stop()
+    view.camera.zoom = 1.0
+    view.camera.center_on(QPointF(0, 0))
+
+
+def run_scenario(app, view, probe, script, frames):
+    reset_view(view)
+    app.processEvents()
+
+    records = []
+    steps = script(view, frames)
+    vp = view.viewport().size()
+    full = max(1, vp.width() * vp.height())
+    while True:
+        probe.reset()
+        painted_area = view.damage.total_area
+        t0 = time.perf_counter()
+        try:
+            next(steps)
+        except StopIteration:
+            break
+        # fim do frame: o que a câmera acumulou (pan/zoom) é aplicado agora,
+        # que nem o timer de frame faria
+        view.camera.flush()
+        # o scene.update vira um UpdateRequest no viewport; os dois
+        # processEvents garantem que o paint aconteceu dentro do frame
+        app.processEvents()
+        app.processEvents()
+        frame = time.perf_counter() - t0 - probe.idle
+        records.append({
+            "frame_ms": frame * 1000,
+            "background_ms": probe.background * 1000,
+            "cards_ms": probe.cards * 1000,
+            "idle_ms": probe.idle * 1000,
+            "cards_painted": probe.painted,
+            # px repintados / px do viewport (dois paints no frame somam)
+            "damage": (view.damage.total_area - painted_area) / full,
+        })
+
+    return {
+        "frames": len(records),
+        "frame_ms": percentiles([r["frame_ms"] for r in records]),
+        "background_ms": percentiles([r["background_ms"] for r in records]),
+        "cards_ms": percentiles([r["cards_ms"] for r in records]),
+        "idle_ms": percentiles([r["idle_ms"] for r in records]),
+        "cards_painted": percentiles([r["cards_painted"] for r in records]),
+        "damage_fraction": percentiles([r["damage"] for r in records]),
+        "live_items": len(view.scene.items()),
+        "per_frame": [{k: round(v, 4) for k, v in r.items()} for r in records],
+    }
+
+
+# =========================
+# BASELINE
+# =========================
+def compare(result, baseline, threshold, min_delta):
+    # lista de (cenário, métrica, estatística, antes, agora)
+    regressions = []
+    idle, before = result["idle_scheduler"], baseline.get("idle_scheduler", {})
+    if idle["worst_tick_ms"] > MAX_TICK_MS:
+        regressions.append(("idle", "worst_tick_ms", "max", MAX_TICK_MS, idle["worst_tick_ms"]))
+    if "overruns" in before:
+        old, new = before["overruns"], idle["overruns"]
+        if new - old > MIN_DELTA_OVERRUNS and new > old * (1 + threshold):
+            regressions.append(("idle", "overruns", "total", old, new))
+    for name, current in result["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for metric in COMPARED:
+            for stat in ("p50", "p95"):
+                old = before[metric][stat]
+                new = current[metric][stat]
+                if new - old > min_delta and new > old * (1 + threshold):
+                    regressions.append((name, metric, stat, old, new))
+        # repintar mais do viewport é regressão mesmo sem o tempo acusar
+        # (aqui não tem vsync nem GPU pra pagar o upload)
+        if "damage_fraction" in before:
+            for stat in ("p50", "p95"):
+                old = before["damage_fraction"][stat]
+                new = current["damage_fraction"][stat]
+                if new - old > MIN_DELTA_DAMAGE and new > old * (1 + threshold):
+                    regressions.append((name, "damage_fraction", stat, old, new))
+    return regressions
+
+
+def print_summary(result):
+    print(f"{result['meta']['cards']} cards, viewport {result['meta']['viewport']}"
+          f" (p50 / p95 ms)")
+    print(f"{'cenário':<14} {'frame':>15} {'background':>15} {'cards':>15} {'idle':>15} {'pintados':>9} "
+          f"{'repintado':>13}")
+    for name, r in result["scenarios"].items():
+        f, b, c, i, d = r["frame_ms"], r["background_ms"], r["cards_ms"], r["idle_ms"], r["damage_fraction"]
+        print(f"{name:<14} {f['p50']:>6.2f} / {f['p95']:<6.2f} {b['p50']:>6.2f} / {b['p95']:<6.2f} "
+              f"{c['p50']:>6.2f} / {c['p95']:<6.2f} {i['p50']:>6.2f} / {i['p95']:<6.2f} "
+              f"{r['cards_painted']['p50']:>9.0f} {d['p50']:>5.0%} / {d['p95']:<5.0%}")
+
+
+def print_backend_table(results):
+    # frame p50 / p95 de cada cenário lado a lado
+    names = list(results)
+    print()
+    print(f"{'cenário':<14} " + " ".join(f"{n:>22}" for n in names))
+    for scenario in next(iter(results.values()))["scenarios"]:
+        cells = []
+        for n in names:
+            f = results[n]["scenarios"][scenario]["frame_ms"]
+            cells.append(f"{f['p50']:>9.2f} / {f['p95']:<10.2f}")
+        print(f"{scenario:<14} " + " ".join(cells))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=900)
+    parser.add_argument("--frames", type=float, default=1.0, help="multiplica os frames de cada roteiro")
+    parser.add_argument("--only", default="", help="cenários separados por vírgula")
+    parser.add_argument("--out", help="grava o resultado em JSON aqui")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--min-delta", type=float, default=MIN_DELTA_MS)
+    parser.add_argument("--per-frame", action="store_true", help="inclui os tempos de cada frame no JSON")
+    parser.add_argument("--unpaced", action="store_true", help="aplica cada evento de pan/zoom na hora (sem juntar por frame)")
+    parser.add_argument("--no-paint-cache", action="store_true", help="cards desenham direto, sem o pixmap cacheado")
+    parser.add_argument("--backends", default="raster",
+                        help=f"viewports pra rodar, separados por vírgula ({', '.join(BACKENDS)}); "
+                             "com mais de um compara em vez de checar o baseline")
+    args = parser.parse_args()
+
+    backends = [b for b in args.backends.split(",") if b]
+    for backend in backends:
+        if backend not in BACKENDS:
+            parser.error(f"backend desconhecido: {backend}")
+    # o software GL vale pro processo todo, então vai antes do QApplication
+    gl = [b for b in backends if b != "raster"]
+    if gl:
+        prepare_application("opengl-software" if "opengl-software" in gl else gl[0])
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    # caches num lugar temporário pra não sujar (nem reaproveitar) o do usuário
+    tmp = tempfile.mkdtemp(prefix="infinityu-bench-")
+    image_loader._loader = image_loader.ImageLoader(image_loader.ThumbnailCache(os.path.join(tmp, "thumbs")))
+    waveform._loader = waveform.WaveformLoader(os.path.join(tmp, "waveforms"))
+    image_paths, sound_paths = make_assets(tmp)
+
+    view = CanvasView()
+    view.camera.paced = not args.unpaced
+    card_cache().enabled = not args.no_paint_cache
+    view.resize(args.width, args.height)
+    view.show()
+
+    t0 = time.perf_counter()
+    populate(view.scene, args.cards, image_paths, sound_paths)
+    populate_ms = (time.perf_counter() - t0) * 1000
+    reset_view(view)
+    wait_loaders(app)
+    # como o app depois de montar o canvas/abrir o projeto (ver ensure_canvas)
+    gc.freeze()
+    # o que conta é o idle durante os roteiros, não o da montagem
+    idle_scheduler().run_all()
+    idle_scheduler().reset_stats()
+
+    probe = FrameProbe()
+    probe.install()
+
+    only = [s for s in args.only.split(",") if s]
+    results = {}
+    for backend in backends:
+        actual = view.set_backend(backend)
+        if actual != backend:
+            print(f"{backend}: indisponível aqui, pulando")
+            continue
+        reset_view(view)
+        app.processEvents()
+
+        result = {
+            "meta": {
+                "cards": args.cards,
+                "viewport": f"{args.width}x{args.height}",
+                "backend": backend,
+                "python": platform.python_version(),
+                "pyside": PySide6.__version__,
+                "platform": platform.platform(),
+                "qpa": os.environ.get("QT_QPA_PLATFORM"),
+                "paced": not args.unpaced,
+                "paint_cache": not args.no_paint_cache,
+                "populate_ms": round(populate_ms, 2),
+            },
+            "scenarios": {},
+        }
+
+        for name, (script, frames) in SCENARIOS.items():
+            if only and name not in only:
+                continue
+            r = run_scenario(app, view, probe, script, max(1, int(frames * args.frames)))
+            if not args.per_frame:
+                del r["per_frame"]
+            result["scenarios"][name] = r
+            wait_loaders(app)
+
+        cache = card_cache()
+        result["paint_cache"] = {
+            "hits": cache.hits, "misses": cache.misses, "evictions": cache.evictions,
+            "pixmaps": len(cache), "mb": round(cache.bytes / 2**20, 1),
+        }
+        result["idle_scheduler"] = idle_scheduler().stats()
+
+        print(f"[{backend}]")
+        print_summary(result)
+        print(f"paint cache: {result['paint_cache']}")
+        print(f"idle scheduler: {result['idle_scheduler']}")
+        results[backend] = result
+
+    if not results:
+        return 1
+
+    if len(backends) > 1:
+        print_backend_table(results)
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as f:
+                json.dump({"backends": results}, f, indent=2)
+        return 0
+
+    result = results[backends[0]]
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"baseline salvo em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("sem baseline pra comparar (rode com --save-baseline)")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("cards") != args.cards:
+        print(f"aviso: baseline foi gravado com {baseline['meta'].get('cards')} cards")
+    if baseline.get("meta", {}).get("backend", "raster") != result["meta"]["backend"]:
+        print(f"aviso: baseline foi gravado com o backend {baseline['meta'].get('backend', 'raster')}")
+
+    regressions = compare(result, baseline, args.threshold, args.min_delta)
+    if not regressions:
+        print(f"ok, nada piorou mais que {args.threshold:.0%} em relação ao baseline")
+        return 0
+
+    print("regressões:")
+    for name, metric, stat, old, new in regressions:
+        unit = " ms" if metric.endswith("_ms") else ""
+        print(f"  {name:<14} {metric:<14} {stat}  {old:.2f} -> {new:.2f}{unit}  (+{(new / max(old, 1e-9) - 1):.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    code = main_cli()
+    # sai direto: evita o Qt destruindo a cena item por item no fim
+    sys.stdout.flush()
+    os._exit(code)
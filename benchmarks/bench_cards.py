@@ -0,0 +1,106 @@
+# Benchmark de criar/apagar cards em massa: cola N cards de texto na área
+# da tela (todos viram item do Qt), apaga, repete. Mede o tempo de cada
+# lado e quantos itens novos o Qt precisou criar (o resto veio do pool).
+# Entre as rodadas deixa o idle rodar, como no app de verdade.
+#
+#   python benchmarks/bench_cards.py
+#   python benchmarks/bench_cards.py --cards 400 --rounds 20
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+import main
+from main import CanvasView, CardType, CanvasCard
+
+WORDS = ("ideia", "lista", "tarefa", "nota", "rever", "reunião", "prazo", "rascunho")
+SPACING_X = 240
+SPACING_Y = 165
+
+
+def count_constructions():
+    counter = [0]
+    init = CanvasCard.__init__
+
+    def wrapper(self, *args, **kwargs):
+        counter[0] += 1
+        init(self, *args, **kwargs)
+
+    CanvasCard.__init__ = wrapper
+    return counter
+
+
+def settle(app, seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        app.processEvents()
+        time.sleep(0.002)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--empty", type=float, default=0.3, help="fração de cards sem texto")
+    parser.add_argument("--idle", type=float, default=0.2, help="segundos de idle entre rodadas")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(args.seed)
+    made = count_constructions()
+
+    view = CanvasView()
+    view.resize(1600, 900)
+    view.show()
+    settle(app, args.idle)
+
+    # zoom pra caber os N cards na tela
+    n = args.cards
+    columns = max(1, int((n * 1.8) ** 0.5))
+    rows = -(-n // columns)
+    zoom = min(view.viewport().width() / (columns * SPACING_X), view.viewport().height() / (rows * SPACING_Y))
+    view.camera.zoom_to(max(zoom, main.TextCard.lod_flat))
+    view.camera.center_on(QPointF(columns * SPACING_X / 2, rows * SPACING_Y / 2))
+    settle(app, args.idle)
+    origin = view.scene.origin
+
+    creates, deletes, fresh = [], [], []
+    for _ in range(args.rounds):
+        records = [
+            (QPointF((i % columns) * SPACING_X, (i // columns) * SPACING_Y) - origin, CardType.TEXT,
+             None if rng.random() < args.empty else " ".join(rng.choice(WORDS) for _ in range(8)))
+            for i in range(n)
+        ]
+        before = made[0]
+        t0 = time.perf_counter()
+        ids = view.scene.create_cards(records)
+        t1 = time.perf_counter()
+        live = len(view.scene.live)
+        view.scene.delete_cards(ids)
+        t2 = time.perf_counter()
+        creates.append(t1 - t0)
+        deletes.append(t2 - t1)
+        fresh.append(made[0] - before)
+        settle(app, args.idle)
+
+    print(f"{n} cards por rodada ({live} viraram item), {args.rounds} rodadas")
+    print(f"criar   mediana {statistics.median(creates) * 1000:7.1f} ms   "
+          f"melhor {min(creates) * 1000:7.1f} ms   itens novos {statistics.mean(fresh):6.1f}/rodada")
+    print(f"apagar  mediana {statistics.median(deletes) * 1000:7.1f} ms   "
+          f"melhor {min(deletes) * 1000:7.1f} ms")
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main_cli()
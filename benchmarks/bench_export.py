@@ -0,0 +1,105 @@
+# Benchmark do export (export.py): monta um board com N cards de texto e
+# exporta em cada formato, com 1 thread de render e com todas. Mede o tempo,
+# pixels por segundo e o pico de memória do processo durante o export
+# (tem que ficar parecido com qualquer tamanho de board).
+#
+#   python benchmarks/bench_export.py
+#   python benchmarks/bench_export.py --cards 100000 --formats png
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QPointF, QThread
+from PySide6.QtWidgets import QApplication
+
+import export
+from main import CanvasView, CardType
+
+WORDS = ("ideia", "lista", "tarefa", "nota", "rever", "reunião", "prazo", "rascunho")
+SPACING_X = 240
+SPACING_Y = 165
+
+
+def rss_mb():
+    # memória residente agora (Linux); 0 onde não tem /proc
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def run(app, view, fmt, threads, folder):
+    exporter = view.exporter
+    exporter.render_pool.setMaxThreadCount(threads)
+    result = []
+    exporter.finished.connect(lambda ok, message: result.append((ok, message)))
+
+    path = os.path.join(folder, f"board_{threads}.{fmt}")
+    base = peak = rss_mb()
+    t0 = time.perf_counter()
+    exporter.start(view.scene.store, fmt, path)
+    while not result:
+        app.processEvents()
+        time.sleep(0.005)
+        peak = max(peak, rss_mb())
+    seconds = time.perf_counter() - t0
+    exporter.finished.disconnect()
+
+    ok, message = result[0]
+    return ok, message, seconds, peak - base
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=20_000)
+    parser.add_argument("--formats", default="png,pdf,pyramid")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    rng = random.Random(args.seed)
+
+    view = CanvasView()
+    view.resize(1600, 900)
+    view.show()
+    app.processEvents()
+
+    n = args.cards
+    columns = max(1, int(n ** 0.5 * 1.6))
+    view.scene.create_cards([
+        (QPointF((i % columns) * SPACING_X, (i // columns) * SPACING_Y), CardType.TEXT,
+         f"card {i}\n" + " ".join(rng.choice(WORDS) for _ in range(12)))
+        for i in range(n)
+    ])
+    app.processEvents()
+
+    rect = export.board_rect(view.scene.store)
+    folder = tempfile.mkdtemp(prefix="bench_export_")
+    counts = sorted({1, max(1, QThread.idealThreadCount() - 1)})
+    print(f"{n} cards, região {rect.width():.0f} x {rect.height():.0f}")
+
+    for fmt in args.formats.split(","):
+        scale = 1.0 if fmt == export.FORMAT_PYRAMID else export.fit_scale(rect)
+        pixels = rect.width() * rect.height() * scale * scale
+        for threads in counts:
+            ok, message, seconds, memory = run(app, view, fmt, threads, folder)
+            if not ok:
+                print(f"{fmt:<8} {threads:>2} threads   falhou: {message}")
+                continue
+            print(f"{fmt:<8} {threads:>2} threads   {seconds:7.2f} s   {pixels / seconds / 1e6:7.1f} Mpx/s"
+                  f"   pico +{memory:6.1f} MB")
+
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,80 @@
+# Compara o loop antigo de drawBackground (uma elipse por célula) com o
+# DotGrid cacheado. Roda headless:
+#
+#   QT_QPA_PLATFORM=offscreen python benchmarks/bench_grid.py
+#
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QGuiApplication, QImage, QPainter
+
+from grid import DotGrid, GRID_SIZE, DOT_RADIUS, DOT_COLOR
+
+
+def legacy_draw_dots(painter, rect):
+    # cópia do CanvasScene.drawBackground original
+    grid = GRID_SIZE
+    radius = DOT_RADIUS
+
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(DOT_COLOR)
+
+    left = int(rect.left()) - (int(rect.left()) % grid)
+    top = int(rect.top()) - (int(rect.top()) % grid)
+
+    for x in range(left, int(rect.right()), grid):
+        for y in range(top, int(rect.bottom()), grid):
+            painter.drawEllipse(x - radius, y - radius, radius * 2, radius * 2)
+
+
+def run(draw, width, height, zoom, frames):
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    # cena visível com esse zoom, deslocada um pouco a cada frame (pan)
+    scene_w, scene_h = width / zoom, height / zoom
+
+    times = []
+    for i in range(frames):
+        image.fill(QColor("#202020"))
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.scale(zoom, zoom)
+        rect = QRectF(i * 7.3, i * 3.1, scene_w, scene_h)
+        painter.translate(-rect.left(), -rect.top())
+
+        t0 = time.perf_counter()
+        draw(painter, rect)
+        times.append(time.perf_counter() - t0)
+        painter.end()
+
+    times.sort()
+    return times[len(times) // 2] * 1000, max(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=2160)
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--zooms", default="0.5,1.0,2.0")
+    args = parser.parse_args()
+
+    QGuiApplication.instance() or QGuiApplication(sys.argv)
+
+    grid = DotGrid()
+    print(f"{args.width}x{args.height}, {args.frames} frames (mediana / pior, ms)")
+    print(f"{'zoom':>6} {'legacy':>18} {'DotGrid':>18} {'speedup':>8}")
+    for zoom in (float(z) for z in args.zooms.split(",")):
+        old_med, old_max = run(legacy_draw_dots, args.width, args.height, zoom, args.frames)
+        new_med, new_max = run(grid.paint, args.width, args.height, zoom, args.frames)
+        print(f"{zoom:>6.2f} {old_med:>9.2f} / {old_max:<6.2f} {new_med:>9.2f} / {new_max:<6.2f} "
+              f"{old_med / max(new_med, 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Benchmark do índice de busca (search_index.py), sem Qt: enche um
+# CardStore com N cards de texto sintético, mede a indexação inteira, as
+# consultas (exata, prefixo, várias palavras, com erro de digitação) e a
+# reindexação depois de editar alguns cards.
+#
+#   python benchmarks/bench_search.py
+#   python benchmarks/bench_search.py --cards 100000 --words 25
+import os
+import sys
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from card_model import CardStore
+from search_index import SearchIndex
+
+VOCABULARY = 30000
+LETTERS = "abcdefghijklmnopqrstuvwxyzáéíóãçõ"
+REPEATS = 20
+
+
+def make_words(rng, count):
+    return ["".join(rng.choice(LETTERS) for _ in range(rng.randint(3, 10))) for _ in range(count)]
+
+
+def typo(rng, word):
+    i = rng.randrange(len(word))
+    return word[:i] + rng.choice("xyz") + word[i + 1:]
+
+
+def timed(fn, repeats=1):
+    # (resultado, melhor tempo em ms)
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = (time.perf_counter() - t0) * 1000
+        best = dt if best is None else min(best, dt)
+    return result, best
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=15, help="palavras por card (média)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = make_words(rng, VOCABULARY)
+    n = args.cards
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(args.words // 3, args.words * 5 // 3)))
+             for _ in range(n)]
+
+    store = CardStore()
+    store.add_many([1] * n, [0.0] * n, [0.0] * n, [220.0] * n, [140.0] * n, texts)
+    index = SearchIndex(store)
+
+    _, build_ms = timed(index.flush)
+    print(f"{n} cards, {len(index._postings)} termos")
+    print(f"indexação inteira      {build_ms:9.1f} ms")
+
+    samples = [rng.choice(words) for _ in range(REPEATS)]
+    queries = {
+        "exata": samples,
+        "prefixo": [w[:3] for w in samples],
+        "duas palavras": [" ".join(w[:4] for w in rng.sample(rng.choice(texts).split(), 2)) for _ in samples],
+        "erro de digitação": [typo(rng, w) for w in samples if len(w) >= 5],
+    }
+    for name, batch in queries.items():
+        times = []
+        hits = 0
+        for query in batch:
+            result, ms = timed(lambda: index.search(query, 1000), 3)
+            times.append(ms)
+            hits += len(result)
+        times.sort()
+        print(f"{name:<22} p50 {times[len(times) // 2]:7.2f} ms   max {times[-1]:7.2f} ms   "
+              f"({hits / len(batch):.0f} resultados)")
+
+    edited = rng.sample(range(n), 100)
+    for card_id in edited:
+        store.set_content(card_id, " ".join(rng.choice(words) for _ in range(args.words)))
+    _, reindex_ms = timed(lambda: index.search(samples[0], 1000))
+    print(f"editar 100 cards + busca {reindex_ms:7.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
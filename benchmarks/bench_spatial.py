@@ -0,0 +1,139 @@
+# Microbenchmark do índice espacial (spatial_index.py) contra a varredura
+# linear do CardStore e contra o BSP do QGraphicsScene (items(rect) com um
+# QGraphicsRectItem por card). Mede montar, consultar área do tamanho da
+# tela, ponto, card mais perto e mover cards.
+#
+#   python benchmarks/bench_spatial.py
+#   python benchmarks/bench_spatial.py --cards 100000 --no-qt
+import os
+import sys
+import math
+import time
+import random
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from card_model import CardStore
+
+CARD_W, CARD_H = 220.0, 140.0
+SPACING_X, SPACING_Y = 240, 160
+# área consultada: tela de 1600x900 com zoom 100% e 50% de margem
+VIEW_W, VIEW_H = 3200.0, 1800.0
+QUERIES = 200
+MOVES = 2000
+
+
+def layout(rng, n):
+    # metade em grade, metade espalhada (board de verdade é as duas coisas)
+    cols = int(n ** 0.5) or 1
+    xs, ys = [], []
+    for i in range(n):
+        if i % 2:
+            xs.append(float((i % cols) * SPACING_X))
+            ys.append(float((i // cols) * SPACING_Y))
+        else:
+            xs.append(rng.uniform(0, cols * SPACING_X))
+            ys.append(rng.uniform(0, cols * SPACING_Y))
+    return xs, ys
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def row(name, *cells):
+    print(f"{name:<26}" + "".join(f"{c:>16}" for c in cells))
+
+
+def ms(value, count=1):
+    return "-" if value is None else f"{value / count:.3f}"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-qt", action="store_true", help="pula a comparação com o QGraphicsScene")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n = args.cards
+    xs, ys = layout(rng, n)
+    width = max(xs) + CARD_W
+    height = max(ys) + CARD_H
+
+    store = CardStore()
+    ids, build_grid = timed(lambda: store.add_many([1] * n, xs, ys, [CARD_W] * n, [CARD_H] * n, [None] * n))
+
+    rects = [(rng.uniform(0, width - VIEW_W), rng.uniform(0, height - VIEW_H)) for _ in range(QUERIES)]
+    points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(QUERIES)]
+    moves = [(rng.randrange(n), rng.uniform(-300, 300), rng.uniform(-300, 300)) for _ in range(MOVES)]
+
+    # confere antes de medir: índice tem que devolver o mesmo que a varredura
+    for x, y in rects[:20]:
+        assert store.query(x, y, x + VIEW_W, y + VIEW_H) == store.query_linear(x, y, x + VIEW_W, y + VIEW_H)
+    for x, y in points[:5]:
+        brute = min(math.hypot(max(store.xs[i] - x, 0, x - store.xs[i] - CARD_W),
+                               max(store.ys[i] - y, 0, y - store.ys[i] - CARD_H)) for i in ids)
+        assert abs(store.nearest(x, y)[1] - brute) < 1e-9
+
+    hits, query_grid = timed(lambda: [store.query(x, y, x + VIEW_W, y + VIEW_H) for x, y in rects])
+    _, query_linear = timed(lambda: [store.query_linear(x, y, x + VIEW_W, y + VIEW_H) for x, y in rects])
+    _, point_grid = timed(lambda: [store.query_point(x, y) for x, y in points])
+    _, nearest_grid = timed(lambda: [store.nearest(x, y) for x, y in points])
+
+    def move_store():
+        for card_id, dx, dy in moves:
+            store.move(card_id, store.xs[card_id] + dx, store.ys[card_id] + dy)
+    _, move_grid = timed(move_store)
+
+    build_qt = query_qt = point_qt = move_qt = None
+    if not args.no_qt:
+        from PySide6.QtCore import QRectF, QPointF
+        from PySide6.QtWidgets import QApplication, QGraphicsScene, QGraphicsRectItem
+
+        QApplication.instance() or QApplication(sys.argv)
+        scene = QGraphicsScene(0, 0, width, height)
+
+        def build():
+            items = []
+            for i in range(n):
+                item = QGraphicsRectItem(0, 0, CARD_W, CARD_H)
+                item.setPos(xs[i], ys[i])
+                scene.addItem(item)
+                items.append(item)
+            # o BSP só é montado de verdade na primeira consulta
+            scene.items(QRectF(0, 0, 1, 1))
+            return items
+        items, build_qt = timed(build)
+
+        _, query_qt = timed(lambda: [scene.items(QRectF(x, y, VIEW_W, VIEW_H)) for x, y in rects])
+        _, point_qt = timed(lambda: [scene.items(QPointF(x, y)) for x, y in points])
+
+        def move_items():
+            for card_id, dx, dy in moves:
+                items[card_id].moveBy(dx, dy)
+            # reindexa o que mudou
+            scene.items(QRectF(0, 0, 1, 1))
+        _, move_qt = timed(move_items)
+
+    print(f"{n} cards, board {width:.0f}x{height:.0f}, consulta {VIEW_W:.0f}x{VIEW_H:.0f} "
+          f"(~{sum(map(len, hits)) / len(hits):.0f} cards por consulta), ms")
+    row("", "grade", "linear", "QGraphicsScene")
+    row("montar", ms(build_grid), "-", ms(build_qt))
+    row("área (por consulta)", ms(query_grid, QUERIES), ms(query_linear, QUERIES), ms(query_qt, QUERIES))
+    row("ponto (por consulta)", ms(point_grid, QUERIES), "-", ms(point_qt, QUERIES))
+    row("mais perto (por consulta)", ms(nearest_grid, QUERIES), "-", "-")
+    row(f"mover {MOVES} cards", ms(move_grid), "-", ms(move_qt))
+    sys.stdout.flush()
+    # sem destruir milhares de itens Qt um por um na saída
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,337 @@
+import math
+import time
+from collections import deque
+
+from PySide6.QtCore import Qt, QPointF, QRectF, QTimer
+from PySide6.QtGui import QTransform
+from PySide6.QtWidgets import QGraphicsView
+
+from grid import GRID_SIZE
+
+# =========================
+# CAMERA
+# =========================
+
+# quão longe da origem a câmera pode ir antes de rebasear o mundo
+REBASE_DISTANCE = 100_000
+# folga em volta da área visível quando o mundo cresce (em viewports)
+WORLD_MARGIN = 2.0
+
+# limites de zoom (wheel e pinch usam os mesmos)
+ZOOM_MIN = 0.1
+ZOOM_MAX = 8.0
+
+# zoom suave: constante de tempo da aproximação até o zoom pedido (s)
+SMOOTH_ZOOM = True
+ZOOM_EASE_TIME = 0.06
+# pan com inércia depois de soltar: quanto a velocidade cai por segundo
+# (v *= exp(-atrito * dt)) e abaixo de quantos px/s para
+KINETIC_PAN = True
+KINETIC_FRICTION = 5.0
+KINETIC_MIN_SPEED = 30.0
+# só conta pra inércia o movimento dos últimos instantes antes de soltar
+KINETIC_SAMPLE_TIME = 0.08
+
+# duração do voo até um ponto (resultado da busca)
+FLY_TIME = 0.35
+
+
+class Camera:
+    # guarda centro e zoom em float (o scrollbar só aceita int) e aplica
+    # na view via transform + centerOn. O mundo (sceneRect) cresce conforme
+    # a câmera anda, e quando ela vai longe demais da origem o mundo inteiro
+    # é deslocado de volta pra perto de 0,0.
+    #
+    # Input (wheel, pinch, pan) entra pelos queue_*: os deltas se acumulam
+    # e são aplicados uma vez por frame num timer no ritmo da tela, então
+    # um trackpad mandando 200 eventos/s não vira 200 repaints.
+
+    def __init__(self, view, zoom_min=ZOOM_MIN, zoom_max=ZOOM_MAX):
+        self.view = view
+        self.center = QPointF(0, 0)
+        self.zoom = 1.0
+        self.zoom_min = zoom_min
+        self.zoom_max = zoom_max
+
+        self._applying = False
+        # chamado depois de cada mudança de centro/zoom
+        self.on_change = None
+
+        # False = aplica cada evento na hora (sem timer, sem animação)
+        self.paced = True
+        self.smooth_zoom = SMOOTH_ZOOM
+        self.kinetic = KINETIC_PAN
+
+        self._pending_pan = QPointF(0, 0)
+        self._target_zoom = None
+        self._zoom_anchor = None
+        self._zoom_eased = True
+        self._velocity = QPointF(0, 0)
+        self._pan_samples = deque(maxlen=16)  # (tempo, dx, dy)
+        self._last_frame = None
+        # (centro inicial, zoom inicial, centro alvo, zoom alvo, início, duração),
+        # centros em coordenadas do mundo por causa do rebase
+        self._fly = None
+
+        self._frame_timer = QTimer(view)
+        self._frame_timer.setTimerType(Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._on_frame)
+
+        hbar = view.horizontalScrollBar()
+        vbar = view.verticalScrollBar()
+        hbar.valueChanged.connect(self._on_scrolled)
+        vbar.valueChanged.connect(self._on_scrolled)
+
+    def _scene(self):
+        # CanvasView guarda a cena no atributo .scene, que esconde o método
+        return QGraphicsView.scene(self.view)
+
+    # --- coordenadas ---
+
+    def _viewport_center(self):
+        vp = self.view.viewport()
+        return QPointF(vp.width() / 2, vp.height() / 2)
+
+    def map_to_scene(self, view_pos):
+        return self.center + (QPointF(view_pos) - self._viewport_center()) / self.zoom
+
+    def visible_rect(self):
+        vp = self.view.viewport()
+        w = vp.width() / self.zoom
+        h = vp.height() / self.zoom
+        return QRectF(self.center.x() - w / 2, self.center.y() - h / 2, w, h)
+
+    # --- movimento ---
+
+    def pan_by(self, dx, dy):
+        # dx/dy em pixels de tela, sem arredondar
+        self.center -= QPointF(dx, dy) / self.zoom
+        self.apply()
+
+    def center_on(self, pos):
+        self.center = QPointF(pos)
+        self.apply()
+
+    def zoom_by(self, factor, anchor=None):
+        return self.zoom_to(self.zoom * factor, anchor)
+
+    def zoom_to(self, zoom, anchor=None):
+        zoom = self.clamp_zoom(zoom)
+        if zoom == self.zoom:
+            return False
+        self._set_zoom(zoom, anchor)
+        self.apply()
+        return True
+
+    def fly_to(self, world_pos, zoom=None, duration=FLY_TIME):
+        # anda animado até world_pos (coordenadas do mundo, não da cena)
+        target_zoom = self.clamp_zoom(zoom) if zoom is not None else self.zoom
+        origin = self._origin()
+        self.stop()
+        self._pending_pan = QPointF(0, 0)
+
+        if not self.paced or duration <= 0:
+            self.zoom = target_zoom
+            self.center = QPointF(world_pos) - origin
+            self.apply()
+            return
+
+        self._fly = (self.center + origin, self.zoom, QPointF(world_pos), target_zoom,
+                     time.perf_counter(), duration)
+        self._schedule()
+
+    def _origin(self):
+        scene = self._scene()
+        return QPointF(scene.origin) if scene is not None else QPointF(0, 0)
+
+    def clamp_zoom(self, zoom):
+        return max(self.zoom_min, min(self.zoom_max, zoom))
+
+    def _set_zoom(self, zoom, anchor):
+        if anchor is not None:
+            # mantém o ponto da cena embaixo do mouse parado
+            scene_pt = self.map_to_scene(anchor)
+            self.center = scene_pt - (QPointF(anchor) - self._viewport_center()) / zoom
+        self.zoom = zoom
+
+    # --- input por frame ---
+
+    def queue_pan(self, dx, dy):
+        # dx/dy em pixels de tela; soma com o que já chegou nesse frame
+        self._velocity = QPointF(0, 0)
+        self._fly = None
+        self._pending_pan += QPointF(dx, dy)
+        self._pan_samples.append((time.perf_counter(), dx, dy))
+        self._schedule()
+
+    def queue_zoom(self, factor, anchor=None, eased=True):
+        # eased=False pra input que já é contínuo (pinch): chega no próximo frame
+        self._fly = None
+        base = self._target_zoom if self._target_zoom is not None else self.zoom
+        self._target_zoom = self.clamp_zoom(base * factor)
+        self._zoom_anchor = QPointF(anchor) if anchor is not None else None
+        self._zoom_eased = eased
+        self._schedule()
+
+    def release_pan(self):
+        # soltou o pan: continua andando com a velocidade do fim do gesto
+        samples = self._pan_samples
+        now = time.perf_counter()
+        recent = [s for s in samples if now - s[0] <= KINETIC_SAMPLE_TIME]
+        samples.clear()
+        if not self.kinetic or not self.paced or len(recent) < 2:
+            return
+
+        span = max(now - recent[0][0], 1 / 120)
+        velocity = QPointF(sum(s[1] for s in recent) / span, sum(s[2] for s in recent) / span)
+        if math.hypot(velocity.x(), velocity.y()) >= KINETIC_MIN_SPEED:
+            self._velocity = velocity
+            self._schedule()
+
+    def stop(self):
+        # cancela inércia e animação de zoom (ex: clicou de novo)
+        self._velocity = QPointF(0, 0)
+        self._pan_samples.clear()
+        self._target_zoom = None
+        self._zoom_anchor = None
+        self._fly = None
+
+    def animating(self):
+        return (not self._pending_pan.isNull()
+                or not self._velocity.isNull()
+                or self._target_zoom is not None
+                or self._fly is not None)
+
+    def flush(self):
+        # aplica agora o que está pendente, sem esperar o timer
+        if self.animating():
+            self._on_frame(immediate=True)
+
+    def _frame_interval(self):
+        screen = self.view.screen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        return max(1, int(1000 / (rate if rate > 1 else 60.0)))
+
+    def _schedule(self):
+        if not self.paced:
+            self._on_frame(immediate=True)
+            return
+        if not self._frame_timer.isActive():
+            self._frame_timer.start(self._frame_interval())
+
+    def _on_frame(self, immediate=False):
+        now = time.perf_counter()
+        if self._last_frame is None:
+            dt = self._frame_interval() / 1000
+        else:
+            # frame atrasado (app travou) não vira um pulo gigante
+            dt = min(now - self._last_frame, 0.05)
+        self._last_frame = now
+
+        changed = False
+        if self._fly is not None:
+            self._fly_step(now, immediate)
+            changed = True
+
+        if not self._pending_pan.isNull():
+            self.center -= self._pending_pan / self.zoom
+            self._pending_pan = QPointF(0, 0)
+            changed = True
+        elif not self._velocity.isNull():
+            self.center -= self._velocity * dt / self.zoom
+            self._velocity *= math.exp(-KINETIC_FRICTION * dt)
+            if math.hypot(self._velocity.x(), self._velocity.y()) < KINETIC_MIN_SPEED:
+                self._velocity = QPointF(0, 0)
+            changed = True
+
+        if self._target_zoom is not None:
+            target = self._target_zoom
+            zoom = target
+            if self.smooth_zoom and self._zoom_eased and not immediate:
+                # aproxima exponencialmente em escala log (mesma velocidade
+                # no zoom in e no zoom out)
+                k = 1 - math.exp(-dt / ZOOM_EASE_TIME)
+                zoom = self.zoom * (target / self.zoom) ** k
+                if abs(math.log(target / zoom)) < 0.002:
+                    zoom = target
+            if zoom != self.zoom:
+                self._set_zoom(zoom, self._zoom_anchor)
+                changed = True
+            if zoom == target:
+                self._target_zoom = None
+                self._zoom_anchor = None
+
+        if changed:
+            self.apply()
+
+        if not self.animating():
+            self._frame_timer.stop()
+            self._last_frame = None
+
+    def _fly_step(self, now, immediate):
+        start, start_zoom, target, target_zoom, t0, duration = self._fly
+        t = 1.0 if immediate else min(1.0, (now - t0) / duration)
+        # ease-out cúbico; zoom interpolado em escala log
+        e = 1 - (1 - t) ** 3
+        self.zoom = start_zoom * (target_zoom / start_zoom) ** e
+        self.center = start + (target - start) * e - self._origin()
+        if t >= 1.0:
+            self._fly = None
+
+    def apply(self):
+        self._applying = True
+        try:
+            self._maybe_rebase()
+            self.view.setTransform(QTransform.fromScale(self.zoom, self.zoom))
+            self.ensure_world()
+            self.view.centerOn(self.center)
+        finally:
+            self._applying = False
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def _on_scrolled(self, _value):
+        # alguém mexeu no scrollbar por fora (ensureVisible do texto,
+        # auto-scroll do drag...), então a câmera segue
+        if self._applying:
+            return
+        self.center = self.view.mapToScene(self.view.viewport().rect()).boundingRect().center()
+        self._changed()
+
+    # --- mundo ---
+
+    def ensure_world(self):
+        scene = self._scene()
+        if scene is None:
+            return
+
+        visible = self.visible_rect()
+        world = scene.sceneRect()
+        if world.contains(visible):
+            return
+
+        # cresce com folga pra não mexer no sceneRect (e no BSP) a cada passo
+        mx = visible.width() * WORLD_MARGIN
+        my = visible.height() * WORLD_MARGIN
+        scene.setSceneRect(world.united(visible.adjusted(-mx, -my, mx, my)))
+
+    def _maybe_rebase(self):
+        scene = self._scene()
+        if scene is None:
+            return
+        if abs(self.center.x()) < REBASE_DISTANCE and abs(self.center.y()) < REBASE_DISTANCE:
+            return
+
+        # desloca em múltiplos do grid pra não bagunçar o snap dos cards
+        dx = round(self.center.x() / GRID_SIZE) * GRID_SIZE
+        dy = round(self.center.y() / GRID_SIZE) * GRID_SIZE
+        scene.rebase(dx, dy)
+        self.center -= QPointF(dx, dy)
+
+        vis = self.visible_rect()
+        mx = vis.width() * WORLD_MARGIN
+        my = vis.height() * WORLD_MARGIN
+        scene.fit_world(vis.adjusted(-mx, -my, mx, my))
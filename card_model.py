@@ -0,0 +1,337 @@
+from array import array
+
+from spatial_index import GridIndex
+
+# =========================
+# CARD MODEL
+# =========================
+# Todos os cards do board moram aqui, em colunas compactas. Os QGraphicsItem
+# só existem pros cards perto da tela (ver CanvasScene) e são reciclados
+# quando saem dela. Nada de Qt neste arquivo.
+#
+# Coordenadas são "do mundo" (não mudam quando a câmera rebaseia a cena).
+# As consultas por área/ponto passam pelo GridIndex (spatial_index.py), que
+# acompanha toda mudança de posição e tamanho.
+
+
+class CardStore:
+    def __init__(self):
+        self.xs = array("d")
+        self.ys = array("d")
+        self.ws = array("d")
+        self.hs = array("d")
+        self.kinds = array("B")
+        self.alive = bytearray()
+        self.contents = []
+
+        self._free = []
+        self.count = 0
+        self.spatial = GridIndex()
+
+        # o que mudou desde o último save (ver project_file.py)
+        self.dirty_geometry = set()
+        self.dirty_content = set()
+        self.removed = set()
+
+        # avisados com o id quando o conteúdo / a posição ou tamanho de um
+        # card muda (None = todos), ver search_index.py e minimap.py
+        self.on_content = None
+        self.on_geometry = None
+        # avisado (sem argumento) a cada mudança que precisa ir pro disco,
+        # ver autosave.py
+        self.on_dirty = None
+
+    def _content_changed(self, card_id=None):
+        if self.on_content is not None:
+            self.on_content(card_id)
+
+    def _geometry_changed(self, card_id=None):
+        if self.on_geometry is not None:
+            self.on_geometry(card_id)
+
+    def _dirtied(self):
+        if self.on_dirty is not None:
+            self.on_dirty()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, card_id):
+        return 0 <= card_id < len(self.alive) and self.alive[card_id]
+
+    def add(self, kind, x, y, w, h, content=None):
+        if self._free:
+            card_id = self._free.pop()
+            self.xs[card_id] = x
+            self.ys[card_id] = y
+            self.ws[card_id] = w
+            self.hs[card_id] = h
+            self.kinds[card_id] = kind
+            self.alive[card_id] = 1
+            self.contents[card_id] = content
+        else:
+            card_id = len(self.alive)
+            self.xs.append(x)
+            self.ys.append(y)
+            self.ws.append(w)
+            self.hs.append(h)
+            self.kinds.append(kind)
+            self.alive.append(1)
+            self.contents.append(content)
+
+        self.count += 1
+        self.spatial.insert(card_id, x, y, w, h)
+        self.dirty_geometry.add(card_id)
+        self.dirty_content.add(card_id)
+        self.removed.discard(card_id)
+        self._content_changed(card_id)
+        self._geometry_changed(card_id)
+        self._dirtied()
+        return card_id
+
+    def add_many(self, kinds, xs, ys, ws, hs, contents):
+        # igual ao add, mas as colunas crescem de uma vez (importar/colar)
+        n = len(kinds)
+        reuse = min(n, len(self._free))
+        ids = [self._free.pop() for _ in range(reuse)]
+        for j, card_id in enumerate(ids):
+            self.xs[card_id] = xs[j]
+            self.ys[card_id] = ys[j]
+            self.ws[card_id] = ws[j]
+            self.hs[card_id] = hs[j]
+            self.kinds[card_id] = kinds[j]
+            self.alive[card_id] = 1
+            self.contents[card_id] = contents[j]
+
+        start = len(self.alive)
+        self.xs.extend(xs[reuse:])
+        self.ys.extend(ys[reuse:])
+        self.ws.extend(ws[reuse:])
+        self.hs.extend(hs[reuse:])
+        self.kinds.extend(kinds[reuse:])
+        self.alive.extend(b"\1" * (n - reuse))
+        self.contents.extend(contents[reuse:])
+        ids.extend(range(start, start + n - reuse))
+
+        self.count += n
+        self._index(ids)
+        self.dirty_geometry.update(ids)
+        self.dirty_content.update(ids)
+        self.removed.difference_update(ids)
+        for card_id in ids:
+            self._content_changed(card_id)
+            self._geometry_changed(card_id)
+        self._dirtied()
+        return ids
+
+    def restore(self, ids, kinds, xs, ys, ws, hs, contents):
+        # traz de volta cards apagados com os mesmos ids (desfazer)
+        wanted = set(ids)
+        self._free = [i for i in self._free if i not in wanted]
+
+        top = max(ids) + 1 if len(ids) else 0
+        grow = top - len(self.alive)
+        if grow > 0:
+            # ids além do fim (store foi recriado no meio): buracos livres
+            start = len(self.alive)
+            self.xs.extend(array("d", bytes(8 * grow)))
+            self.ys.extend(array("d", bytes(8 * grow)))
+            self.ws.extend(array("d", bytes(8 * grow)))
+            self.hs.extend(array("d", bytes(8 * grow)))
+            self.kinds.extend(array("B", bytes(grow)))
+            self.alive.extend(bytes(grow))
+            self.contents.extend([None] * grow)
+            self._free.extend(i for i in range(top - 1, start - 1, -1) if i not in wanted)
+
+        for j, card_id in enumerate(ids):
+            if not self.alive[card_id]:
+                self.count += 1
+            self.xs[card_id] = xs[j]
+            self.ys[card_id] = ys[j]
+            self.ws[card_id] = ws[j]
+            self.hs[card_id] = hs[j]
+            self.kinds[card_id] = kinds[j]
+            self.alive[card_id] = 1
+            self.contents[card_id] = contents[j]
+
+        self._index(ids)
+        self.dirty_geometry.update(ids)
+        self.dirty_content.update(ids)
+        self.removed.difference_update(ids)
+        for card_id in ids:
+            self._content_changed(card_id)
+            self._geometry_changed(card_id)
+        self._dirtied()
+
+    def remove(self, card_id):
+        if card_id not in self:
+            return
+        self.alive[card_id] = 0
+        self.contents[card_id] = None
+        self._free.append(card_id)
+        self.count -= 1
+        self.spatial.remove(card_id)
+
+        self.dirty_geometry.discard(card_id)
+        self.dirty_content.discard(card_id)
+        self.removed.add(card_id)
+        self._content_changed(card_id)
+        self._geometry_changed(card_id)
+        self._dirtied()
+
+    def move(self, card_id, x, y):
+        if self.xs[card_id] == x and self.ys[card_id] == y:
+            return
+        self.xs[card_id] = x
+        self.ys[card_id] = y
+        self.spatial.update(card_id, x, y, self.ws[card_id], self.hs[card_id])
+        self.dirty_geometry.add(card_id)
+        self._geometry_changed(card_id)
+        self._dirtied()
+
+    def resize(self, card_id, w, h):
+        self.ws[card_id] = w
+        self.hs[card_id] = h
+        self.spatial.update(card_id, self.xs[card_id], self.ys[card_id], w, h)
+        self.dirty_geometry.add(card_id)
+        self._geometry_changed(card_id)
+        self._dirtied()
+
+    def set_content(self, card_id, content):
+        if self.contents[card_id] == content:
+            return
+        self.contents[card_id] = content
+        self.dirty_content.add(card_id)
+        self._content_changed(card_id)
+        self._dirtied()
+
+    def _index(self, ids):
+        insert = self.spatial.insert
+        xs, ys, ws, hs = self.xs, self.ys, self.ws, self.hs
+        for card_id in ids:
+            insert(card_id, xs[card_id], ys[card_id], ws[card_id], hs[card_id])
+
+    def clear_dirty(self):
+        self.dirty_geometry.clear()
+        self.dirty_content.clear()
+        self.removed.clear()
+
+    def is_dirty(self):
+        return bool(self.dirty_geometry or self.dirty_content or self.removed)
+
+    def snapshot(self):
+        # cópia pra salvar em outra thread (ver autosave.py). As colunas são
+        # copiadas inteiras (memcpy, ~2 ms com 100k cards); os textos não,
+        # string é imutável e fica compartilhada até alguém trocar o
+        # conteúdo do card. O que estava sujo passa pro snapshot e o store
+        # começa a contar do zero.
+        snap = StoreSnapshot(self)
+        self.dirty_geometry = set()
+        self.dirty_content = set()
+        self.removed = set()
+        return snap
+
+    def restore_dirty(self, snap):
+        # o save desse snapshot falhou: o que ele levou volta a ser sujo
+        self.dirty_geometry |= snap.dirty_geometry
+        self.dirty_content |= snap.dirty_content
+        self.removed |= snap.removed
+        self._dirtied()
+
+    def load(self, ids, kinds, xs, ys, ws, hs, contents):
+        # substitui tudo (abrir projeto); ids que faltam viram buracos livres
+        size = max(ids) + 1 if ids else 0
+        self.xs = array("d", bytes(8 * size))
+        self.ys = array("d", bytes(8 * size))
+        self.ws = array("d", bytes(8 * size))
+        self.hs = array("d", bytes(8 * size))
+        self.kinds = array("B", bytes(size))
+        self.alive = bytearray(size)
+        self.contents = [None] * size
+
+        for j, card_id in enumerate(ids):
+            self.xs[card_id] = xs[j]
+            self.ys[card_id] = ys[j]
+            self.ws[card_id] = ws[j]
+            self.hs[card_id] = hs[j]
+            self.kinds[card_id] = kinds[j]
+            self.alive[card_id] = 1
+            self.contents[card_id] = contents[j]
+
+        self._free = [i for i in range(size - 1, -1, -1) if not self.alive[i]]
+        self.count = len(ids)
+        self.spatial.clear()
+        self._index(ids)
+        self.clear_dirty()
+        self._content_changed()
+        self._geometry_changed()
+
+    def get(self, card_id):
+        return (
+            self.kinds[card_id],
+            self.xs[card_id], self.ys[card_id],
+            self.ws[card_id], self.hs[card_id],
+            self.contents[card_id],
+        )
+
+    def ids(self):
+        alive = self.alive
+        return [i for i in range(len(alive)) if alive[i]]
+
+    def query(self, left, top, right, bottom):
+        # cards que encostam no retângulo, ids em ordem crescente
+        return self.spatial.query(left, top, right, bottom)
+
+    def query_point(self, x, y):
+        return self.spatial.query_point(x, y)
+
+    def nearest(self, x, y, max_distance=float("inf")):
+        # (id, distância) do card mais perto do ponto, ou None
+        return self.spatial.nearest(x, y, max_distance)
+
+    def query_linear(self, left, top, right, bottom):
+        # varredura direta nas colunas, sem índice (referência pros benchmarks)
+        xs, ys, ws, hs, alive = self.xs, self.ys, self.ws, self.hs, self.alive
+        return [
+            i for i in range(len(alive))
+            if alive[i]
+            and xs[i] < right and xs[i] + ws[i] > left
+            and ys[i] < bottom and ys[i] + hs[i] > top
+        ]
+
+
+class StoreSnapshot:
+    # só leitura, com os mesmos nomes que o ProjectWriter usa do CardStore
+
+    def __init__(self, store):
+        self.xs = store.xs[:]
+        self.ys = store.ys[:]
+        self.ws = store.ws[:]
+        self.hs = store.hs[:]
+        self.kinds = store.kinds[:]
+        self.alive = store.alive[:]
+        self.contents = store.contents[:]
+        self.count = store.count
+
+        self.dirty_geometry = store.dirty_geometry
+        self.dirty_content = store.dirty_content
+        self.removed = store.removed
+
+    def __len__(self):
+        return self.count
+
+    def ids(self):
+        alive = self.alive
+        return [i for i in range(len(alive)) if alive[i]]
+
+    def set_content(self, card_id, content):
+        # texto que ainda está sendo digitado (não foi pro store)
+        if self.contents[card_id] == content:
+            return
+        self.contents[card_id] = content
+        self.dirty_content.add(card_id)
+
+    def clear_dirty(self):
+        self.dirty_geometry.clear()
+        self.dirty_content.clear()
+        self.removed.clear()
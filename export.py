@@ -0,0 +1,557 @@
+import os
+import json
+import math
+import queue
+import shutil
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, QMarginsF, QRectF, QSizeF, Qt, Signal
+from PySide6.QtGui import QColor, QImage, QPageLayout, QPageSize, QPainter, QPdfWriter
+
+from grid import DotGrid
+from card_model import StoreSnapshot
+from spatial_index import GridIndex
+from image_loader import decode_image
+from waveform import peaks_for
+from asset_pack import asset_key
+
+# =========================
+# EXPORT
+# =========================
+# Exporta uma região do board (até o board inteiro) sem nunca ter a imagem
+# toda na memória: a região é cortada em tiles, cada tile é pintado num
+# QImage por um QRunnable (várias threads), e um job coordenador grava os
+# tiles na ordem, conforme chegam:
+#
+#   png      um PNG só, escrito em faixas da largura toda (zlib em stream)
+#   pyramid  pasta com tiles 512x512 em níveis (0 = board inteiro num tile)
+#            + board.json, pra abrir num visualizador de deep zoom
+#   pdf      uma página por tile
+#
+# Só ficam em memória os tiles em andamento (EXPORT_WINDOW por thread) e o
+# cache de imagens decodificadas (EXPORT_ASSET_BYTES). Os cards são
+# pintados pelo export_paint das classes de card (main.py) e o fundo pelo
+# DotGrid, os mesmos desenhos da tela, a partir de um StoreSnapshot: nada
+# de QGraphicsItem ou QPixmap fora da thread da interface.
+
+TILE_SIZE = 512
+EXPORT_MARGIN = 40
+EXPORT_BACKGROUND = QColor("#202020")
+# tiles em andamento por thread de render
+EXPORT_WINDOW = 2
+# memória pros tiles em andamento (as faixas do png se ajustam a isso)
+EXPORT_TILE_BYTES = 128 * 1024 * 1024
+# imagens dos cards já decodificadas, compartilhadas entre as threads
+EXPORT_ASSET_BYTES = 256 * 1024 * 1024
+# png/pdf: reduz a escala pra não passar disso (pirâmide não tem limite)
+EXPORT_MAX_PIXELS = 400_000_000
+PDF_PAGE_PX = (1754, 1240)  # A4 deitado a 150 dpi
+PDF_DPI = 150
+
+FORMAT_PNG = "png"
+FORMAT_PYRAMID = "pyramid"
+FORMAT_PDF = "pdf"
+
+
+def board_rect(store, margin=EXPORT_MARGIN):
+    # retângulo (mundo) que cobre todos os cards, ou None se não tem nenhum
+    xs, ys, ws, hs, alive = store.xs, store.ys, store.ws, store.hs, store.alive
+    left = top = math.inf
+    right = bottom = -math.inf
+    for i in range(len(alive)):
+        if alive[i]:
+            left = min(left, xs[i])
+            top = min(top, ys[i])
+            right = max(right, xs[i] + ws[i])
+            bottom = max(bottom, ys[i] + hs[i])
+    if left == math.inf:
+        return None
+    return QRectF(left, top, right - left, bottom - top).adjusted(-margin, -margin, margin, margin)
+
+
+def fit_scale(rect, scale=1.0, max_pixels=EXPORT_MAX_PIXELS):
+    # maior escala <= scale que cabe em max_pixels
+    area = rect.width() * rect.height() * scale * scale
+    if area <= max_pixels:
+        return scale
+    return scale * math.sqrt(max_pixels / area)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+# =========================
+# ASSETS
+# =========================
+class _Assets:
+    # imagens e peaks pros export_paint, decodificados uma vez só mesmo com
+    # várias threads pedindo o mesmo ao mesmo tempo
+
+    def __init__(self, disk_cache, peaks_dir, max_bytes=EXPORT_ASSET_BYTES):
+        self.disk_cache = disk_cache
+        self.peaks_dir = peaks_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()  # chave -> valor (None = falhou)
+        self._sizes = {}
+        self._bytes = 0
+        self._busy = {}              # chave -> Event de quem está fazendo
+
+    def image(self, path, level):
+        # (QImage, cor média) ou None
+        if not path:
+            return None
+        return self._get((asset_key(path), level), lambda: self._decode(path, level))
+
+    def peaks(self, path):
+        if not path or self.peaks_dir is None:
+            return None
+        return self._get(("peaks", asset_key(path)), lambda: self._load_peaks(path))
+
+    def _decode(self, path, level):
+        image = decode_image(path, level, self.disk_cache)
+        if image is None:
+            return None, 0
+        average = image.scaled(1, 1, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).pixelColor(0, 0)
+        return (image, average), image.sizeInBytes()
+
+    def _load_peaks(self, path):
+        try:
+            return peaks_for(path, self.peaks_dir), 0
+        except Exception as e:
+            print(f"não deu pra ler o áudio {path}: {e}")
+            return None, 0
+
+    def _get(self, key, make):
+        while True:
+            with self._lock:
+                if key in self._items:
+                    self._items.move_to_end(key)
+                    return self._items[key]
+                event = self._busy.get(key)
+                mine = event is None
+                if mine:
+                    event = self._busy[key] = threading.Event()
+            if mine:
+                break
+            event.wait()
+
+        value, size = None, 0
+        try:
+            value, size = make()
+        finally:
+            with self._lock:
+                self._items[key] = value
+                self._sizes[key] = size
+                self._bytes += size
+                while self._bytes > self.max_bytes and len(self._items) > 1:
+                    old, _ = self._items.popitem(last=False)
+                    self._bytes -= self._sizes.pop(old)
+                del self._busy[key]
+            event.set()
+        return value
+
+
+# =========================
+# SAÍDAS
+# =========================
+# tiles(): lista de (x, y, w, h, escala) na ordem em que são gravados, em
+# pixels da saída naquela escala. prepare() roda na thread de render (pode
+# converter/gravar o tile lá), commit() no coordenador, um de cada vez.
+class _PngOutput:
+    # PNG RGB 8 bits escrito em stream: cabeçalho, IDAT conforme as faixas
+    # chegam, IEND no fim. Faixas da largura toda pra cada linha sair com
+    # um slice só
+
+    def __init__(self, path, width, height, scale, strip_bytes):
+        self.path = path
+        self.tmp = path + ".tmp"
+        self.width = width
+        self.height = height
+        self.scale = scale
+        # RGB32 pintado + cópia RGB888 pro png
+        self.strip = max(1, min(TILE_SIZE, strip_bytes // (width * 7)))
+        self._file = None
+        self._zip = zlib.compressobj(6)
+
+    def tiles(self):
+        return [(0, y, self.width, min(self.strip, self.height - y), self.scale)
+                for y in range(0, self.height, self.strip)]
+
+    def prepare(self, tile, image):
+        return image.convertToFormat(QImage.Format_RGB888)
+
+    def open(self):
+        self._file = open(self.tmp, "wb")
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+
+    def commit(self, tile, image):
+        w = self.width * 3
+        stride = image.bytesPerLine()
+        bits = image.constBits()
+        compress = self._zip.compress
+        # linha a linha direto do QImage, filtro 0 (nenhum) em cada uma
+        out = []
+        for r in range(image.height()):
+            out.append(compress(b"\0"))
+            out.append(compress(bits[r * stride:r * stride + w]))
+        self._chunk(b"IDAT", b"".join(out))
+
+    def close(self):
+        self._chunk(b"IDAT", self._zip.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+        self._file = None
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+    def _chunk(self, kind, payload):
+        if not payload and kind == b"IDAT":
+            return
+        self._file.write(struct.pack(">I", len(payload)) + kind + payload
+                         + struct.pack(">I", zlib.crc32(kind + payload)))
+
+
+class _PyramidOutput:
+    # pasta/<nível>/<coluna>_<linha>.png; nível 0 é o board inteiro num
+    # tile, cada nível seguinte dobra até a escala pedida. Cada tile é
+    # gravado pela própria thread que pintou
+
+    def __init__(self, path, width, height, scale):
+        self.path = path
+        self.tmp = path + ".part"
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self.levels = max(1, math.ceil(math.log2(max(width, height) / TILE_SIZE)) + 1)
+
+    def level_scale(self, level):
+        return self.scale / 2 ** (self.levels - 1 - level)
+
+    def tiles(self):
+        tiles = []
+        for level in range(self.levels):
+            factor = 2 ** (self.levels - 1 - level)
+            w = math.ceil(self.width / factor)
+            h = math.ceil(self.height / factor)
+            scale = self.level_scale(level)
+            for y in range(0, h, TILE_SIZE):
+                for x in range(0, w, TILE_SIZE):
+                    tiles.append((x, y, min(TILE_SIZE, w - x), min(TILE_SIZE, h - y), scale, level))
+        return tiles
+
+    def open(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        for level in range(self.levels):
+            os.makedirs(os.path.join(self.tmp, str(level)))
+
+    def prepare(self, tile, image):
+        x, y, _, _, _, level = tile
+        file = os.path.join(self.tmp, str(level), f"{x // TILE_SIZE}_{y // TILE_SIZE}.png")
+        if not image.save(file, "PNG"):
+            raise OSError(f"não deu pra gravar {file}")
+        return True
+
+    def commit(self, tile, result):
+        pass
+
+    def close(self):
+        with open(os.path.join(self.tmp, "board.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "width": self.width, "height": self.height, "scale": self.scale,
+                "tile_size": TILE_SIZE, "levels": self.levels, "format": "png",
+            }, f, indent=2)
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+class _PdfOutput:
+    # uma página por tile; o QPdfWriter só é usado pelo coordenador
+
+    def __init__(self, path, width, height, scale):
+        self.path = path
+        self.tmp = path + ".tmp"
+        self.width = width
+        self.height = height
+        self.scale = scale
+        self._writer = None
+        self._painter = None
+        self._pages = 0
+
+    def tiles(self):
+        pw, ph = PDF_PAGE_PX
+        # página cheia mesmo na borda (o resto sai com o fundo)
+        return [(x, y, pw, ph, self.scale) for y in range(0, self.height, ph) for x in range(0, self.width, pw)]
+
+    def prepare(self, tile, image):
+        return image
+
+    def open(self):
+        pw, ph = PDF_PAGE_PX
+        self._writer = QPdfWriter(self.tmp)
+        self._writer.setResolution(PDF_DPI)
+        self._writer.setPageSize(QPageSize(QSizeF(pw / PDF_DPI * 25.4, ph / PDF_DPI * 25.4), QPageSize.Millimeter))
+        self._writer.setPageMargins(QMarginsF(0, 0, 0, 0), QPageLayout.Millimeter)
+
+    def commit(self, tile, image):
+        if self._painter is None:
+            self._painter = QPainter(self._writer)
+        elif not self._writer.newPage():
+            raise OSError("não deu pra criar outra página no pdf")
+        self._painter.drawImage(0, 0, image)
+        self._pages += 1
+
+    def close(self):
+        if self._painter is not None:
+            self._painter.end()
+            self._painter = None
+        self._writer = None
+        os.replace(self.tmp, self.path)
+
+    def abort(self):
+        if self._painter is not None:
+            self._painter.end()
+            self._painter = None
+        self._writer = None
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+# =========================
+# JOBS
+# =========================
+class _TileJob(QRunnable):
+    def __init__(self, job, index, tile):
+        super().__init__()
+        self.job = job
+        self.index = index
+        self.tile = tile
+
+    def run(self):
+        result, error = None, None
+        try:
+            if not self.job.cancelled.is_set():
+                result = self.job.output.prepare(self.tile, self.job.render(self.tile))
+        except Exception as e:
+            error = e
+        finally:
+            self.job.results.put((self.index, result, error))
+
+
+class _ExportJob(QRunnable):
+    def __init__(self, exporter, snapshot, rect, output, painters, assets):
+        super().__init__()
+        self.exporter = exporter
+        self.snapshot = snapshot
+        self.rect = rect
+        self.output = output
+        self.painters = painters
+        self.assets = assets
+        self.cancelled = exporter._cancelled
+        self.results = queue.Queue()
+        self.result = (False, "")
+        self.index = None
+        self._local = threading.local()
+
+    def run(self):
+        ok, message = False, ""
+        try:
+            self._build_index()
+            self.output.open()
+            self._render_all()
+            self.output.close()
+            ok, message = True, self.output.path
+        except ExportCancelled:
+            self.output.abort()
+            message = "cancelado"
+        except Exception as e:
+            self.output.abort()
+            message = str(e)
+        finally:
+            self.result = (ok, message)
+            self.exporter._done.emit(self)
+
+    def _build_index(self):
+        # só os cards da região, num índice que ninguém mais mexe
+        snap = self.snapshot
+        r = self.rect
+        index = GridIndex()
+        xs, ys, ws, hs, alive = snap.xs, snap.ys, snap.ws, snap.hs, snap.alive
+        for i in range(len(alive)):
+            if (alive[i] and xs[i] < r.right() and xs[i] + ws[i] > r.left()
+                    and ys[i] < r.bottom() and ys[i] + hs[i] > r.top()):
+                index.insert(i, xs[i], ys[i], ws[i], hs[i])
+        self.index = index
+
+    def _render_all(self):
+        tiles = self.output.tiles()
+        total = len(tiles)
+        pool = self.exporter.render_pool
+        window = max(1, pool.maxThreadCount() * EXPORT_WINDOW)
+        done = {}
+        submitted = committed = outstanding = 0
+        error = None
+        step = max(1, total // 200)
+
+        self.exporter.progress.emit(0, total)
+        while committed < total:
+            stop = error is not None or self.cancelled.is_set()
+            while not stop and submitted < total and submitted - committed < window:
+                pool.start(_TileJob(self, submitted, tiles[submitted]))
+                submitted += 1
+                outstanding += 1
+            if outstanding == 0:
+                break
+
+            index, result, tile_error = self.results.get()
+            outstanding -= 1
+            if tile_error is not None and error is None:
+                error = tile_error
+            done[index] = result
+            if stop or error is not None:
+                continue
+
+            # grava na ordem; o que chegou adiantado espera no dict
+            while committed in done:
+                self.output.commit(tiles[committed], done.pop(committed))
+                committed += 1
+                if committed % step == 0 or committed == total:
+                    self.exporter.progress.emit(committed, total)
+
+        if error is not None:
+            raise error
+        if committed < total:
+            raise ExportCancelled()
+
+    def render(self, tile):
+        x, y, w, h, scale = tile[:5]
+        left = self.rect.left() + x / scale
+        top = self.rect.top() + y / scale
+        world = QRectF(left, top, w / scale, h / scale)
+
+        # um DotGrid por thread (o cache de tiles dele não é compartilhado)
+        grid = getattr(self._local, "grid", None)
+        if grid is None:
+            grid = self._local.grid = DotGrid(threaded=True)
+
+        image = QImage(w, h, QImage.Format_RGB32)
+        image.fill(EXPORT_BACKGROUND)
+        painter = QPainter(image)
+        painter.scale(scale, scale)
+        painter.translate(-left, -top)
+        grid.paint(painter, world)
+
+        snap = self.snapshot
+        kinds, contents = snap.kinds, snap.contents
+        xs, ys, ws, hs = snap.xs, snap.ys, snap.ws, snap.hs
+        for card_id in self.index.query(world.left(), world.top(), world.right(), world.bottom()):
+            painter.save()
+            self.painters[kinds[card_id]].export_paint(
+                painter, QRectF(xs[card_id], ys[card_id], ws[card_id], hs[card_id]),
+                contents[card_id], scale, self.assets)
+            painter.restore()
+        painter.end()
+        return image
+
+
+# =========================
+# EXPORTER
+# =========================
+class Exporter(QObject):
+    # (tiles gravados, total)
+    progress = Signal(int, int)
+    # (deu certo, caminho ou mensagem de erro)
+    finished = Signal(bool, str)
+    _done = Signal(object)
+
+    def __init__(self, painters, parent=None):
+        super().__init__(parent)
+        # tipo do card -> classe com export_paint (CARD_CLASSES do main)
+        self.painters = painters
+        # coordenador separado das threads de render, que ficam livres pros
+        # tiles; nenhuma das duas é a global (imagens da tela continuam)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.render_pool = QThreadPool(self)
+        self.render_pool.setMaxThreadCount(max(1, QThread.idealThreadCount() - 1))
+
+        self._cancelled = threading.Event()
+        self._job = None
+        self._done.connect(self._on_done)
+
+    def running(self):
+        return self._job is not None
+
+    def start(self, store, fmt, path, rect=None, scale=1.0, edits=None, disk_cache=None, peaks_dir=None):
+        # store: CardStore (copiado aqui, dá pra continuar editando). edits:
+        # {id: texto} ainda não salvo no store. False se não tem o que
+        # exportar ou já tem um export rodando
+        if self._job is not None:
+            return False
+        snapshot = StoreSnapshot(store)
+        # direto nas colunas: set_content mexeria nos sets de sujos do store
+        for card_id, content in (edits or {}).items():
+            snapshot.contents[card_id] = content
+        if rect is None:
+            rect = board_rect(snapshot)
+        if rect is None or rect.isEmpty():
+            return False
+
+        if fmt != FORMAT_PYRAMID:
+            scale = fit_scale(rect, scale)
+        width = max(1, math.ceil(rect.width() * scale))
+        height = max(1, math.ceil(rect.height() * scale))
+
+        window = self.render_pool.maxThreadCount() * EXPORT_WINDOW
+        if fmt == FORMAT_PNG:
+            output = _PngOutput(path, width, height, scale, EXPORT_TILE_BYTES // window)
+        elif fmt == FORMAT_PYRAMID:
+            output = _PyramidOutput(path, width, height, scale)
+        elif fmt == FORMAT_PDF:
+            output = _PdfOutput(path, width, height, scale)
+        else:
+            raise ValueError(f"formato de export desconhecido: {fmt}")
+
+        self._cancelled.clear()
+        assets = _Assets(disk_cache, peaks_dir)
+        self._job = _ExportJob(self, snapshot, rect, output, self.painters, assets)
+        self.pool.start(self._job)
+        return True
+
+    def cancel(self):
+        # os tiles em andamento terminam, o resto nem começa; o arquivo pela
+        # metade é apagado
+        self._cancelled.set()
+
+    def wait(self):
+        # bloqueia até o export terminar (fechar o app)
+        while self._job is not None:
+            self.pool.waitForDone()
+            self.render_pool.waitForDone()
+            # mesmo esquema do Autosaver.wait: o sinal ainda está na fila
+            self._on_done(self._job)
+
+    def _on_done(self, job):
+        if job is not self._job:
+            return
+        self._job = None
+        self.finished.emit(*job.result)
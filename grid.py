@@ -0,0 +1,134 @@
+import math
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QBrush, QColor, QImage, QPainter, QPixmap, QTransform
+
+# =========================
+# GRID (pontinhos do fundo)
+# =========================
+
+GRID_SIZE = 15
+DOT_RADIUS = 1.2
+DOT_COLOR = QColor(141, 141, 141, 41)  # que número malvado
+
+
+class DotGrid:
+    # em vez de desenhar uma elipse por célula a cada repaint, renderiza um
+    # tile com alguns pontos uma vez por (zoom, dpi) e preenche o rect com
+    # ele como textura
+
+    tile_target_px = 128   # tamanho aproximado do tile em pixels de tela
+    min_pitch_px = 6.0     # abaixo disso pula pontos (15 -> 30 -> 60...)
+    max_thin_levels = 4
+    fade_start_zoom = 0.35 # começa a sumir abaixo desse zoom
+    fade_end_zoom = 0.15   # some de vez
+    zoom_buckets_per_octave = 16
+    max_cached_tiles = 32
+
+    def __init__(self, spacing=GRID_SIZE, radius=DOT_RADIUS, color=DOT_COLOR, threaded=False):
+        self.spacing = spacing
+        self.radius = radius
+        self.color = QColor(color)
+        # threaded: tiles em QImage, pra desenhar fora da thread da
+        # interface (export.py, um DotGrid por thread)
+        self.threaded = threaded
+        self._tiles = OrderedDict()
+
+    def clear_cache(self):
+        self._tiles.clear()
+
+    def set_color(self, color):
+        self.color = QColor(color)
+        self.clear_cache()
+
+    def opacity_for_zoom(self, zoom):
+        if zoom >= self.fade_start_zoom:
+            return 1.0
+        if zoom <= self.fade_end_zoom:
+            return 0.0
+        return (zoom - self.fade_end_zoom) / (self.fade_start_zoom - self.fade_end_zoom)
+
+    def step_for_zoom(self, zoom):
+        step = self.spacing
+        for _ in range(self.max_thin_levels):
+            if step * zoom >= self.min_pitch_px:
+                break
+            step *= 2
+        return step
+
+    def _bucket(self, scale):
+        # arredonda o zoom pra não criar um tile novo a cada passinho
+        n = self.zoom_buckets_per_octave
+        return round(math.log2(scale) * n) / n
+
+    def tile_for(self, zoom, dpr=1.0):
+        scale = zoom * dpr
+        step = self.step_for_zoom(zoom)
+        bucket = self._bucket(scale)
+        alpha = round(self.opacity_for_zoom(zoom) * 32)
+        key = (step, bucket, alpha)
+
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+
+        tile = self._render_tile(step, 2 ** bucket, alpha / 32)
+        self._tiles[key] = tile
+        if len(self._tiles) > self.max_cached_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _render_tile(self, step, scale, opacity):
+        pitch = step * scale
+        cells = max(1, math.ceil(self.tile_target_px / pitch))
+        tile_scene = step * cells
+        size = max(1, round(tile_scene * scale))
+        # escala real depois do arredondamento, pra o tile repetir certinho
+        px_scale = size / tile_scene
+
+        if self.threaded:
+            pixmap = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+        else:
+            pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.transparent)
+
+        color = QColor(self.color)
+        color.setAlphaF(color.alphaF() * opacity)
+
+        r = max(self.radius * px_scale, 0.5)
+        p = QPainter(pixmap)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setPen(Qt.NoPen)
+        p.setBrush(color)
+        # pontos no meio da célula, o brush transform desloca meia célula de volta
+        for i in range(cells):
+            cx = (i * step + step / 2) * px_scale
+            for j in range(cells):
+                cy = (j * step + step / 2) * px_scale
+                p.drawEllipse(QRectF(cx - r, cy - r, r * 2, r * 2))
+        p.end()
+
+        return pixmap, tile_scene
+
+    def paint(self, painter: QPainter, rect: QRectF):
+        zoom = painter.worldTransform().m11()
+        if zoom <= 0 or self.opacity_for_zoom(zoom) <= 0:
+            return
+
+        device = painter.device()
+        dpr = device.devicePixelRatioF() if device is not None else 1.0
+
+        step = self.step_for_zoom(zoom)
+        pixmap, tile_scene = self.tile_for(zoom, dpr)
+
+        brush = QBrush(pixmap)
+        half = step / 2
+        k = tile_scene / pixmap.width()
+        brush.setTransform(QTransform(k, 0, 0, k, -half, -half))
+
+        painter.save()
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.fillRect(rect, brush)
+        painter.restore()
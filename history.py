@@ -0,0 +1,202 @@
+import sys
+import time
+from array import array
+
+# =========================
+# HISTORY (desfazer / refazer)
+# =========================
+# Cada ação vira um registro compacto, sem QGraphicsItem nenhum dentro:
+# mover 5000 cards é UM registro (ids + dx/dy), não 5000. Quem aplica os
+# registros é a CanvasScene; aqui só ficam as pilhas e os limites.
+#
+# Ações seguidas do mesmo tipo nos mesmos cards (arrastar de novo o mesmo
+# grupo, editar de novo o mesmo texto) dentro de COALESCE_SECONDS viram um
+# registro só.
+
+UNDO_DEPTH = 500
+UNDO_MAX_BYTES = 32 * 1024 * 1024
+COALESCE_SECONDS = 1.5
+
+# custo fixo estimado de cada registro (objeto + listas)
+_RECORD_OVERHEAD = 200
+
+
+def _ids(ids):
+    return ids if isinstance(ids, array) else array("I", ids)
+
+
+def _text_bytes(values):
+    return sum(sys.getsizeof(v) for v in values if v is not None)
+
+
+class MoveChange:
+    # o mesmo deslocamento pra todos os ids
+    def __init__(self, ids, dx, dy):
+        self.ids = _ids(ids)
+        self.dx = dx
+        self.dy = dy
+        self.time = time.monotonic()
+
+    def nbytes(self):
+        return _RECORD_OVERHEAD + self.ids.itemsize * len(self.ids)
+
+    def merge(self, other):
+        if not isinstance(other, MoveChange) or other.ids != self.ids:
+            return False
+        self.dx += other.dx
+        self.dy += other.dy
+        self.time = other.time
+        return True
+
+
+class CardsChange:
+    # cards criados (created=True) ou apagados, com tudo que precisa pra
+    # recriar: colunas iguais às do CardStore
+    def __init__(self, created, ids, kinds, xs, ys, ws, hs, contents):
+        self.created = created
+        self.ids = _ids(ids)
+        self.kinds = array("B", kinds)
+        self.xs = array("d", xs)
+        self.ys = array("d", ys)
+        self.ws = array("d", ws)
+        self.hs = array("d", hs)
+        self.contents = list(contents)
+        self.time = time.monotonic()
+
+    @classmethod
+    def from_store(cls, created, store, ids):
+        return cls(
+            created, ids,
+            [store.kinds[i] for i in ids],
+            [store.xs[i] for i in ids],
+            [store.ys[i] for i in ids],
+            [store.ws[i] for i in ids],
+            [store.hs[i] for i in ids],
+            [store.contents[i] for i in ids],
+        )
+
+    def nbytes(self):
+        n = len(self.ids)
+        return _RECORD_OVERHEAD + n * (4 + 1 + 8 * 4 + 8) + _text_bytes(self.contents)
+
+    def merge(self, other):
+        return False
+
+
+class ResizeChange:
+    def __init__(self, ids, old_ws, old_hs, ws, hs):
+        self.ids = _ids(ids)
+        self.old_ws = array("d", old_ws)
+        self.old_hs = array("d", old_hs)
+        self.ws = array("d", ws)
+        self.hs = array("d", hs)
+        self.time = time.monotonic()
+
+    def nbytes(self):
+        return _RECORD_OVERHEAD + len(self.ids) * (4 + 8 * 4)
+
+    def merge(self, other):
+        # arrastar a alça várias vezes: fica o tamanho de antes do primeiro
+        if not isinstance(other, ResizeChange) or other.ids != self.ids:
+            return False
+        self.ws = other.ws
+        self.hs = other.hs
+        self.time = other.time
+        return True
+
+
+class ContentChange:
+    def __init__(self, card_id, old, new):
+        self.card_id = card_id
+        self.old = old
+        self.new = new
+        self.time = time.monotonic()
+
+    def nbytes(self):
+        return _RECORD_OVERHEAD + _text_bytes((self.old, self.new))
+
+    def merge(self, other):
+        if not isinstance(other, ContentChange) or other.card_id != self.card_id:
+            return False
+        self.new = other.new
+        self.time = other.time
+        return True
+
+
+class UndoHistory:
+    def __init__(self, max_depth=UNDO_DEPTH, max_bytes=UNDO_MAX_BYTES, coalesce=COALESCE_SECONDS):
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.coalesce = coalesce
+
+        self._undo = []
+        self._redo = []
+        self.nbytes = 0
+        # sem juntar com o anterior (ex: logo depois de um undo)
+        self._sealed = True
+
+    def __len__(self):
+        return len(self._undo)
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self.nbytes = 0
+        self._sealed = True
+
+    def seal(self):
+        # o próximo push não junta com o último registro
+        self._sealed = True
+
+    def push(self, record):
+        self._drop(self._redo)
+
+        last = self._undo[-1] if self._undo else None
+        if (last is not None and not self._sealed
+                and record.time - last.time <= self.coalesce):
+            before = last.nbytes()
+            if last.merge(record):
+                self.nbytes += last.nbytes() - before
+                return
+
+        self._undo.append(record)
+        self.nbytes += record.nbytes()
+        self._sealed = False
+        self._trim()
+
+    def pop_undo(self):
+        if not self._undo:
+            return None
+        record = self._undo.pop()
+        self._redo.append(record)
+        self._sealed = True
+        return record
+
+    def pop_redo(self):
+        if not self._redo:
+            return None
+        record = self._redo.pop()
+        self._undo.append(record)
+        self._sealed = True
+        return record
+
+    def _drop(self, stack):
+        for record in stack:
+            self.nbytes -= record.nbytes()
+        stack.clear()
+
+    def _trim(self):
+        # joga fora os mais velhos; o último fica mesmo se sozinho passar do limite
+        drop = 0
+        while (len(self._undo) - drop > 1
+               and (len(self._undo) - drop > self.max_depth or self.nbytes > self.max_bytes)):
+            self.nbytes -= self._undo[drop].nbytes()
+            drop += 1
+        if drop:
+            del self._undo[:drop]
@@ -0,0 +1,161 @@
+import heapq
+import itertools
+import time
+
+from PySide6.QtCore import QObject, QTimer, Qt
+
+# =========================
+# IDLE SCHEDULER
+# =========================
+# Trabalho que tem que ser na thread da interface (criar item, indexar,
+# aquecer cache de desenho) sem travar frame. Cada tarefa é um gerador: faz
+# um pedacinho e dá yield. A cada volta do event loop o scheduler roda
+# pedaços até gastar TICK_BUDGET_MS e devolve o controle pro Qt pintar.
+#
+# Prioridade menor roda antes; empate = ordem de chegada. Tarefas marcadas
+# com view=True são canceladas quando a câmera mexe (o trabalho era pra
+# uma área que já não é a da tela), ver cancel_view_tasks.
+
+# por volta do loop; o resto do frame de 16 ms fica pro paint
+TICK_BUDGET_MS = 4.0
+# volta que passou disso do budget conta como estouro (pedaço grande demais)
+OVERRUN_SLACK = 1.25
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class IdleTask:
+    def __init__(self, name, steps, priority, view, on_done):
+        self.name = name
+        self.priority = priority
+        self.view = view
+        self.on_done = on_done
+        self.cancelled = False
+        self.finished = False
+        self._steps = steps
+
+    def cancel(self):
+        self.cancelled = True
+
+    def active(self):
+        return not self.cancelled and not self.finished
+
+
+class IdleScheduler(QObject):
+    def __init__(self, budget_ms=TICK_BUDGET_MS):
+        super().__init__()
+        self.budget = budget_ms / 1000
+        self._queue = []   # (prioridade, ordem, tarefa)
+        self._order = itertools.count()
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.slices = 0
+        self.ticks = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.overruns = 0
+        self.worst_tick_ms = 0.0
+        self.max_depth = 0
+
+    def depth(self):
+        return sum(1 for _, _, task in self._queue if task.active())
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "max_depth": self.max_depth,
+            "ticks": self.ticks,
+            "slices": self.slices,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "overruns": self.overruns,
+            "worst_tick_ms": round(self.worst_tick_ms, 2),
+        }
+
+    def submit(self, name, steps, priority=PRIORITY_NORMAL, view=False, on_done=None):
+        # steps: gerador; cada next() é um pedaço curto (bem menos que o budget)
+        task = IdleTask(name, steps, priority, view, on_done)
+        heapq.heappush(self._queue, (priority, next(self._order), task))
+        self.max_depth = max(self.max_depth, len(self._queue))
+        if not self._timer.isActive():
+            self._timer.start(0)
+        return task
+
+    def cancel_view_tasks(self):
+        for _, _, task in self._queue:
+            if task.view and task.active():
+                task.cancel()
+
+    def run_all(self):
+        # termina tudo agora (salvar, sair, testes)
+        while self._queue:
+            self._run(time.perf_counter() + 3600)
+        self._timer.stop()
+
+    def _tick(self):
+        start = time.perf_counter()
+        self._run(start + self.budget)
+        elapsed = time.perf_counter() - start
+
+        self.ticks += 1
+        if elapsed > self.budget * OVERRUN_SLACK:
+            self.overruns += 1
+        self.worst_tick_ms = max(self.worst_tick_ms, elapsed * 1000)
+        if not self._queue:
+            self._timer.stop()
+
+    def _run(self, deadline):
+        while self._queue:
+            task = self._queue[0][2]
+            if task.cancelled:
+                heapq.heappop(self._queue)
+                self.cancelled += 1
+                continue
+
+            try:
+                while True:
+                    before = time.perf_counter()
+                    next(task._steps)
+                    self.slices += 1
+                    # o próximo pedaço deve custar o mesmo que esse; se não
+                    # cabe no que sobrou, fica pra próxima volta
+                    now = time.perf_counter()
+                    if 2 * now - before >= deadline:
+                        return
+                    # chegou tarefa mais importante no meio, ou cancelaram
+                    if self._queue[0][2] is not task or task.cancelled:
+                        break
+            except StopIteration:
+                self.slices += 1
+                task.finished = True
+                self._remove(task)
+                self.completed += 1
+                if task.on_done is not None:
+                    task.on_done()
+                if time.perf_counter() >= deadline:
+                    return
+
+    def _remove(self, task):
+        queue = self._queue
+        if queue and queue[0][2] is task:
+            heapq.heappop(queue)
+        else:
+            self._queue = [entry for entry in queue if entry[2] is not task]
+            heapq.heapify(self._queue)
+
+
+_scheduler = None
+
+def idle_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = IdleScheduler()
+    return _scheduler
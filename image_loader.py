@@ -0,0 +1,282 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QFile, QIODevice, QSize, QStandardPaths, Signal, Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+from asset_pack import asset_pack, asset_key, split_ref
+from perf_hud import tracer
+
+# =========================
+# IMAGE LOADER
+# =========================
+# Imagens nunca são decodificadas na thread da interface: um QRunnable lê
+# já reduzida (QImageReader.setScaledSize) no tamanho do nível pedido, e
+# salva uma miniatura em disco pra próxima vez nem abrir o original.
+#
+# Imagem de asset pack ("asset:<digest>/nome", ver asset_pack.py) é lida
+# direto do arquivo do pack, com o QFile parado no começo do registro. O
+# cache em memória usa o digest: a mesma imagem em vários cards (ou com
+# nomes diferentes) decodifica e ocupa memória uma vez só.
+
+# lado maior de cada nível (tipo mipmap)
+MIP_LEVELS = (64, 256, 1024)
+
+# limite das miniaturas em disco e dos pixmaps em memória
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+# passou do limite: apaga até sobrar essa fração, pra não varrer a pasta
+# de novo na próxima miniatura
+DISK_CACHE_EVICT_TO = 0.9
+MEMORY_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def level_for_size(pixels):
+    # menor nível que cobre esse tamanho na tela
+    for level in MIP_LEVELS:
+        if level >= pixels:
+            return level
+    return MIP_LEVELS[-1]
+
+
+class ThumbnailCache:
+    # miniaturas em PNG numa pasta, com LRU pelo mtime do arquivo
+
+    def __init__(self, folder=None, max_bytes=DISK_CACHE_BYTES):
+        if folder is None:
+            base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+            folder = os.path.join(base or os.path.expanduser("~/.cache/infinityu"), "thumbs")
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+        # bytes na pasta, somados a cada put (None = ainda não contou); a
+        # pasta só é varrida quando passa do limite. put roda nas threads
+        # do loader e do export
+        self._total = None
+        self._lock = threading.Lock()
+
+    def key(self, path, level):
+        ref = split_ref(path)
+        if ref is not None:
+            # conteúdo não muda: o digest basta
+            return hashlib.sha1(f"asset|{ref[0]}|{level}".encode("utf-8")).hexdigest()
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{level}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.folder, key + ".png")
+
+    def get(self, key):
+        file = self._file(key)
+        if not os.path.exists(file):
+            return None
+        image = QImage(file)
+        if image.isNull():
+            return None
+        try:
+            os.utime(file)  # usado agora = fim da fila do LRU
+        except OSError:
+            pass
+        return image
+
+    def put(self, key, image):
+        # um .tmp por thread: o export pode gerar a mesma miniatura que o
+        # loader ao mesmo tempo
+        file = self._file(key)
+        tmp = f"{file}.{threading.get_ident()}.tmp"
+        if not image.save(tmp, "PNG"):
+            return
+        size = os.path.getsize(tmp)
+        try:
+            replaced = os.path.getsize(file)
+        except OSError:
+            replaced = 0
+        os.replace(tmp, file)
+
+        with self._lock:
+            if self._total is not None:
+                self._total += size - replaced
+            full = self._total is None or self._total > self.max_bytes
+        if full:
+            self.evict()
+
+    def evict(self):
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.folder):
+                if not entry.name.endswith(".png"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+            if total > self.max_bytes:
+                target = self.max_bytes * DISK_CACHE_EVICT_TO
+                entries.sort()
+                for _, size, path in entries:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    if total <= target:
+                        break
+            self._total = total
+
+
+class _DecodeJob(QRunnable):
+    def __init__(self, loader, path, level):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+        self.level = level
+
+    def run(self):
+        with tracer.span("decode image", "images", {"path": self.path, "level": self.level}):
+            image = decode_image(self.path, self.level, self.loader.disk_cache)
+        if image is None:
+            self.loader._finished.emit(self.path, self.level, None, None)
+            return
+
+        average = image.scaled(1, 1, Qt.IgnoreAspectRatio, Qt.SmoothTransformation).pixelColor(0, 0)
+        self.loader._finished.emit(self.path, self.level, image, average)
+
+
+def decode_image(path, level, cache=None):
+    # QImage com o lado maior <= level (ou None). Pode rodar em qualquer
+    # thread: o _DecodeJob usa, e o export (export.py) também
+    key = cache.key(path, level) if cache is not None else None
+    if key is not None:
+        image = cache.get(key)
+        if image is not None:
+            return image
+
+    reader, file = _open_reader(path)
+    if reader is None:
+        return None
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > level:
+        size.scale(QSize(level, level), Qt.KeepAspectRatio)
+        reader.setScaledSize(size)
+    image = reader.read()
+    if file is not None:
+        file.close()
+    if image.isNull():
+        return None
+
+    if key is not None:
+        cache.put(key, image)
+    return image
+
+
+def _open_reader(path):
+    # (QImageReader, QFile aberto ou None)
+    ref = split_ref(path)
+    if ref is None:
+        return QImageReader(path), None
+    pack = asset_pack()
+    where = pack.locate(ref[0]) if pack is not None else None
+    if where is None:
+        return None, None
+    file = QFile(where[0])
+    if not file.open(QIODevice.ReadOnly) or not file.seek(where[1]):
+        return None, None
+    return QImageReader(file), file
+
+
+class ImageLoader(QObject):
+    # path, nível, QPixmap (ou None se falhou), cor média
+    loaded = Signal(str, int, object, object)
+    _finished = Signal(str, int, object, object)
+
+    def __init__(self, disk_cache=None, parent=None):
+        super().__init__(parent)
+        self.disk_cache = disk_cache
+        self.pool = QThreadPool.globalInstance()
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._pending = set()
+        self._waiters = {}
+
+        self._finished.connect(self._on_finished)
+
+    def cached(self, path, level):
+        # (pixmap, cor média) se já está em memória
+        key = (asset_key(path), level)
+        hit = self._memory.get(key)
+        if hit is not None:
+            self._memory.move_to_end(key)
+        return hit
+
+    def best_cached(self, path, level):
+        # (nível, pixmap, cor média) mais perto do pedido, enquanto o certo não chega
+        for other in sorted(MIP_LEVELS, key=lambda l: abs(l - level)):
+            hit = self.cached(path, other)
+            if hit is not None:
+                return (other,) + hit
+        return None
+
+    def request(self, path, level, callback=None):
+        # callback(path, nível, pixmap, cor média) na thread da interface,
+        # com o path que foi pedido
+        key = (asset_key(path), level)
+        hit = self.cached(path, level)
+        if hit is not None:
+            if callback is not None:
+                callback(path, level, *hit)
+            return
+
+        if callback is not None:
+            # o mesmo card pedindo de novo enquanto decodifica: avisa uma vez
+            waiters = self._waiters.setdefault(key, [])
+            if (path, callback) not in waiters:
+                waiters.append((path, callback))
+        if key in self._pending:
+            return
+        self._pending.add(key)
+        self.pool.start(_DecodeJob(self, path, level))
+
+    def _on_finished(self, path, level, image, average):
+        key = (asset_key(path), level)
+        self._pending.discard(key)
+        waiters = self._waiters.pop(key, [])
+
+        if image is None:
+            for wanted, callback in waiters:
+                callback(wanted, level, None, None)
+            self.loaded.emit(path, level, None, None)
+            return
+
+        pixmap = QPixmap.fromImage(image)
+        size = pixmap.width() * pixmap.height() * 4
+
+        self._memory[key] = (pixmap, average)
+        self._memory_bytes += size
+        while self._memory_bytes > MEMORY_CACHE_BYTES and len(self._memory) > 1:
+            _, (old, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= old.width() * old.height() * 4
+
+        for wanted, callback in waiters:
+            callback(wanted, level, pixmap, average)
+        self.loaded.emit(path, level, pixmap, average)
+
+
+_loader = None
+
+def image_loader():
+    # um só por app, criado quando a primeira imagem aparece
+    global _loader
+    if _loader is None:
+        _loader = ImageLoader(ThumbnailCache())
+    return _loader
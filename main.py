@@ -1,24 +1,80 @@
 import sys, os
+import time
+
+# marcado antes dos imports pesados (PySide6) pro --profile-startup
+STARTUP_T0 = time.perf_counter()
+
+import gc
 import math
+import bisect
+from contextlib import contextmanager
 import random
 import json
 
 from app_info import *
+from grid import DotGrid, GRID_SIZE
+from camera import Camera
+from card_model import CardStore
+from viewport_backend import requested_backend, prepare_application, make_viewport, DEFAULT_BACKEND
+from history import UndoHistory, MoveChange, CardsChange, ResizeChange, ContentChange
+# imagem/áudio, asset pack, busca, minimapa e export só entram junto com o
+# canvas (ensure_canvas): importados dentro das funções que usam, a tela de
+# boas-vindas não espera por eles. paint_cache e perf_hud ficam aqui, estão
+# no paint de todo card
+from paint_cache import card_cache, scale_bucket, MAX_CACHE_SCALE
+from idle_scheduler import idle_scheduler, PRIORITY_NORMAL, PRIORITY_LOW
+from autosave import Autosaver
+from project_file import ProjectReader, ProjectWriter, ProjectFormatError, PROJECT_EXTENSION
+from perf_hud import PerfHud, frame_stats, tracer
 
 from pathlib import Path
 
 from enum import Enum, auto
 
+from collections import deque
+
 from datetime import datetime
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget,
     QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QGraphicsPixmapItem,
     QStackedWidget, QGraphicsView, QPinchGesture, QDialog, QFileDialog, QTabWidget,
-    QGraphicsScene, QGraphicsOpacityEffect, QFrame, QGraphicsItem, QGraphicsTextItem, QAbstractScrollArea, QGestureEvent, QPanGesture
+    QGraphicsScene, QGraphicsOpacityEffect, QFrame, QGraphicsItem, QGraphicsTextItem, QAbstractScrollArea, QGestureEvent, QPanGesture,
+    QStyleOptionGraphicsItem, QLineEdit, QProgressDialog
 )
-from PySide6.QtCore import Qt, QPropertyAnimation, QRectF, QTimer, QEvent
-from PySide6.QtGui import QFont, QPainter, QIcon, QPixmap, QFontDatabase, QColor
+from PySide6.QtCore import Qt, QPropertyAnimation, QRectF, QPointF, QLineF, QTimer, QEvent, Signal
+from PySide6.QtGui import (
+    QFont, QPainter, QIcon, QPixmap, QFontDatabase, QColor, QShortcut, QKeySequence, QPen,
+    QBrush, QTextDocument, QAbstractTextDocumentLayout, QPalette
+)
+
+# =========================
+# STARTUP PROFILE
+# =========================
+# python main.py --profile-startup mostra quanto tempo levou cada etapa da
+# abertura (imports, primeira tela, canvas pronto) e fecha o app no fim
+class StartupProfile:
+    def __init__(self, enabled, t0):
+        self.enabled = enabled
+        self.t0 = t0
+        self.marks = []
+
+    def mark(self, name):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter()))
+
+    def report(self):
+        if not self.enabled:
+            return
+        last = self.t0
+        print("startup:", file=sys.stderr)
+        for name, t in self.marks:
+            print(f"  {name:<22} {(t - self.t0) * 1000:8.1f} ms  (+{(t - last) * 1000:.1f})", file=sys.stderr)
+            last = t
+
+
+startup = StartupProfile("--profile-startup" in sys.argv, STARTUP_T0)
+startup.mark("imports")
 
 # =========================
 # stuff
@@ -95,10 +151,20 @@ class CardType(Enum):
     IMAGE = auto()
     AUDIO = auto()
 
+# o que o usuário está fazendo no canvas agora (usado pra escolher o modo de update)
+class Interaction(Enum):
+    IDLE = auto()
+    DRAG = auto()
+    PAN = auto()
+    ZOOM = auto()
+
 # =========================
 # WELCOME SCREEN
 # =========================
 class WelcomeScreen(QWidget):
+    # primeira vez que a tela foi pintada (o canvas só é montado depois disso)
+    first_frame = Signal()
+
     def __init__(self, on_create_project, parent=None):
         super().__init__(parent)
 
@@ -146,102 +212,718 @@ class WelcomeScreen(QWidget):
         root.addLayout(container)
         root.addStretch()
 
+        self._painted = False
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # deixa o frame terminar de sair antes de avisar
+            QTimer.singleShot(0, self.first_frame.emit)
+
 # =========================
 # CANVAS CARDS
 # =========================
+# itens filhos dos cards (texto/imagem) que somem quando o card está
+# pequeno demais na tela pra valer a pena desenhar o conteúdo
+class CardTextItem(QGraphicsTextItem):
+    def paint(self, painter, option, widget=None):
+        card = self.parentItem()
+        if card is not None:
+            # já saiu no pixmap do card
+            if card._from_cache:
+                return
+            lod = option.levelOfDetailFromTransform(painter.worldTransform())
+            if lod < card.lod_content:
+                return
+        super().paint(painter, option, widget)
+
+    # foco vai pro card (placeholder, fim da edição); override da classe em
+    # vez de trocar o método em cada instância
+    def focusInEvent(self, event):
+        card = self.parentItem()
+        if card is not None:
+            card.text_focus_in()
+        super().focusInEvent(event)
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        card = self.parentItem()
+        if card is not None:
+            card.text_focus_out()
+
+
+# =========================
+# ESTILO COMPARTILHADO
+# =========================
+# QFont("Segoe UI", 10) em cada card é uma busca de fallback de fonte no
+# Linux (lá não tem Segoe). Uma por (família, tamanho) pro app inteiro;
+# QFont é compartilhado implicitamente, passar pra frente não copia nada.
+# Cores, brushes e pens ficam prontos como atributo de classe dos cards.
+_fonts = {}
+
+def shared_font(family=None, size=-1):
+    key = (family, size)
+    font = _fonts.get(key)
+    if font is None:
+        # precisa do QApplication: criada no primeiro uso, não no import
+        font = QFont(family, size) if family else QFont()
+        _fonts[key] = font
+    return font
+
+
+def draw_text(painter, x, y, text, font, color, width=-1):
+    # texto como o QGraphicsTextItem desenharia (mesma margem de documento),
+    # sem item: pro export, que roda fora da thread da interface
+    doc = QTextDocument()
+    doc.setDefaultFont(font)
+    doc.setTextWidth(width)
+    doc.setPlainText(text)
+    context = QAbstractTextDocumentLayout.PaintContext()
+    context.palette.setColor(QPalette.Text, color)
+    painter.save()
+    painter.translate(x, y)
+    doc.documentLayout().draw(painter, context)
+    painter.restore()
+
+
+class CardPixmapItem(QGraphicsPixmapItem):
+    def paint(self, painter, option, widget=None):
+        card = self.parentItem()
+        if card is not None:
+            if card._from_cache:
+                return
+            # o LOD aqui já vem com o setScale do pixmap, volta pro do card
+            lod = option.levelOfDetailFromTransform(painter.worldTransform()) / self.scale()
+            if lod < card.lod_content:
+                return
+        super().paint(painter, option, widget)
+
+
+CARD_WIDTH = 220
+CARD_HEIGHT = 140
+# menor tamanho que a alça de redimensionar deixa
+CARD_MIN_WIDTH = 120
+CARD_MIN_HEIGHT = 75
+# canto de baixo à direita que vira alça de redimensionar (unidades da cena)
+RESIZE_HANDLE = 16
+
 class CanvasCard(QGraphicsItem):
-    def __init__(self, x, y, width=220, height=140):
+    card_type = None
+
+    # LOD = quantos pixels de tela por unidade da cena (1.0 = zoom 100%)
+    lod_flat = 0.35     # abaixo disso vira retângulo chapado sem antialiasing
+    lod_content = 0.45  # abaixo disso texto/imagem/etc não são desenhados
+
+    color = QColor("#333333")
+    frame_brush = QBrush(color)
+    frame_pen = QPen(color)
+
+    def __init__(self, x, y, width=CARD_WIDTH, height=CARD_HEIGHT):
         super().__init__()
         self.rect = QRectF(0, 0, width, height)
+        self._bounds = self.rect.adjusted(-6, -6, 6, 6)
+        self._content_visible = True
+        # frame atual saiu do pixmap cacheado (os filhos não se desenham)
+        self._from_cache = False
         self.setPos(x, y)
 
-        self.setFlag(QGraphicsItem.ItemIsMovable)
-        self.setFlag(QGraphicsItem.ItemIsSelectable)
-        self.setFlag(QGraphicsItem.ItemSendsGeometryChanges, True)
+        # id no CardStore da cena (None enquanto está no pool)
+        self.card_id = None
+
+        self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable
+                      | QGraphicsItem.ItemSendsGeometryChanges)
 
     def boundingRect(self):
-        return self.rect.adjusted(-6, -6, 6, 6)
+        return self._bounds
+
+    def set_size(self, width, height):
+        if width == self.rect.width() and height == self.rect.height():
+            return
+        self.prepareGeometryChange()
+        self.rect = QRectF(0, 0, width, height)
+        self._bounds = self.rect.adjusted(-6, -6, 6, 6)
+        self.layout_content()
+        self.invalidate_cache()
+        self.update()
+
+    def layout_content(self):
+        # filhos se ajustam ao tamanho novo do card
+        pass
+
+    def in_resize_handle(self, pos):
+        # pos em coordenadas do card
+        r = self.rect
+        return (r.right() - RESIZE_HANDLE <= pos.x() <= r.right()
+                and r.bottom() - RESIZE_HANDLE <= pos.y() <= r.bottom())
+
+    @classmethod
+    def lod_thresholds(cls):
+        # zooms em que o card muda de cara; a cena só chama update_lod
+        # quando o zoom cruza um deles
+        return (cls.lod_content,)
+
+    def update_lod(self, lod):
+        # esconde os filhos de vez (não só no paint), assim a cena nem
+        # percorre eles no zoom out
+        show = lod >= self.lod_content
+        if show != self._content_visible:
+            self._content_visible = show
+            for child in self.childItems():
+                child.setVisible(show)
+
+    @classmethod
+    def ask_content(cls):
+        # conteúdo inicial quando o usuário cria o card (ex: escolher arquivo)
+        return None
+
+    def load_content(self, content):
+        pass
+
+    def content(self):
+        return None
+
+    def recycle(self):
+        # saiu da cena e vai pro pool: volta pro estado de card novo (um
+        # card deletado selecionado voltava selecionado em outro lugar)
+        self.setSelected(False)
+        self._from_cache = False
+        self.release_content()
+
+    def release_content(self):
+        # solta o que pesa (pixmap, peaks); o próximo load_content troca o resto
+        self.load_content(None)
+
+    def text_focus_in(self):
+        pass
+
+    def text_focus_out(self):
+        pass
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemPositionChange:
-            grid = 15
+            grid = GRID_SIZE
             x = round(value.x() / grid) * grid
             y = round(value.y() / grid) * grid
             return value.__class__(x, y)
-        return super().itemChange(change, value)
+        if change == QGraphicsItem.ItemPositionHasChanged and self.card_id is not None:
+            scene = self.scene()
+            if scene is not None:
+                scene.card_moved(self)
+        # o do QGraphicsItem só devolve o valor; sem ida e volta pro C++ a
+        # cada addItem/removeItem/setSelected
+        return value
+
+    def block_color(self, lod):
+        return self.color
+
+    # =========================
+    # CACHE DE DESENHO
+    # =========================
+    # O card inteiro (fundo + filhos) vira um pixmap por faixa de zoom, ver
+    # paint_cache.py. A chave é o card_id do store, então o pixmap sobrevive
+    # ao card sair da tela e voltar em outro item do pool.
+    def cache_state(self):
+        # o que muda o desenho sem mudar o conteúdo do store
+        return self._content_visible
+
+    def editing(self):
+        return False
+
+    def invalidate_cache(self):
+        if self.card_id is not None:
+            card_cache().invalidate(self.card_id)
+
+    def _cache_key(self, scale, dpr):
+        return (self.card_id, scale, dpr, self.cache_state())
+
+    def warm_cache_steps(self, lod, dpr):
+        # gera o pixmap antes do card aparecer (idle_scheduler), em pedaços:
+        # fundo e cada filho num next() cada
+        cache = card_cache()
+        if (not cache.enabled or self.card_id is None or self.editing()
+                or lod < self.lod_flat or lod > MAX_CACHE_SCALE):
+            return
+        scale = scale_bucket(lod)
+        key = self._cache_key(scale, dpr)
+        if key in cache:
+            return
+        generation = cache.generation
+        pixmap = yield from self._render_steps(scale * dpr, cache.max_bytes)
+        # mudou no meio (imagem chegou, texto editado, item reciclado): o
+        # pixmap pode ter metade de cada, joga fora
+        if pixmap is not None and cache.generation == generation and self._cache_key(scale, dpr) == key:
+            cache.put(key, pixmap)
+
+    def _cached_pixmap(self, painter, lod):
+        cache = card_cache()
+        scale = scale_bucket(lod)
+        dpr = painter.device().devicePixelRatioF()
+        key = self._cache_key(scale, dpr)
+
+        pixmap = cache.get(key)
+        if pixmap is None:
+            if not cache.can_render():
+                return None
+            pixmap = self._render_cache(scale * dpr, cache.max_bytes)
+            if pixmap is None:
+                return None
+            cache.put(key, pixmap)
+        return pixmap
+
+    def _render_cache(self, scale, budget):
+        steps = self._render_steps(scale, budget)
+        try:
+            while True:
+                next(steps)
+        except StopIteration as done:
+            return done.value
+
+    def _render_steps(self, scale, budget):
+        # gerador: yield antes do fundo e de cada filho, devolve o pixmap
+        # (ou None) no fim. No paint roda direto, ver _render_cache
+        bounds = self._bounds
+        w = math.ceil(bounds.width() * scale)
+        h = math.ceil(bounds.height() * scale)
+        # um card sozinho não pode comer o orçamento
+        if w * h * 4 > budget // 8:
+            return None
+
+        pixmap = QPixmap(w, h)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        try:
+            painter.scale(w / bounds.width(), h / bounds.height())
+            painter.translate(-bounds.left(), -bounds.top())
+            yield
+
+            self._from_cache = False
+            self.paint_content(painter, scale)
+
+            option = QStyleOptionGraphicsItem()
+            for child in self.childItems():
+                if not child.isVisible():
+                    continue
+                yield
+                painter.save()
+                painter.translate(child.pos())
+                painter.scale(child.scale(), child.scale())
+                option.exposedRect = child.boundingRect()
+                child.paint(painter, option, None)
+                painter.restore()
+        finally:
+            # tarefa cancelada no meio também fecha o painter
+            painter.end()
+        return pixmap
 
     def paint(self, painter: QPainter, option, widget=None):
+        frame_stats.items += 1
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        if lod < self.lod_flat:
+            self._from_cache = False
+            painter.fillRect(self.rect, self.block_color(lod))
+            return
+
+        cache = card_cache()
+        if (cache.enabled and lod <= MAX_CACHE_SCALE
+                and self.card_id is not None and not self.editing()):
+            pixmap = self._cached_pixmap(painter, lod)
+            if pixmap is not None:
+                painter.setRenderHint(QPainter.SmoothPixmapTransform)
+                painter.drawPixmap(self._bounds, pixmap, QRectF(pixmap.rect()))
+                self._from_cache = True
+                return
+
+        self._from_cache = False
+        self.paint_content(painter, lod)
+
+    def paint_content(self, painter, lod):
+        # desenho de verdade (direto na tela ou no pixmap do cache)
+        self.paint_frame(painter, self.rect)
+
+    @classmethod
+    def paint_frame(cls, painter, rect):
         painter.setRenderHint(QPainter.Antialiasing)
-        painter.setBrush(QColor("#333333"))
-        painter.setPen(QColor("#333333"))
-        painter.drawRoundedRect(self.rect, 12, 12)
+        painter.setBrush(cls.frame_brush)
+        painter.setPen(cls.frame_pen)
+        painter.drawRoundedRect(rect, 12, 12)
+
+    # =========================
+    # EXPORT
+    # =========================
+    # O mesmo desenho sem item nenhum: o export (export.py) pinta tiles em
+    # QImage em várias threads, e QGraphicsItem/QPixmap são só da thread da
+    # interface. rect em coordenadas do mundo; assets entrega imagens e
+    # peaks já decodificados
+    @classmethod
+    def export_paint(cls, painter, rect, content, lod, assets):
+        if lod < cls.lod_flat:
+            painter.fillRect(rect, cls.export_block_color(content, assets))
+            return
+        cls.paint_frame(painter, rect)
+        if lod >= cls.lod_content:
+            cls.export_content(painter, rect, content, lod, assets)
+
+    @classmethod
+    def export_block_color(cls, content, assets):
+        return cls.color
+
+    @classmethod
+    def export_content(cls, painter, rect, content, lod, assets):
+        pass
 
 
 class TextCard(CanvasCard):
+    card_type = CardType.TEXT
+
+    text_color = QColor(230, 230, 230)
+    placeholder_color = QColor(150, 150, 150)
+    # sorteado uma vez por sessão: item reciclado de um card vazio pra
+    # outro já está mostrando o placeholder certo
+    placeholder_text = random.choice(PLACEHOLDER_TEXTS)
+
+    @staticmethod
+    def text_font():
+        return shared_font("Segoe UI", 10)
+
     def __init__(self, pos):
         super().__init__(pos.x(), pos.y())
-        self.text_item = QGraphicsTextItem(self)
+        self.text_item = CardTextItem(self)
         self.text_item.setTextInteractionFlags(Qt.TextEditorInteraction)
-        self.text_item.setDefaultTextColor(Qt.white)
+        # fonte e largura antes do texto: o documento é montado uma vez só
+        self.text_item.setFont(self.text_font())
         self.text_item.setTextWidth(self.rect.width() - 20)
         self.text_item.setPos(10, 10)
 
-        font = QFont("Segoe UI", 10)
-        self.text_item.setFont(font)
-
-        # placeholder
-        self.placeholder_text = random.choice(PLACEHOLDER_TEXTS)
         self.is_placeholder = True
         self._apply_placeholder()
 
-        self.text_item.focusInEvent = self._on_focus_in
-        self.text_item.focusOutEvent = self._on_focus_out
+        self.text_item.document().contentsChanged.connect(self._on_text_changed)
+
+    def _on_text_changed(self):
+        self.invalidate_cache()
+        # só digitação; load_content e placeholder também passam aqui
+        scene = self.scene()
+        if scene is not None and self.card_id is not None and self.editing():
+            scene.text_edited(self)
 
-    def _on_focus_in(self, event):
+    def text_focus_in(self):
         if self.is_placeholder:
             self.text_item.setPlainText("")
-            self.text_item.setDefaultTextColor(QColor(230, 230, 230))
+            self.text_item.setDefaultTextColor(self.text_color)
             self.is_placeholder = False
 
-    def _on_focus_out(self, event):
+    def text_focus_out(self):
         if not self.text_item.toPlainText().strip():
             self.is_placeholder = True
             self._apply_placeholder()
+        # o pixmap de antes da edição não vale mais
+        self.invalidate_cache()
+
+        # terminou de editar, manda o texto pro store
+        scene = self.scene()
+        if scene is not None and self.card_id is not None:
+            scene.card_content_changed(self)
+
+    def layout_content(self):
+        self.text_item.setTextWidth(self.rect.width() - 20)
+
+    def editing(self):
+        # cursor piscando e texto mudando: desenha direto
+        return self.text_item.hasFocus()
 
     def _apply_placeholder(self):
         self.text_item.setPlainText(self.placeholder_text)
-        self.text_item.setDefaultTextColor(QColor(150, 150, 150))
+        self.text_item.setDefaultTextColor(self.placeholder_color)
+
+    def load_content(self, text):
+        if text:
+            self.is_placeholder = False
+            self.text_item.setPlainText(text)
+            self.text_item.setDefaultTextColor(self.text_color)
+        elif not self.is_placeholder:
+            self.is_placeholder = True
+            self._apply_placeholder()
+
+    def release_content(self):
+        # o texto fica até o próximo load_content: trocar pro placeholder
+        # agora e pro texto novo depois é layout de documento à toa
+        pass
+
+    def content(self):
+        if self.is_placeholder:
+            return None
+        return self.text_item.toPlainText()
+
+    @classmethod
+    def export_content(cls, painter, rect, content, lod, assets):
+        # placeholder é dica de interface, não sai no export
+        if content:
+            painter.save()
+            painter.setClipRect(rect)
+            draw_text(painter, rect.left() + 10, rect.top() + 10, content,
+                      cls.text_font(), cls.text_color, rect.width() - 20)
+            painter.restore()
 
 
 class ImageCard(CanvasCard):
+    card_type = CardType.IMAGE
+
+    # imagem aguenta ficar pequena mais tempo que texto
+    lod_content = 0.2
+
+    loading_color = QColor("#3a3a3a")
+    loading_brush = QBrush(loading_color)
+
     def __init__(self, pos):
         super().__init__(pos.x(), pos.y())
+        self.average_color = None
+        self.image_item = None
+        self.file_path = None
+        self.image_level = None
+        self._lod = 1.0
+
+    @classmethod
+    def ask_content(cls):
         file_path, _ = QFileDialog.getOpenFileName(
             None, "Escolher imagem", "", "Images (*.png *.jpg *.jpeg *.bmp)"
         )
-        if not file_path:
+        return file_path or None
+
+    @classmethod
+    def lod_thresholds(cls):
+        # além de sumir, troca de nível de mipmap conforme o zoom
+        from image_loader import MIP_LEVELS
+        area = CARD_WIDTH - 20
+        return tuple(sorted((cls.lod_content,) + tuple(level / area for level in MIP_LEVELS[:-1])))
+
+    def content(self):
+        return self.file_path
+
+    def load_content(self, file_path):
+        self.file_path = file_path
+        self.image_level = None
+        self.average_color = None
+        if self.image_item is not None:
+            self.image_item.setPixmap(QPixmap())
+
+        if file_path:
+            self._request_image()
+        self.update()
+
+    def update_lod(self, lod):
+        super().update_lod(lod)
+        self._lod = lod
+        if self.file_path:
+            self._request_image()
+
+    def _wanted_level(self):
+        from image_loader import level_for_size
+        return level_for_size((self.rect.width() - 20) * self._lod)
+
+    def _request_image(self):
+        from image_loader import image_loader
+        level = self._wanted_level()
+        if level == self.image_level:
             return
 
-        pixmap = QPixmap(file_path)
-        self.image_item = QGraphicsPixmapItem(pixmap, self)
-        self.image_item.setPos(10, 10)
+        loader = image_loader()
+        if self.image_level is None:
+            # mostra qualquer nível que já esteja em memória enquanto espera
+            hit = loader.best_cached(self.file_path, level)
+            if hit is not None:
+                self._show_image(*hit)
+        loader.request(self.file_path, level, self._on_image_loaded)
+
+    def _on_image_loaded(self, path, level, pixmap, average):
+        if path != self.file_path or pixmap is None:
+            return
+        # chegou atrasado: só serve se ainda não tem nada na tela
+        if level != self._wanted_level() and self.image_level is not None:
+            return
+        self._show_image(level, pixmap, average)
+
+    def _show_image(self, level, pixmap, average):
+        self.image_level = level
+        self.average_color = average
+
+        if self.image_item is None:
+            self.image_item = CardPixmapItem(self)
+            self.image_item.setPos(10, 10)
+            self.image_item.setTransformationMode(Qt.SmoothTransformation)
+            self.image_item.setVisible(self._content_visible)
+        self.image_item.setPixmap(pixmap)
+        self.layout_content()
+        self.update()
+
+    def layout_content(self):
+        if self.image_item is None:
+            return
+        pixmap = self.image_item.pixmap()
+        if pixmap.isNull():
+            return
 
         # redimensionar para caber
-        self.image_item.setScale(
-            min(
-                (self.rect.width() - 20) / pixmap.width(),
-                (self.rect.height() - 20) / pixmap.height()
-            )
-        )
+        self.image_item.setScale(self.fit_scale(self.rect, pixmap.width(), pixmap.height()))
+
+    @staticmethod
+    def fit_scale(rect, width, height):
+        # imagem inteira dentro do card, 10 de margem
+        return min((rect.width() - 20) / width, (rect.height() - 20) / height)
+
+    def block_color(self, lod):
+        if self.average_color is not None and lod < self.lod_content:
+            return self.average_color
+        return self.color
+
+    def cache_state(self):
+        # nível de mipmap novo = pixmap novo, sem jogar os outros fora
+        return (self._content_visible, self.image_level)
+
+    def paint_content(self, painter, lod):
+        super().paint_content(painter, lod)
+
+        # ainda decodificando: um retângulo no lugar da imagem
+        if self.file_path and self.image_level is None:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.loading_brush)
+            painter.drawRoundedRect(self.rect.adjusted(10, 10, -10, -10), 8, 8)
+
+    @classmethod
+    def export_block_color(cls, content, assets):
+        from image_loader import MIP_LEVELS
+        hit = assets.image(content, MIP_LEVELS[0])
+        return hit[1] if hit is not None else cls.color
+
+    @classmethod
+    def export_content(cls, painter, rect, content, lod, assets):
+        from image_loader import level_for_size
+        hit = assets.image(content, level_for_size((rect.width() - 20) * lod))
+        if hit is None:
+            return
+        image = hit[0]
+        scale = cls.fit_scale(rect, image.width(), image.height())
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        painter.drawImage(QRectF(rect.left() + 10, rect.top() + 10,
+                                 image.width() * scale, image.height() * scale), image)
 
 
 class AudioCard(CanvasCard):
+    card_type = CardType.AUDIO
+
+    wave_color = QColor("#5b7cfa")
+    wave_pen = QPen(wave_color)
+
     def __init__(self, pos):
         super().__init__(pos.x(), pos.y())
-        self.label = QGraphicsTextItem("🎵 Audio", self)
+        self.label = CardTextItem("🎵 Audio", self)
         self.label.setDefaultTextColor(Qt.white)
         self.label.setPos(10, 10)
 
+        self.file_path = None
+        self.peaks = None
+        self.wave_rect = self.wave_area(self.rect)
+        self._wave_lines = (0, [])  # (colunas, linhas) do último desenho
+
+    @classmethod
+    def ask_content(cls):
+        file_path, _ = QFileDialog.getOpenFileName(
+            None, "Escolher áudio", "", "Audio (*.wav)"
+        )
+        return file_path or None
+
+    def content(self):
+        return self.file_path
+
+    def load_content(self, file_path):
+        from waveform import waveform_loader
+        self.file_path = file_path
+        self.peaks = None
+        self._wave_lines = (0, [])
+
+        self.label.setPlainText(self.label_text(file_path, None))
+        if file_path:
+            waveform_loader().request(file_path, self._on_peaks_loaded)
+        self.update()
+
+    @staticmethod
+    def label_text(file_path, peaks):
+        if not file_path:
+            return "🎵 Audio"
+        if peaks is None:
+            return f"🎵 {os.path.basename(file_path)}"
+        minutes, seconds = divmod(int(peaks.duration), 60)
+        return f"🎵 {os.path.basename(file_path)}  {minutes}:{seconds:02d}"
+
+    @staticmethod
+    def wave_area(rect):
+        return rect.adjusted(10, 45, -10, -10)
+
+    def layout_content(self):
+        self.wave_rect = self.wave_area(self.rect)
+        self._wave_lines = (0, [])
+
+    def release_content(self):
+        # o rótulo fica, o load_content do próximo card reescreve
+        self.file_path = None
+        self.peaks = None
+        self._wave_lines = (0, [])
+
+    def _on_peaks_loaded(self, path, peaks):
+        if path != self.file_path or peaks is None:
+            return
+        self.peaks = peaks
+
+        self.label.setPlainText(self.label_text(path, peaks))
+        self.invalidate_cache()
+        self.update()
+
+    def _lines_for(self, columns):
+        # a onda em "columns" colunas; só recalcula quando o zoom muda a largura
+        if self._wave_lines[0] == columns:
+            return self._wave_lines[1]
+
+        lines = self.wave_lines(self.peaks, self.wave_rect, columns)
+        self._wave_lines = (columns, lines)
+        return lines
+
+    @staticmethod
+    def wave_lines(peaks, r, columns):
+        mins, maxs = peaks.columns(columns)
+        mid = r.center().y()
+        half = r.height() / 2
+        step = r.width() / columns
+        return [
+            QLineF(r.left() + i * step, mid - maxs[i] * half, r.left() + i * step, mid - mins[i] * half)
+            for i in range(columns)
+        ]
+
+    def cache_state(self):
+        return (self._content_visible, self.peaks is not None)
+
+    def paint_content(self, painter, lod):
+        super().paint_content(painter, lod)
+
+        if self.peaks is None:
+            return
+        if lod < self.lod_content:
+            return
+
+        # uma linha por pixel de tela
+        columns = max(1, int(self.wave_rect.width() * lod))
+        painter.setPen(self.wave_pen)
+        painter.drawLines(self._lines_for(columns))
+
+    @classmethod
+    def export_content(cls, painter, rect, content, lod, assets):
+        peaks = assets.peaks(content) if content else None
+        draw_text(painter, rect.left() + 10, rect.top() + 10, cls.label_text(content, peaks), shared_font(), Qt.white)
+        if peaks is None:
+            return
+        area = cls.wave_area(rect)
+        painter.setPen(cls.wave_pen)
+        painter.drawLines(cls.wave_lines(peaks, area, max(1, int(area.width() * lod))))
+
 
 # Dicionário de integração com ToolsPanel
 CARD_CLASSES = {
@@ -250,33 +932,736 @@ CARD_CLASSES = {
     CardType.AUDIO: AudioCard,
 }
 
+# cards cujo conteúdo é um arquivo (busca pelo nome, asset pack)
+FILE_KINDS = (CardType.IMAGE.value, CardType.AUDIO.value)
+
+# quantos cards podem virar QGraphicsItem ao mesmo tempo; se a área da
+# tela tiver mais que isso vira "overview" e a cena desenha só blocos
+MAX_LIVE_CARDS = 2000
+# quanto materializar além da tela (fração do viewport de cada lado)
+MATERIALIZE_MARGIN = 0.5
+# itens reciclados guardados por tipo de card
+CARD_POOL_SIZE = 512
+# cards de texto criados no idle pro pool não estar vazio quando o usuário
+# cria ou cola vários de uma vez (item novo custa umas 3x um reciclado)
+CARD_POOL_WARM = 256
+# a partir de quantos itens entrando de uma vez vale desligar o índice
+BULK_INDEX_THRESHOLD = 64
+# seleção com pelo menos isso de cards arrasta como um bloco só
+GROUP_DRAG_MIN = 2
+# quanto tempo cada pedaço da indexação em segundo plano pode levar (s)
+INDEX_SLICE = 0.002
+# aquecer pixmaps da margem só enquanto o cache está abaixo disso (fração
+# do orçamento), pra não expulsar o que está na tela
+WARM_CACHE_FILL = 0.75
+
+
+class DragGroup(QGraphicsItem):
+    # pai temporário da seleção durante o arrasto em grupo: só ele anda a
+    # cada movimento do mouse, os cards ficam parados dentro dele
+    def __init__(self):
+        super().__init__()
+        self.setFlag(QGraphicsItem.ItemHasNoContents)
+        self.setZValue(1)
+
+    def boundingRect(self):
+        return QRectF()
+
+    def paint(self, painter, option, widget=None):
+        pass
+
+
 class CanvasScene(QGraphicsScene):
     def __init__(self):
+        from asset_pack import asset_importer
+        from search_index import SearchIndex
         super().__init__()
-        self.setSceneRect(-3000, -3000, 4000, 2000)
+        # ponto de partida, a câmera vai aumentando conforme precisa
+        self.setSceneRect(-3000, -3000, 6000, 6000)
+
+        # quanto o mundo já foi deslocado pelos rebases da câmera
+        # (posição "de verdade" = pos na cena + origin)
+        self.origin = QPointF(0, 0)
+
+        self.grid = DotGrid()
+
+        # zoom atual, pra cards novos já nascerem no nível de detalhe certo
+        self.lod = 1.0
+        self._lod_band = None
+
+        # todos os cards ficam no store; só os perto da tela viram item
+        self.store = CardStore()
+        self.live = {}
+        self._pool = {card_type: [] for card_type in CARD_CLASSES}
+
+        self.overview = False
+        self._live_rect = None
+        self._live_view_width = 0
+        self._area_ids = []
+        self._overview_rects = None
+        # última área visível (coords da cena) que a view mandou
+        self._view_rect = None
+        self._index_suspended = 0
+
+        # desfazer/refazer (ver history.py)
+        self.history = UndoHistory()
+
+        # busca no conteúdo de todos os cards (ver search_index.py)
+        self.search = SearchIndex(self.store, file_kinds=FILE_KINDS)
+        # card em destaque do resultado da busca (id ou None)
+        self.highlight_id = None
+        # trabalho em pedaços no idle_scheduler
+        self._index_task = None
+        self._margin_task = None
+        self._margin_ids = []
+        self._warm_task = None
+        self._pool_task = None
+        self.fill_pool_in_background()
+
+        # avisado quando o texto de um card muda durante a digitação (o
+        # store só recebe no fim da edição), ver autosave.py
+        self.on_edit = None
+
+        # arrasto em grupo em andamento (ver begin_group_drag)
+        self._drag_group = None
+
+        # imports que terminaram e ainda não foram pros cards: conteúdo
+        # antigo -> ref (ver apply_imports)
+        self._imported = {}
+        asset_importer().imported.connect(self._on_asset_imported)
+        self._drag_cards = []
 
     def create_card(self, pos, card_type=CardType.TEXT):
+        with tracer.span("create card", "cards", {"type": card_type.name}):
+            return self._create_card(pos, card_type)
+
+    def _create_card(self, pos, card_type):
         card_class = CARD_CLASSES.get(card_type)
         if not card_class:
             return
-        card = card_class(pos)
+        content = self._import(card_type.value, card_class.ask_content())
+
+        grid = GRID_SIZE
+        world = pos + self.origin
+        x = round(world.x() / grid) * grid
+        y = round(world.y() / grid) * grid
+
+        card_id = self.store.add(card_type.value, x, y, CARD_WIDTH, CARD_HEIGHT, content)
+        self.history.push(CardsChange.from_store(True, self.store, [card_id]))
+        return self._materialize(card_id)
+
+    def create_cards(self, records):
+        # vários cards de uma vez (importar, colar): records = (pos, tipo,
+        # conteúdo). Vai tudo pro store numa passada só e depois só os que
+        # estão perto da tela viram item. Não pergunta conteúdo pro usuário.
+        with tracer.span("create cards", "cards", {"count": len(records)}):
+            return self._create_cards(records)
+
+    def _create_cards(self, records):
+        grid = GRID_SIZE
+        ox, oy = self.origin.x(), self.origin.y()
+        kinds, xs, ys, contents = [], [], [], []
+        for pos, card_type, content in records:
+            if card_type not in CARD_CLASSES:
+                continue
+            kinds.append(card_type.value)
+            xs.append(round((pos.x() + ox) / grid) * grid)
+            ys.append(round((pos.y() + oy) / grid) * grid)
+            contents.append(self._import(card_type.value, content))
+
+        n = len(kinds)
+        ids = self.store.add_many(kinds, xs, ys, [CARD_WIDTH] * n, [CARD_HEIGHT] * n, contents)
+        if ids:
+            self.history.push(CardsChange.from_store(True, self.store, ids))
+
+        self._refresh_live()
+        self.index_in_background()
+        return ids
+
+    # =========================
+    # ASSETS
+    # =========================
+    # Com projeto salvo, imagem/áudio novo vai pro asset pack e o card guarda
+    # a ref (ver asset_pack.py). O import roda fora da thread da interface:
+    # o card nasce com o caminho e troca pra ref quando termina
+    def _import(self, kind, content):
+        from asset_pack import asset_pack, asset_importer, needs_import
+        pack = asset_pack()
+        if pack is not None and kind in FILE_KINDS and needs_import(pack, content):
+            asset_importer().request(pack, content)
+        return content
+
+    def import_assets(self, pack, source=None):
+        # todo caminho solto vira ref em "pack" (primeiro save, salvar como
+        # em outra pasta, projeto antigo). Até terminar, ref que ainda não
+        # chegou no pack novo é lida do antigo (pack.fallback)
+        from asset_pack import asset_importer, needs_import
+        importer = asset_importer()
+        kinds, contents = self.store.kinds, self.store.contents
+        seen = set()
+        for card_id in self.store.ids():
+            content = contents[card_id]
+            if kinds[card_id] not in FILE_KINDS or content in seen:
+                continue
+            seen.add(content)
+            if needs_import(pack, content):
+                importer.request(pack, content, source)
+
+    def _on_asset_imported(self, pack, old, new):
+        from asset_pack import asset_pack
+        if pack is not asset_pack() or new == old:
+            return
+        # vários imports terminando juntos viram uma passada só no store
+        if not self._imported:
+            QTimer.singleShot(0, self.apply_imports)
+        self._imported[old] = new
+
+    def apply_imports(self):
+        # troca caminho -> ref nos cards. Fora do histórico: o card mostra a
+        # mesma coisa de antes
+        swaps, self._imported = self._imported, {}
+        if not swaps:
+            return
+        store = self.store
+        kinds, contents = store.kinds, store.contents
+        for card_id in store.ids():
+            content = swaps.get(contents[card_id])
+            if content is None or kinds[card_id] not in FILE_KINDS:
+                continue
+            store.set_content(card_id, content)
+            card_cache().invalidate(card_id)
+            card = self.live.get(card_id)
+            if card is not None:
+                card.load_content(content)
+
+    def delete_card(self, card_id):
+        self.delete_cards([card_id])
+
+    def delete_cards(self, ids):
+        ids = [card_id for card_id in ids if card_id in self.store]
+        if not ids:
+            return
+        # texto em edição vai pro store antes de guardar no histórico
+        for card_id in ids:
+            card = self.live.get(card_id)
+            if card is not None:
+                self.store.set_content(card_id, card.content())
+        self.history.push(CardsChange.from_store(False, self.store, ids))
+        self._remove_ids(ids)
+
+    def resize_cards(self, ids, ws, hs):
+        store = self.store
+        record = ResizeChange(ids, [store.ws[i] for i in ids], [store.hs[i] for i in ids], ws, hs)
+        self._resize_ids(ids, ws, hs)
+        self.history.push(record)
+
+    def record_move(self, ids, dx, dy):
+        # o item já andou (arrasto normal do Qt); só entra no histórico
+        if ids and (dx or dy):
+            self.history.push(MoveChange(ids, dx, dy))
+
+    def card_moved(self, card):
+        world = card.pos() + self.origin
+        self.store.move(card.card_id, world.x(), world.y())
+        self._overview_rects = None
+
+    def move_cards(self, cards, dx, dy):
+        # move vários de uma vez; cada card ainda passa pelo itemChange
+        # (snap + store), mas o índice só é refeito no fim
+        if not dx and not dy:
+            return
+        with self.deferred_index():
+            for card in cards:
+                card.moveBy(dx, dy)
+        self._overview_rects = None
+        self.record_move([card.card_id for card in cards if card.card_id is not None], dx, dy)
+
+    # =========================
+    # ARRASTO EM GRUPO
+    # =========================
+    def begin_group_drag(self, cards):
+        self.suspend_index()
+        group = DragGroup()
+        self.addItem(group)
+        for card in cards:
+            card.setParentItem(group)
+        self._drag_group = group
+        self._drag_cards = cards
+
+    def drag_group_to(self, dx, dy):
+        # dx/dy já vêm com snap, calculado uma vez pra seleção inteira
+        self._drag_group.setPos(dx, dy)
+
+    def end_group_drag(self):
+        group, cards = self._drag_group, self._drag_cards
+        offset = group.pos()
+        self._drag_group = None
+        self._drag_cards = []
+
+        # sair do grupo volta pra posição de antes; o deslocamento é
+        # aplicado numa passada só
+        for card in cards:
+            card.setParentItem(None)
+        self.removeItem(group)
+        self.move_cards(cards, offset.x(), offset.y())
+        self.resume_index()
+        return cards, offset
+
+    def card_content_changed(self, card):
+        # chamado quando termina de editar: a sessão de digitação inteira
+        # vira um registro só no histórico
+        old = self.store.contents[card.card_id]
+        new = card.content()
+        if old == new:
+            return
+        self.store.set_content(card.card_id, new)
+        self.history.push(ContentChange(card.card_id, old, new))
+
+    # =========================
+    # DESFAZER / REFAZER
+    # =========================
+    def undo(self):
+        record = self.history.pop_undo()
+        if record is not None:
+            self._apply(record, reverse=True)
+        return record is not None
+
+    def redo(self):
+        record = self.history.pop_redo()
+        if record is not None:
+            self._apply(record, reverse=False)
+        return record is not None
+
+    def _apply(self, record, reverse):
+        if isinstance(record, MoveChange):
+            sign = -1 if reverse else 1
+            self._move_ids(record.ids, record.dx * sign, record.dy * sign)
+        elif isinstance(record, CardsChange):
+            # desfazer criação = apagar, desfazer exclusão = recriar
+            if record.created != reverse:
+                self.store.restore(record.ids, record.kinds, record.xs, record.ys,
+                                   record.ws, record.hs, record.contents)
+                self._refresh_live()
+            else:
+                self._remove_ids(record.ids)
+        elif isinstance(record, ResizeChange):
+            if reverse:
+                self._resize_ids(record.ids, record.old_ws, record.old_hs)
+            else:
+                self._resize_ids(record.ids, record.ws, record.hs)
+        elif isinstance(record, ContentChange):
+            content = record.old if reverse else record.new
+            self.store.set_content(record.card_id, content)
+            card_cache().invalidate(record.card_id)
+            card = self.live.get(record.card_id)
+            if card is not None:
+                card.load_content(content)
+
+    def _move_ids(self, ids, dx, dy):
+        # O(n) direto nas colunas; só os cards vivos mexem em item
+        store, live = self.store, self.live
+        xs, ys = store.xs, store.ys
+        with self.deferred_index():
+            for card_id in ids:
+                store.move(card_id, xs[card_id] + dx, ys[card_id] + dy)
+                card = live.get(card_id)
+                if card is not None:
+                    card.moveBy(dx, dy)
+        self._refresh_live()
+
+    def _remove_ids(self, ids):
+        cache = card_cache()
+        with self.deferred_index():
+            for card_id in ids:
+                if card_id in self.live:
+                    self._dematerialize(card_id)
+                self.store.remove(card_id)
+                # o id pode voltar pra outro card
+                cache.invalidate(card_id)
+        self._refresh_live()
+
+    def _resize_ids(self, ids, ws, hs):
+        cache = card_cache()
+        for j, card_id in enumerate(ids):
+            self.store.resize(card_id, ws[j], hs[j])
+            cache.invalidate(card_id)
+            card = self.live.get(card_id)
+            if card is not None:
+                card.set_size(ws[j], hs[j])
+        self._refresh_live()
+
+    def _refresh_live(self):
+        # o store mudou por fora da câmera: refaz a área materializada
+        self._live_rect = None
+        self._overview_rects = None
+        if self._view_rect is not None:
+            self.update_viewport(self._view_rect)
+
+    def unsaved_edits(self):
+        # texto que ainda está sendo editado não foi pro store; fica de fora
+        # dele até a edição terminar pra virar um registro só no histórico
+        contents = self.store.contents
+        edits = {}
+        for card_id, card in self.live.items():
+            if card.editing():
+                content = card.content()
+                if content != contents[card_id]:
+                    edits[card_id] = content
+        return edits
+
+    def text_edited(self, card):
+        if self.on_edit is not None:
+            self.on_edit()
+
+    def load_project(self, reader):
+        if self._margin_task is not None:
+            self._margin_task.cancel()
+            self._margin_task = None
+        idle_scheduler().cancel_view_tasks()
+        for card_id in list(self.live):
+            self._dematerialize(card_id)
+
+        self.origin = QPointF(0, 0)
+        self._live_rect = None
+        self._area_ids = []
+        self._overview_rects = None
+        self.overview = False
+        self.history.clear()
+        card_cache().clear()
+        self.highlight_id = None
+        self._imported = {}
+
+        meta = reader.load_into(self.store)
+        self.index_in_background()
+        return meta
+
+    # =========================
+    # VIRTUALIZAÇÃO
+    # =========================
+    def _materialize(self, card_id):
+        t0 = time.perf_counter()
+        kind, x, y, w, h, content = self.store.get(card_id)
+        card_type = CardType(kind)
+
+        pool = self._pool[card_type]
+        pooled = bool(pool)
+        card = pool.pop() if pooled else CARD_CLASSES[card_type](QPointF(0, 0))
+
+        card.setPos(QPointF(x, y) - self.origin)
+        card.set_size(w, h)
+        card.update_lod(self.lod)
+        card.load_content(content)
+        card.card_id = card_id
+
         self.addItem(card)
+        self.live[card_id] = card
+        if tracer.recording:
+            tracer.add("materialize", "cards", t0, time.perf_counter(), {"id": card_id, "pool": pooled})
+        return card
+
+    def _dematerialize(self, card_id):
+        card = self.live.pop(card_id)
+        self.store.set_content(card_id, card.content())
+
+        self.removeItem(card)
+        card.card_id = None
+
+        pool = self._pool[card.card_type]
+        if len(pool) < CARD_POOL_SIZE:
+            card.recycle()
+            pool.append(card)
+
+    def _is_pinned(self, card):
+        # selecionado, arrastando ou editando: não recicla
+        if card.isSelected():
+            return True
+        focus = self.focusItem()
+        return focus is not None and focus.topLevelItem() is card
+
+    def suspend_index(self):
+        # muita coisa entrando/saindo/andando: sem índice no meio do caminho
+        # e o BSP é montado uma vez só no resume_index
+        self._index_suspended += 1
+        if self._index_suspended == 1:
+            self.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+    def resume_index(self):
+        self._index_suspended -= 1
+        if self._index_suspended == 0:
+            self.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+
+    @contextmanager
+    def deferred_index(self):
+        self.suspend_index()
+        try:
+            yield
+        finally:
+            self.resume_index()
+
+    def update_viewport(self, rect):
+        # rect = área visível em coordenadas da cena
+        self._view_rect = QRectF(rect)
+        world = rect.translated(self.origin)
+
+        if (self._live_rect is not None
+                and self._live_rect.contains(world)
+                and world.width() > self._live_view_width * 0.66):
+            # mesma área; o aquecimento (se foi cancelado) volta pra fila
+            task = self._margin_task
+            if task is None or task.finished:
+                self.warm_in_background()
+            elif task.active():
+                # zoom out/pan pra dentro da margem que o idle ainda não
+                # criou: o que já está na tela não espera (senão o frame sai
+                # sem esses cards e o idle repinta tudo de novo)
+                self._materialize_visible(self._margin_ids, world)
+            return
 
-    def drawBackground(self, painter, rect):
-         super().drawBackground(painter, rect)
+        mx = world.width() * MATERIALIZE_MARGIN
+        my = world.height() * MATERIALIZE_MARGIN
+        area = world.adjusted(-mx, -my, mx, my)
+        self._live_rect = area
+        self._live_view_width = world.width()
+        # margem da área antiga que ainda não tinha sido criada: a conta
+        # abaixo já inclui o que continuar valendo
+        if self._margin_task is not None:
+            self._margin_task.cancel()
+            self._margin_task = None
+
+        ids = self.store.query(area.left(), area.top(), area.right(), area.bottom())
+        overview = len(ids) > MAX_LIVE_CARDS
+        wanted = set() if overview else set(ids)
+
+        for card_id in list(self.live):
+            if card_id not in wanted and not self._is_pinned(self.live[card_id]):
+                self._dematerialize(card_id)
+
+        # o que está na tela entra agora; a margem fica pro idle
+        xs, ys, ws, hs = self.store.xs, self.store.ys, self.store.ws, self.store.hs
+        left, top, right, bottom = world.left(), world.top(), world.right(), world.bottom()
+        visible, margin = [], []
+        for card_id in wanted:
+            if card_id in self.live:
+                continue
+            if (xs[card_id] < right and xs[card_id] + ws[card_id] > left
+                    and ys[card_id] < bottom and ys[card_id] + hs[card_id] > top):
+                visible.append(card_id)
+            else:
+                margin.append(card_id)
+
+        if len(visible) > BULK_INDEX_THRESHOLD:
+            with self.deferred_index():
+                for card_id in visible:
+                    self._materialize(card_id)
+        else:
+            for card_id in visible:
+                self._materialize(card_id)
+
+        if wanted:
+            center = world.center()
+            self._margin_ids = margin
+            self._margin_task = idle_scheduler().submit(
+                "margem do viewport", self._margin_steps(margin, center.x(), center.y()),
+                PRIORITY_NORMAL, on_done=self.warm_in_background)
+
+        self._area_ids = ids if overview else []
+        self._overview_rects = None
+        if overview or overview != self.overview:
+            self.overview = overview
+            self.update()
+        self.fill_pool_in_background()
+
+    def fill_pool_in_background(self):
+        task = self._pool_task
+        if len(self._pool[CardType.TEXT]) < CARD_POOL_WARM and (task is None or not task.active()):
+            self._pool_task = idle_scheduler().submit("pool de cards", self._pool_steps(), PRIORITY_LOW)
+
+    def _pool_steps(self):
+        pool = self._pool[CardType.TEXT]
+        while len(pool) < CARD_POOL_WARM:
+            pool.append(TextCard(QPointF(0, 0)))
+            yield
+
+    def _materialize_visible(self, ids, world):
+        store = self.store
+        xs, ys, ws, hs = store.xs, store.ys, store.ws, store.hs
+        left, top, right, bottom = world.left(), world.top(), world.right(), world.bottom()
+        for card_id in ids:
+            if (card_id not in self.live and card_id in store
+                    and xs[card_id] < right and xs[card_id] + ws[card_id] > left
+                    and ys[card_id] < bottom and ys[card_id] + hs[card_id] > top):
+                self._materialize(card_id)
+
+    def _margin_steps(self, ids, cx, cy):
+        # perto do centro primeiro: é o que aparece antes se a câmera andar
+        store = self.store
+        ids.sort(key=lambda i: abs(store.xs[i] + store.ws[i] / 2 - cx) + abs(store.ys[i] + store.hs[i] / 2 - cy))
+        for card_id in ids:
+            if card_id in store and card_id not in self.live:
+                pool = self._pool[CardType(store.kinds[card_id])]
+                if not pool:
+                    # item novo do Qt custa mais que o resto junto: um
+                    # pedaço só pra ele, o _materialize pega do pool
+                    pool.append(CARD_CLASSES[CardType(store.kinds[card_id])](QPointF(0, 0)))
+                    yield
+                    if card_id not in store or card_id in self.live:
+                        continue
+                self._materialize(card_id)
+                yield
+
+    def warm_in_background(self):
+        # com a margem criada, já deixa os pixmaps prontos (ver paint_cache.py).
+        # Depende do zoom e de onde a câmera está, então é tarefa de view:
+        # mexeu, cancela, e o próximo update_viewport agenda de novo
+        views = self.views()
+        task = self._warm_task
+        if not views or self.overview or not card_cache().enabled or (task is not None and task.active()):
+            return
+        self._warm_task = idle_scheduler().submit("aquecer cache", self._warm_steps(views[0].viewport().devicePixelRatioF()),
+                                PRIORITY_LOW, view=True)
+
+    def _warm_steps(self, dpr):
+        cache = card_cache()
+        center = self._view_rect.center()
+        ox, oy = center.x(), center.y()
+        cards = sorted(self.live.values(),
+                       key=lambda c: abs(c.x() + c.rect.width() / 2 - ox) + abs(c.y() + c.rect.height() / 2 - oy))
+        for card in cards:
+            if card.scene() is not self:
+                continue
+            if cache.bytes > cache.max_bytes * WARM_CACHE_FILL:
+                return
+            yield from card.warm_cache_steps(self.lod, dpr)
+            yield
+
+    def materialize_at(self, pos):
+        # clique no overview: cria o item só do card embaixo do mouse
+        world = pos + self.origin
+        hits = self.store.query_point(world.x(), world.y())
+        if not hits:
+            return None
+
+        card_id = hits[-1]
+        if card_id not in self.live:
+            self._materialize(card_id)
+            self._overview_rects = None
+        return self.live[card_id]
+
+    def _draw_overview(self, painter, rect):
+        if self._overview_rects is None:
+            store = self.store
+            ox, oy = self.origin.x(), self.origin.y()
+            self._overview_rects = [
+                QRectF(store.xs[i] - ox, store.ys[i] - oy, store.ws[i], store.hs[i])
+                for i in self._area_ids
+                if i not in self.live and i in store
+            ]
+
+        painter.save()
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(CanvasCard.frame_brush)
+        painter.drawRects(self._overview_rects)
+        painter.restore()
+
+    def set_lod(self, lod):
+        self.lod = lod
+
+        # só percorre os cards quando o zoom cruza algum limite
+        band = tuple(bisect.bisect_right(cls.lod_thresholds(), lod) for cls in CARD_CLASSES.values())
+        if band == self._lod_band:
+            return
+        self._lod_band = band
+
+        for card in self.live.values():
+            card.update_lod(lod)
+
+    def rebase(self, dx, dy):
+        # origin primeiro: assim a posição no store não muda quando os
+        # itens andam
+        self.origin += QPointF(dx, dy)
+        self._live_rect = None
+        self._overview_rects = None
 
-         grid = 15
-         radius = 1.2
+        # traz tudo de volta pra perto de 0,0 sem reindexar item por item
+        with self.deferred_index():
+            for item in self.items():
+                if item.parentItem() is None:
+                    item.moveBy(-dx, -dy)
 
-         painter.setPen(Qt.NoPen)
-         painter.setBrush(QColor(141, 141, 141, 41))  # que número malvado
+    # =========================
+    # BUSCA
+    # =========================
+    def find(self, query, limit=None):
+        # texto em edição ainda não foi pro store
+        focus = self.focusItem()
+        if focus is not None and isinstance(focus.topLevelItem(), CanvasCard):
+            card = focus.topLevelItem()
+            if card.card_id is not None:
+                self.store.set_content(card.card_id, card.content())
+        return self.search.search(query, limit, FIND_INDEX_BUDGET)
+
+    def index_in_background(self):
+        task = self._index_task
+        if self.search.pending() and (task is None or not task.active()):
+            self._index_task = idle_scheduler().submit(
+                "índice de busca", self._index_steps(), PRIORITY_LOW)
+
+    def _index_steps(self):
+        while not self.search.flush(time.perf_counter() + INDEX_SLICE):
+            yield
+
+    def card_rect(self, card_id):
+        # retângulo do card em coordenadas da cena
+        store = self.store
+        return QRectF(store.xs[card_id] - self.origin.x(), store.ys[card_id] - self.origin.y(),
+                      store.ws[card_id], store.hs[card_id])
+
+    def set_highlight(self, card_id):
+        if card_id == self.highlight_id:
+            return
+        for old in (self.highlight_id, card_id):
+            if old is not None and old in self.store:
+                self.update(self.card_rect(old).adjusted(-8, -8, 8, 8))
+        self.highlight_id = card_id
+
+    def drawForeground(self, painter, rect):
+        card_id = self.highlight_id
+        if card_id is None or card_id not in self.store:
+            return
+        box = self.card_rect(card_id).adjusted(-3, -3, 3, 3)
+        if not box.intersects(rect):
+            return
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        pen = QPen(FindBar.highlight_color, 3)
+        pen.setCosmetic(True)
+        painter.setPen(pen)
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(box, 14, 14)
+        painter.restore()
+
+    def theme_changed(self):
+        # cores/fontes mudaram: nenhum pixmap cacheado serve mais
+        card_cache().clear()
+        self.update()
+
+    def fit_world(self, rect):
+        # sceneRect justo = BSP bem dividido
+        bounds = self.itemsBoundingRect()
+        if not bounds.isNull():
+            rect = rect.united(bounds)
+        self.setSceneRect(rect)
+
+    def drawBackground(self, painter, rect):
+         t0 = time.perf_counter()
+         super().drawBackground(painter, rect)
 
-         left = int(rect.left()) - (int(rect.left()) % grid)
-         top = int(rect.top()) - (int(rect.top()) % grid)
+         # tile cacheado por zoom/dpi, ver grid.py
+         self.grid.paint(painter, rect)
 
-         for x in range(left, int(rect.right()), grid):
-             for y in range(top, int(rect.bottom()), grid):
-                 painter.drawEllipse(x - radius, y - radius, radius * 2, radius * 2)
+         if self.overview:
+             self._draw_overview(painter, rect)
+         frame_stats.background += time.perf_counter() - t0
 
 class FloatingButton(QPushButton):
     def __init__(self, text, parent=None):
@@ -300,16 +1685,95 @@ class FloatingButton(QPushButton):
             }
         """)
 
+# =========================
+# VIEWPORT UPDATES
+# =========================
+
+# adaptativo: só o pedaço que mudou enquanto arrasta/edita card,
+# tela cheia quando tudo se mexe (pan/zoom)
+INTERACTION_UPDATE_MODES = {
+    Interaction.IDLE: QGraphicsView.MinimalViewportUpdate,
+    Interaction.DRAG: QGraphicsView.BoundingRectViewportUpdate,
+    Interaction.PAN: QGraphicsView.FullViewportUpdate,
+    Interaction.ZOOM: QGraphicsView.FullViewportUpdate,
+}
+
+class DamageTracker:
+    # quanto do viewport foi repintado em cada frame
+    def __init__(self, history=240):
+        self.frames = 0
+        self.total_area = 0
+        self.total_viewport_area = 0
+        self.last_area = 0
+        self.last_fraction = 0.0
+        self.history = deque(maxlen=history)
+
+    def record(self, region, viewport_size):
+        area = sum(r.width() * r.height() for r in region)
+        full = max(1, viewport_size.width() * viewport_size.height())
+
+        self.frames += 1
+        self.last_area = area
+        self.last_fraction = min(1.0, area / full)
+        self.total_area += area
+        self.total_viewport_area += full
+        self.history.append(self.last_fraction)
+
+    def average_fraction(self):
+        if not self.total_viewport_area:
+            return 0.0
+        return self.total_area / self.total_viewport_area
+
+    def recent_fraction(self):
+        if not self.history:
+            return 0.0
+        return sum(self.history) / len(self.history)
+
+    def reset(self):
+        self.frames = 0
+        self.total_area = 0
+        self.total_viewport_area = 0
+        self.last_area = 0
+        self.last_fraction = 0.0
+        self.history.clear()
+
+    def summary(self):
+        return (
+            f"{self.frames} frames, último {self.last_fraction:.1%}, "
+            f"média {self.average_fraction():.1%} do viewport repintado"
+        )
+
 class CanvasView(QGraphicsView):
     def __init__(self):
+        from minimap import Minimap
+        from export import Exporter
         super().__init__()
 
         self.scene = CanvasScene()
         self.setScene(self.scene)
 
-        self.setRenderHint(QPainter.Antialiasing)
-        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
-        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        # raster até alguém pedir outro (set_backend)
+        self.backend = "raster"
+
+        # cards ligam antialiasing no próprio paint, e o grid já vem pronto
+        # do tile, então não precisa ligar pro viewport inteiro
+
+        # pan/zoom passam pela câmera (ela que cuida do anchor)
+        self.setTransformationAnchor(QGraphicsView.NoAnchor)
+        self.setResizeAnchor(QGraphicsView.NoAnchor)
+        self.camera = Camera(self)
+        self.camera.on_change = self._on_camera_changed
+
+        # modo de update
+        self.adaptive_updates = True
+        self.interaction = Interaction.IDLE
+        self.damage = DamageTracker()
+        self.setViewportUpdateMode(INTERACTION_UPDATE_MODES[Interaction.IDLE])
+
+        # wheel não tem evento de "terminou", então volta pro idle depois de um tempinho
+        self._interaction_idle_timer = QTimer(self)
+        self._interaction_idle_timer.setSingleShot(True)
+        self._interaction_idle_timer.timeout.connect(lambda: self.set_interaction(Interaction.IDLE))
 
         #add ui
 
@@ -326,19 +1790,29 @@ class CanvasView(QGraphicsView):
         self.settings_btn.clicked.connect(self.on_settings_clicked)
 
         #zoom trackpad
-        self._zoom = 0
         self.grabGesture(Qt.PinchGesture)
        
         #pan
         self._panning = False
         self._pan_start = None
 
+        # seleção no arrasto com o botão esquerdo no fundo
+        self.setDragMode(QGraphicsView.RubberBandDrag)
+
+        # arrasto em grupo: (card clicado, pos inicial dele, ponto inicial na cena)
+        self._group_press = None
+        self._group_dragging = False
+        # arrasto normal: (card clicado, pos inicial) pra registrar no histórico
+        self._drag_origin = None
+        # alça de redimensionar: (card, largura, altura, ponto inicial na cena)
+        self._resize_press = None
+        self._resize_cursor = False
+
         #pan trackpad
         self.grabGesture(Qt.PanGesture)
 
-        self.zoom_factor = 1.0
-        self.zoom_min = 0.5
-        self.zoom_max = 3.14
+        # zoom e limites ficam só na câmera (wheel e pinch usam os mesmos)
+        self._label_zoom = self.camera.zoom
 
         # 🔹 indicador de zoom
         self.zoom_label = QLabel("100%", self)
@@ -388,6 +1862,116 @@ class CanvasView(QGraphicsView):
 
         self.tools_panel.raise_()
 
+        # projeto (o arquivo é escrito em outra thread, ver autosave.py)
+        self.project_path = None
+        self.autosave = Autosaver(self.scene, self.project_meta, self)
+
+        QShortcut(QKeySequence.Save, self, self.save_project)
+        QShortcut(QKeySequence.SaveAs, self, lambda: self.save_project(ask=True))
+        QShortcut(QKeySequence.Open, self, self.open_project)
+
+        # export do board inteiro em tiles, em outras threads (ver export.py)
+        self.exporter = Exporter({t.value: cls for t, cls in CARD_CLASSES.items()}, self)
+        self.exporter.progress.connect(self._on_export_progress)
+        self.exporter.finished.connect(self._on_export_finished)
+        self.export_dialog = None
+        QShortcut(QKeySequence(Qt.CTRL | Qt.Key_E), self, self.export_board)
+
+        # 🔹 perf HUD (F3) e trace (Shift+F3), ver perf_hud.py
+        self.perf_hud = PerfHud(self)
+        QShortcut(QKeySequence(Qt.Key_F3), self, self.perf_hud.toggle)
+        QShortcut(QKeySequence(Qt.SHIFT | Qt.Key_F3), self, self.toggle_trace)
+
+        # 🔹 busca
+        self.find_bar = FindBar(self)
+
+        # 🔹 minimap (tecla M mostra/esconde)
+        self.minimap = Minimap(self)
+        QShortcut(QKeySequence.Find, self, self.find_bar.open_bar)
+
+    def set_backend(self, backend):
+        # troca o widget onde a cena é desenhada (ver viewport_backend.py);
+        # devolve o que ficou de verdade, que pode ser raster se o GL falhar
+        widget, actual = make_viewport(backend)
+        if actual == self.backend:
+            return actual
+        self.setViewport(widget if widget is not None else QWidget())
+        self.backend = actual
+        # QOpenGLWidget não guarda o que ficou fora do rect sujo
+        # (NoPartialUpdate): no GL repinta sempre o viewport inteiro, que é
+        # o que o Qt recomenda. Os modos adaptativos são só pro raster
+        self.set_adaptive_updates(actual == "raster")
+        return actual
+
+    def set_adaptive_updates(self, enabled):
+        self.adaptive_updates = enabled
+        if enabled:
+            self.setViewportUpdateMode(INTERACTION_UPDATE_MODES[self.interaction])
+        else:
+            self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+
+    def set_interaction(self, interaction, idle_after=None):
+        self._interaction_idle_timer.stop()
+        if idle_after is not None:
+            self._interaction_idle_timer.start(idle_after)
+
+        if interaction == self.interaction:
+            return
+        self.interaction = interaction
+
+        if self.adaptive_updates:
+            mode = INTERACTION_UPDATE_MODES[interaction]
+            if mode != self.viewportUpdateMode():
+                self.setViewportUpdateMode(mode)
+
+    def _on_camera_changed(self):
+        # o que estava agendado pra área antiga não serve mais
+        idle_scheduler().cancel_view_tasks()
+        self.scene.set_lod(self.camera.zoom)
+        self.scene.update_viewport(self.camera.visible_rect())
+
+        # inércia/animação continuam depois de soltar: segue em modo de pan
+        if self.camera.animating() and self.interaction == Interaction.IDLE:
+            self.set_interaction(Interaction.PAN, idle_after=150)
+
+        if self.camera.zoom != self._label_zoom:
+            self._label_zoom = self.camera.zoom
+            self.update_zoom_label()
+
+        # só o retângulo da câmera mudou, a contagem fica
+        if self.minimap.isVisible():
+            self.minimap.update()
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        frame_stats.begin_frame()
+        card_cache().begin_frame()
+        super().paintEvent(event)
+        t1 = time.perf_counter()
+
+        if self.perf_hud.owns(event.region()):
+            return
+        self.damage.record(event.region(), self.viewport().size())
+        frame_stats.end_frame(t0, t1, len(self.scene.live), self.damage.last_fraction)
+        if tracer.recording:
+            tracer.add("frame", "paint", t0, t1, {"cards": frame_stats.items})
+
+    # eventos de input que entram no trace (o resto não interessa)
+    TRACED_EVENTS = {
+        QEvent.MouseButtonPress: "mouse press", QEvent.MouseButtonRelease: "mouse release",
+        QEvent.MouseMove: "mouse move", QEvent.MouseButtonDblClick: "double click",
+        QEvent.Wheel: "wheel", QEvent.KeyPress: "key press", QEvent.Gesture: "gesture",
+    }
+
+    def viewportEvent(self, event):
+        if not tracer.recording:
+            return super().viewportEvent(event)
+        name = self.TRACED_EVENTS.get(event.type())
+        if name is None:
+            return super().viewportEvent(event)
+        with tracer.span(name, "input"):
+            return super().viewportEvent(event)
+
     def set_tool(self, tool):
         self.current_tool = tool
         self.tools_panel.hide()
@@ -409,20 +1993,33 @@ class CanvasView(QGraphicsView):
         panel.move(x, y)
 
     def event(self, event):
+        if tracer.recording and event.type() in (QEvent.Gesture, QEvent.KeyPress):
+            with tracer.span(self.TRACED_EVENTS[event.type()], "input"):
+                return self._event(event)
+        return self._event(event)
+
+    def _event(self, event):
         if event.type() == QEvent.Gesture:
             return self.gestureEvent(event)
         return super().event(event)
 
+    def changeEvent(self, event):
+        # tema do sistema trocou (claro/escuro, fonte): refaz os cards
+        if event.type() in (QEvent.PaletteChange, QEvent.StyleChange, QEvent.FontChange):
+            self.scene.theme_changed()
+        super().changeEvent(event)
+
     def gestureEvent(self, event):
         pan = event.gesture(Qt.PanGesture)
         if pan:
             delta = pan.delta()
+            self.camera.queue_pan(delta.x(), delta.y())
 
-            hbar = self.horizontalScrollBar()
-            vbar = self.verticalScrollBar()
-
-            hbar.setValue(hbar.value() - int(delta.x()))
-            vbar.setValue(vbar.value() - int(delta.y()))
+            if pan.state() in (Qt.GestureFinished, Qt.GestureCanceled):
+                self.set_interaction(Interaction.IDLE)
+                self.camera.release_pan()
+            else:
+                self.set_interaction(Interaction.PAN)
 
         pinch = event.gesture(Qt.PinchGesture)
 
@@ -432,26 +2029,18 @@ class CanvasView(QGraphicsView):
         return True
 
     def handle_pinch(self, pinch: QPinchGesture):
-        if pinch.state() == Qt.GestureStarted:
-
-            self._pinch_start_zoom = self._zoom
+        if pinch.state() in (Qt.GestureFinished, Qt.GestureCanceled):
+            self.set_interaction(Interaction.IDLE)
+        else:
+            self.set_interaction(Interaction.ZOOM)
 
+        if pinch.state() == Qt.GestureStarted:
+            self.camera.stop()
             return
 
-        scale = pinch.scaleFactor()
-
-        zoom_step = 1.09
-        zoom_delta = math.log(scale, zoom_step)
-
-        new_zoom = self._zoom + zoom_delta
-
-        MIN_ZOOM = -15
-        MAX_ZOOM = 40
-
-        if MIN_ZOOM <= new_zoom <= MAX_ZOOM:
-            self.scale(scale, scale)
-            self._zoom = new_zoom
-            self.update_zoom_label()
+        # o pinch já é contínuo, não precisa suavizar por cima
+        anchor = self.viewport().mapFromGlobal(pinch.centerPoint().toPoint())
+        self.camera.queue_zoom(pinch.scaleFactor(), anchor, eased=False)
 
     def _position_zoom_label(self):
         margin_bottom = 20  # espaço acima da barra
@@ -462,9 +2051,15 @@ class CanvasView(QGraphicsView):
     def resizeEvent(self, event):
         super().resizeEvent(event)
 
+        # mantém o mesmo centro
+        self.camera.apply()
+
         # 🔹 reposiciona label de zoom
         self._position_zoom_label()
 
+        # 🔹 busca fica no topo, centralizada
+        self.find_bar.move((self.width() - self.find_bar.width()) // 2, 12)
+
         # 🔹 reposiciona botões flutuantes
         margin = 32
         y = self.height() - self.tools_btn.height() - margin
@@ -475,6 +2070,12 @@ class CanvasView(QGraphicsView):
             y
     )
 
+        # 🔹 minimap em cima do botão de configurações
+        self.minimap.move(
+            self.width() - self.minimap.width() - margin,
+            y - self.minimap.height() - 12
+        )
+
     def on_tools_clicked(self):
         pass
 
@@ -497,30 +2098,28 @@ class CanvasView(QGraphicsView):
         self._zoom_fade_anim = anim  # evita GC
 
     def wheelEvent(self, event):
-        zoom_step = 1.12  # mais suave
+        self.set_interaction(Interaction.ZOOM, idle_after=150)
 
-        if event.angleDelta().y() > 0:
-            new_zoom = self.zoom_factor * zoom_step
-        else:
-            new_zoom = self.zoom_factor / zoom_step
+        zoom_step = 1.12  # por "clique" da roda (120)
 
-        if self.zoom_min <= new_zoom <= self.zoom_max:
-            factor = new_zoom / self.zoom_factor
-            self.zoom_factor = new_zoom
-            self.scale(factor, factor)
+        # mouses de roda fina mandam pedaços de 120, soma tudo no frame
+        steps = event.angleDelta().y() / 120
+        if steps:
+            self.camera.queue_zoom(zoom_step ** steps, event.position())
 
-            percent = int(self.zoom_factor * 100)
-            self.zoom_label.setText(f"{percent}%")
-            self.zoom_label.adjustSize()
-            self._position_zoom_label()
+    def update_zoom_label(self):
+        percent = int(self.camera.zoom * 100)
+        self.zoom_label.setText(f"{percent}%")
+        self.zoom_label.adjustSize()
+        self._position_zoom_label()
 
-            # mostrar label
-            self.zoom_hide_timer.stop()
-            self.zoom_label.show()
-            self.zoom_effect.setOpacity(1.0)
+        # mostrar label
+        self.zoom_hide_timer.stop()
+        self.zoom_label.show()
+        self.zoom_effect.setOpacity(1.0)
 
-            # esconder após 1s
-            self.zoom_hide_timer.start(1000)
+        # esconder após 1s
+        self.zoom_hide_timer.start(1000)
 
     def mouseDoubleClickEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -531,12 +2130,33 @@ class CanvasView(QGraphicsView):
             super().mouseDoubleClickEvent(event)
 
     def mousePressEvent(self, event):
+        # qualquer clique segura a inércia
+        self.camera.stop()
+
         if event.button() == Qt.MiddleButton:
             self._panning = True
             self._pan_start = event.position()
             self.setCursor(Qt.ClosedHandCursor)
+            self.set_interaction(Interaction.PAN)
             event.accept()
             return
+
+        if event.button() == Qt.LeftButton:
+            if self.scene.overview:
+                self.scene.materialize_at(self.mapToScene(event.position().toPoint()))
+
+            item = self.itemAt(event.position().toPoint())
+            if self._begin_resize(item, event):
+                event.accept()
+                return
+            if item is not None and item.topLevelItem().flags() & QGraphicsItem.ItemIsMovable:
+                self.set_interaction(Interaction.DRAG)
+
+                card = item.topLevelItem()
+                if self._wants_group_drag(item, event):
+                    self._group_press = (card, card.pos(), self.mapToScene(event.position().toPoint()))
+                else:
+                    self._drag_origin = (card, card.pos())
         
         if self.tools_panel.isVisible():
            panel_rect = self.tools_panel.geometry()
@@ -547,19 +2167,115 @@ class CanvasView(QGraphicsView):
            if not panel_rect.contains(click_pos):
               self.tools_panel.hide()
 
+        if self._group_press is not None:
+            event.accept()
+            return
+
         super().mousePressEvent(event)
 
 
+    def _wants_group_drag(self, item, event):
+        # clicou num card que faz parte de uma seleção grande, sem modificador
+        # e fora do texto editável (aí é pra editar, não arrastar)
+        card = item.topLevelItem()
+        if not isinstance(card, CanvasCard) or not card.isSelected() or event.modifiers():
+            return False
+        if isinstance(item, QGraphicsTextItem) and item.textInteractionFlags() & Qt.TextEditorInteraction:
+            return False
+        return len(self.scene.selectedItems()) >= GROUP_DRAG_MIN
+
+    def _group_drag_move(self, event):
+        card, start, press = self._group_press
+        if not self._group_dragging:
+            cards = [i for i in self.scene.selectedItems() if isinstance(i, CanvasCard)]
+            self.scene.begin_group_drag(cards)
+            self._group_dragging = True
+
+        # snap calculado uma vez: leva o card clicado pro grid e o resto
+        # da seleção anda junto o mesmo tanto
+        delta = self.mapToScene(event.position().toPoint()) - press
+        grid = GRID_SIZE
+        x = round((start.x() + delta.x()) / grid) * grid
+        y = round((start.y() + delta.y()) / grid) * grid
+        self.scene.drag_group_to(x - start.x(), y - start.y())
+
+    def _group_drag_release(self):
+        card = self._group_press[0]
+        self._group_press = None
+        if self._group_dragging:
+            self._group_dragging = False
+            self.scene.end_group_drag()
+        else:
+            # só clicou: fica selecionado só esse, que nem clique normal
+            self.scene.clearSelection()
+            card.setSelected(True)
+
+    # =========================
+    # REDIMENSIONAR
+    # =========================
+    # O card muda de tamanho na hora enquanto arrasta; o store e o
+    # histórico só recebem no fim (um ResizeChange por arrasto)
+    def _handle_card(self, item, event):
+        card = item.topLevelItem() if item is not None else None
+        if not isinstance(card, CanvasCard) or card.card_id is None:
+            return None
+        pos = card.mapFromScene(self.mapToScene(event.position().toPoint()))
+        return card if card.in_resize_handle(pos) else None
+
+    def _begin_resize(self, item, event):
+        if event.modifiers():
+            return False
+        card = self._handle_card(item, event)
+        if card is None:
+            return False
+        self._resize_press = (card, card.rect.width(), card.rect.height(),
+                              self.mapToScene(event.position().toPoint()))
+        self.set_interaction(Interaction.DRAG)
+        return True
+
+    def _resize_move(self, event):
+        card, w, h, press = self._resize_press
+        delta = self.mapToScene(event.position().toPoint()) - press
+        grid = GRID_SIZE
+        w = max(CARD_MIN_WIDTH, round((w + delta.x()) / grid) * grid)
+        h = max(CARD_MIN_HEIGHT, round((h + delta.y()) / grid) * grid)
+        card.set_size(w, h)
+
+    def _resize_release(self):
+        card, w, h, _ = self._resize_press
+        self._resize_press = None
+        new_w, new_h = card.rect.width(), card.rect.height()
+        if card.card_id is not None and (new_w, new_h) != (w, h):
+            self.scene.resize_cards([card.card_id], [new_w], [new_h])
+
+    def _update_resize_cursor(self, event):
+        over = self._handle_card(self.itemAt(event.position().toPoint()), event) is not None
+        if over != self._resize_cursor:
+            self._resize_cursor = over
+            if over:
+                self.viewport().setCursor(Qt.SizeFDiagCursor)
+            else:
+                self.viewport().unsetCursor()
+
     def mouseMoveEvent(self, event):
+        if self._resize_press is not None:
+            self._resize_move(event)
+            event.accept()
+            return
+
+        if self._group_press is not None:
+            self._group_drag_move(event)
+            event.accept()
+            return
+
+        if not event.buttons():
+            self._update_resize_cursor(event)
+
         if self._panning and self._pan_start is not None:
             delta = event.position() - self._pan_start
             self._pan_start = event.position()
 
-            hbar = self.horizontalScrollBar()
-            vbar = self.verticalScrollBar()
-
-            hbar.setValue(hbar.value() - int(delta.x()))
-            vbar.setValue(vbar.value() - int(delta.y()))
+            self.camera.queue_pan(delta.x(), delta.y())
 
             event.accept()
         else:
@@ -569,9 +2285,67 @@ class CanvasView(QGraphicsView):
         if event.button() == Qt.MiddleButton:
             self._panning = False
             self.setCursor(Qt.ArrowCursor)
+            self.set_interaction(Interaction.IDLE)
+            self.camera.release_pan()
+            event.accept()
+        elif event.button() == Qt.LeftButton and self._resize_press is not None:
+            self._resize_release()
+            self.set_interaction(Interaction.IDLE)
+            event.accept()
+        elif event.button() == Qt.LeftButton and self._group_press is not None:
+            self._group_drag_release()
+            self.set_interaction(Interaction.IDLE)
             event.accept()
         else:
             super().mouseReleaseEvent(event)
+            if event.button() == Qt.LeftButton:
+                self._record_drag()
+                self.set_interaction(Interaction.IDLE)
+
+    def _record_drag(self):
+        if self._drag_origin is None:
+            return
+        card, start = self._drag_origin
+        self._drag_origin = None
+        delta = card.pos() - start
+        if card.card_id is None or delta.isNull():
+            return
+
+        # o Qt move todos os selecionados junto com o card clicado
+        moved = {card.card_id}
+        for item in self.scene.selectedItems():
+            if isinstance(item, CanvasCard) and item.card_id is not None:
+                moved.add(item.card_id)
+        self.scene.record_move(sorted(moved), delta.x(), delta.y())
+
+    def keyPressEvent(self, event):
+        # editando texto: as teclas (e o Ctrl+Z do próprio texto) são dele
+        if self.scene.focusItem() is not None:
+            super().keyPressEvent(event)
+            return
+
+        if event.matches(QKeySequence.Undo):
+            self.scene.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.scene.redo()
+        elif event.key() == Qt.Key_M and not event.modifiers():
+            self.minimap.setVisible(not self.minimap.isVisible())
+        elif event.key() in (Qt.Key_Delete, Qt.Key_Backspace):
+            ids = [i.card_id for i in self.scene.selectedItems()
+                   if isinstance(i, CanvasCard) and i.card_id is not None]
+            self.scene.delete_cards(ids)
+        else:
+            super().keyPressEvent(event)
+            return
+        event.accept()
+
+    def fly_to_card(self, card_id):
+        scene = self.scene
+        if card_id not in scene.store:
+            return
+        scene.set_highlight(card_id)
+        world = scene.card_rect(card_id).center() + scene.origin
+        self.camera.fly_to(world, max(self.camera.zoom, FIND_ZOOM))
 
     def add_card(self, card_type):
         # centro visível da view
@@ -579,9 +2353,299 @@ class CanvasView(QGraphicsView):
 
         self.scene.create_card(center_pos, card_type)
 
+    # =========================
+    # PROJETO
+    # =========================
+    def project_meta(self):
+        center = self.camera.center + self.scene.origin
+        return {
+            "app_version": APP_VERSION,
+            "camera": {"x": center.x(), "y": center.y(), "zoom": self.camera.zoom},
+        }
+
+    def save_project(self, ask=False):
+        from asset_pack import asset_pack, set_asset_pack, pack_path_for
+        from waveform import waveform_loader, project_cache_dir
+        path = self.project_path
+        if ask or path is None:
+            path, _ = QFileDialog.getSaveFileName(
+                self, "Salvar projeto", "", f"Projeto {APP_NAME} (*{PROJECT_EXTENSION})"
+            )
+            if not path:
+                return
+            if not path.endswith(PROJECT_EXTENSION):
+                path += PROJECT_EXTENSION
+
+        if path != self.project_path or self.autosave.writer is None:
+            self.finish_imports()
+            self.autosave.flush()
+            self.autosave.set_writer(ProjectWriter(path))
+            self.project_path = path
+            waveform_loader().cache_dir = project_cache_dir(path)
+
+        # imagens e áudios entram no pack do lado do arquivo; salvar como em
+        # outra pasta copia os que estavam no pack antigo
+        old = asset_pack()
+        pack = old
+        if pack is None or pack.path != pack_path_for(path):
+            pack = self._open_pack(path)
+            if pack is not None:
+                # enquanto as cópias não chegam, lê do pack antigo
+                pack.fallback = old
+        if pack is not None:
+            # vale antes do import: os cards recarregam já lendo do pack novo
+            set_asset_pack(pack)
+            self.scene.import_assets(pack, old)
+
+        self.autosave.save_now()
+
+    def export_board(self, path=None, fmt=None):
+        from image_loader import image_loader
+        from waveform import waveform_loader
+        from export import FORMAT_PNG, FORMAT_PDF, FORMAT_PYRAMID
+        if self.exporter.running():
+            return
+        if path is None:
+            filters = {
+                "PNG (*.png)": FORMAT_PNG,
+                "PDF (*.pdf)": FORMAT_PDF,
+                "Pirâmide de tiles (pasta)": FORMAT_PYRAMID,
+            }
+            path, chosen = QFileDialog.getSaveFileName(self, "Exportar board", "", ";;".join(filters))
+            if not path:
+                return
+            fmt = filters.get(chosen, FORMAT_PNG)
+            if fmt != FORMAT_PYRAMID and not path.lower().endswith("." + fmt):
+                path += "." + fmt
+
+        loader = image_loader()
+        started = self.exporter.start(
+            self.scene.store, fmt, path,
+            edits=self.scene.unsaved_edits(),
+            disk_cache=loader.disk_cache,
+            peaks_dir=waveform_loader().cache_dir,
+        )
+        if not started:
+            return
+
+        self.export_dialog = QProgressDialog("Exportando…", "Cancelar", 0, 0, self)
+        self.export_dialog.setWindowModality(Qt.WindowModal)
+        self.export_dialog.setMinimumDuration(300)
+        self.export_dialog.canceled.connect(self.exporter.cancel)
+
+    def _on_export_progress(self, done, total):
+        if self.export_dialog is not None:
+            self.export_dialog.setMaximum(total)
+            self.export_dialog.setValue(done)
+
+    def _on_export_finished(self, ok, message):
+        if self.export_dialog is not None:
+            self.export_dialog.canceled.disconnect(self.exporter.cancel)
+            self.export_dialog.close()
+            self.export_dialog = None
+        if ok:
+            print(f"exportado: {message}")
+        else:
+            print(f"export não terminou: {message}")
+
+    def toggle_trace(self, path=None):
+        # liga a gravação; na segunda vez para e salva o JSON
+        if not tracer.recording:
+            tracer.start()
+            self.perf_hud.refresh()
+            return
+        tracer.stop()
+        self.perf_hud.refresh()
+        if path is None:
+            name = datetime.now().strftime("trace-%Y%m%d-%H%M%S.json")
+            path, _ = QFileDialog.getSaveFileName(self, "Salvar trace", name, "Chrome trace (*.json)")
+            if not path:
+                return
+        try:
+            count = tracer.save(path)
+        except OSError as e:
+            print(f"não deu pra salvar o trace {path}: {e}")
+            return
+        print(f"trace salvo: {path} ({count} eventos)")
+
+    def _open_pack(self, path):
+        from asset_pack import AssetPack, AssetPackError, pack_path_for
+        try:
+            return AssetPack(pack_path_for(path)).open()
+        except (OSError, AssetPackError) as e:
+            print(f"não deu pra abrir as imagens/áudios de {path}: {e}")
+            return None
+
+    def finish_imports(self):
+        # imports de imagem/áudio em andamento terminam e as refs entram no
+        # store antes de salvar/trocar de projeto
+        from asset_pack import asset_importer
+        asset_importer().wait()
+        self.scene.apply_imports()
+
+    def open_project(self, path=None):
+        from asset_pack import set_asset_pack
+        from waveform import waveform_loader, project_cache_dir
+        if path is None:
+            path, _ = QFileDialog.getOpenFileName(
+                self, "Abrir projeto", "", f"Projeto {APP_NAME} (*{PROJECT_EXTENSION})"
+            )
+            if not path:
+                return
+
+        # o projeto atual termina de salvar antes (pode ser o mesmo arquivo)
+        self.finish_imports()
+        self.autosave.flush()
+        try:
+            reader = ProjectReader(path).scan()
+        except (OSError, ProjectFormatError) as e:
+            print(f"não deu pra abrir {path}: {e}")
+            return
+
+        waveform_loader().cache_dir = project_cache_dir(path)
+        # o pack só lê os cabeçalhos aqui; imagens/áudios saem sob demanda
+        set_asset_pack(self._open_pack(path))
+        meta = self.scene.load_project(reader)
+        self.project_path = path
+        self.autosave.set_writer(ProjectWriter.from_reader(reader))
+        # o que o projeto carregou fica vivo: fora do GC (ver ensure_canvas)
+        gc.freeze()
+
+        camera = meta.get("camera", {})
+        self.camera.stop()
+        self.camera.zoom = self.camera.clamp_zoom(camera.get("zoom", 1.0))
+        self.camera.center_on(QPointF(camera.get("x", 0.0), camera.get("y", 0.0)))
+
 # =========================
 # TOOLS
 # =========================
+# quantos resultados a barra de busca guarda (o contador mostra "N+")
+FIND_LIMIT = 1000
+# zoom mínimo quando voa até um resultado (pra dar pra ler o texto)
+FIND_ZOOM = 1.0
+# quanto a busca pode indexar na hora, na thread da interface (s); o resto
+# segue no idle e a busca repete sozinha
+FIND_INDEX_BUDGET = 0.015
+FIND_RETRY_MS = 250
+
+class FindBar(QFrame):
+    highlight_color = QColor("#5b7cfa")
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.results = []
+        self.index = -1
+        # índice ainda não tem todos os cards (projeto acabou de abrir)
+        self.partial = False
+        self._retry = QTimer(self)
+        self._retry.setSingleShot(True)
+        self._retry.setInterval(FIND_RETRY_MS)
+        self._retry.timeout.connect(lambda: self._search(self.edit.text()))
+
+        self.setStyleSheet("""
+            QFrame {
+                background-color: #2b2b2b;
+                border-radius: 10px;
+                border: 1px solid #3a3a3a;
+            }
+            QLineEdit {
+                background: #3a3a3a;
+                color: #ddd;
+                border: none;
+                border-radius: 6px;
+                padding: 4px 8px;
+            }
+            QLabel {
+                color: #888;
+                border: none;
+                font-size: 12px;
+            }
+        """)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 6, 8, 6)
+        layout.setSpacing(8)
+
+        self.edit = QLineEdit()
+        self.edit.setPlaceholderText("Buscar nos cards")
+        self.edit.setFixedWidth(240)
+        self.edit.textChanged.connect(self._on_text_changed)
+        self.edit.returnPressed.connect(self.next)
+        layout.addWidget(self.edit)
+
+        self.count_label = QLabel("")
+        self.count_label.setMinimumWidth(60)
+        layout.addWidget(self.count_label)
+
+        QShortcut(QKeySequence(Qt.SHIFT | Qt.Key_Return), self.edit, self.previous)
+        QShortcut(QKeySequence(Qt.Key_Escape), self.edit, self.close_bar)
+
+        self.adjustSize()
+        self.hide()
+
+    def open_bar(self):
+        self.show()
+        self.raise_()
+        self.edit.setFocus()
+        self.edit.selectAll()
+        if self.edit.text():
+            self._on_text_changed(self.edit.text())
+
+    def close_bar(self):
+        self._retry.stop()
+        self.hide()
+        self.view.scene.set_highlight(None)
+        self.view.setFocus()
+
+    def _on_text_changed(self, text):
+        # busca a cada tecla (o índice responde em ms) e já voa pro primeiro
+        self.results = []
+        self.index = -1
+        self._search(text)
+
+    def _search(self, text):
+        scene = self.view.scene
+        current = self.results[self.index] if 0 <= self.index < len(self.results) else None
+        self.results = scene.find(text, FIND_LIMIT) if text.strip() else []
+        self.partial = bool(text.strip()) and scene.search.pending() > 0
+        if self.partial:
+            self._retry.start()
+
+        if current is not None and current in self.results:
+            # repetiu com mais cards no índice: continua onde estava
+            self.index = self.results.index(current)
+            self._update_count()
+        elif self.results:
+            self.index = -1
+            self.next()
+        else:
+            self.view.scene.set_highlight(None)
+            self._update_count()
+
+    def next(self):
+        self._step(1)
+
+    def previous(self):
+        self._step(-1)
+
+    def _step(self, delta):
+        if not self.results:
+            return
+        self.index = (self.index + delta) % len(self.results)
+        self.view.fly_to_card(self.results[self.index])
+        self._update_count()
+
+    def _update_count(self):
+        if not self.edit.text().strip():
+            self.count_label.setText("")
+        elif not self.results:
+            self.count_label.setText("buscando…" if self.partial else "nada")
+        else:
+            more = "+" if len(self.results) >= FIND_LIMIT or self.partial else ""
+            self.count_label.setText(f"{self.index + 1}/{len(self.results)}{more}")
+
+
 class ToolsPanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -628,7 +2692,7 @@ class ToolsPanel(QWidget):
 # MAIN WINDOW
 # =========================
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, renderer=DEFAULT_BACKEND):
         super().__init__()
 
         self.setWindowTitle(APP_NAME)
@@ -651,11 +2715,14 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
 
         # 🔹 telas
-        self.canvas = CanvasView()
+        # o canvas (cena, grid, loaders...) só é montado depois que a tela
+        # de boas-vindas aparece, ou na hora do "Começar" se clicar antes
+        self.canvas = None
+        self.renderer = renderer
         self.welcome = WelcomeScreen(self.open_canvas)
+        self.welcome.first_frame.connect(self._on_welcome_shown)
 
         self.stack.addWidget(self.welcome)
-        self.stack.addWidget(self.canvas)
         self.stack.setCurrentWidget(self.welcome)
 
         # 🔹 adiciona ao layout (ORDEM IMPORTA)
@@ -663,6 +2730,39 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(self.container)
 
+    def _on_welcome_shown(self):
+        startup.mark("primeira tela")
+        # monta o canvas no primeiro respiro do event loop
+        QTimer.singleShot(0, self.ensure_canvas)
+
+    def closeEvent(self, event):
+        # o autosave pode estar esperando o debounce ou no meio de um save
+        if self.canvas is not None:
+            self.canvas.exporter.cancel()
+            self.canvas.exporter.wait()
+            self.canvas.finish_imports()
+            self.canvas.autosave.flush()
+        super().closeEvent(event)
+
+    def ensure_canvas(self):
+        if self.canvas is not None:
+            return self.canvas
+
+        self.canvas = CanvasView()
+        self.canvas.set_backend(self.renderer)
+        self.stack.addWidget(self.canvas)
+        # PySide, módulos e o canvas nunca viram lixo, mas a coleta da
+        # geração 2 percorre tudo de novo: ~30 ms no meio de um frame ou de
+        # uma volta do idle_scheduler. Congelado fica fora da contagem (ciclo
+        # que nascer aqui dentro não é coletado, só refcount)
+        gc.freeze()
+
+        startup.mark("canvas pronto")
+        if startup.enabled:
+            startup.report()
+            QTimer.singleShot(0, QApplication.quit)
+        return self.canvas
+
     # =========================
     # FADE TRANSITION
     # =========================
@@ -679,7 +2779,7 @@ class MainWindow(QMainWindow):
 
          def on_fade_out_finished():
              # troca a tela
-             self.stack.setCurrentWidget(self.canvas)
+             self.stack.setCurrentWidget(self.ensure_canvas())
 
              fade_in = QPropertyAnimation(effect, b"opacity")
              fade_in.setDuration(250)
@@ -802,12 +2902,20 @@ class SettingsDialog(QDialog):
 # =========================
 # APP
 # =========================
-if __name__ == "__main__":
+def main():
+    renderer = requested_backend()
+    prepare_application(renderer)
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
 
     #QFontDatabase.addApplicationFont()
 
-    window = MainWindow()
+    window = MainWindow(renderer)
     window.show()
+    startup.mark("janela montada")
+
+    return app.exec()
 
-    sys.exit(app.exec())
\ No newline at end of file
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,260 @@
+from array import array
+
+from PySide6.QtCore import Qt, QPointF, QRectF
+from PySide6.QtGui import QColor, QImage, QPainter, QPen
+from PySide6.QtWidgets import QWidget
+
+# =========================
+# MINIMAP
+# =========================
+# Board inteiro num cantinho da tela, com o retângulo do que a câmera está
+# vendo. Clicar voa até o ponto, arrastar leva a câmera junto.
+#
+# Não desenha a cena de novo: cada pixel guarda quantos cards encostam
+# nele (contagem em array), e a imagem sai dessa contagem. O CardStore
+# avisa quem mexeu (CardStore.on_geometry); no próximo paint só esses cards
+# saem das células antigas e entram nas novas. Refaz tudo só quando um card
+# sai da área coberta ou o projeto é trocado.
+
+MINIMAP_WIDTH = 200
+MINIMAP_HEIGHT = 130
+MINIMAP_PADDING = 6
+# folga em volta do board, pra card novo na borda não refazer tudo
+EXTENT_MARGIN = 0.25
+# tons de cinza conforme quantos cards se acumulam no pixel
+DENSITY_LEVELS = 8
+
+# opaco: widget transparente por cima do viewport faz a cena repintar
+# embaixo dele a cada update do minimap
+background_color = QColor("#2b2b2b")
+border_color = QColor("#3a3a3a")
+viewport_color = QColor("#5b7cfa")
+
+
+def _color_table():
+    table = [QColor(0, 0, 0, 0).rgba()]
+    for level in range(1, DENSITY_LEVELS):
+        gray = 90 + (level - 1) * (200 - 90) // (DENSITY_LEVELS - 2)
+        table.append(QColor(gray, gray, gray).rgba())
+    return table
+
+
+class Minimap(QWidget):
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.setFixedSize(MINIMAP_WIDTH, MINIMAP_HEIGHT)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setCursor(Qt.PointingHandCursor)
+
+        self._cols = MINIMAP_WIDTH - 2 * MINIMAP_PADDING
+        self._rows = MINIMAP_HEIGHT - 2 * MINIMAP_PADDING
+        # 32 bits: um pixel só pode ter mais de 65535 cards empilhados
+        # (o "H" estourava no paint com um card bem longe do resto)
+        self._counts = array("I", bytes(4 * self._cols * self._rows))
+        self._levels = bytearray(self._cols * self._rows)
+        self._cells = {}       # id -> (c0, r0, c1, r1) onde ele está contado
+        self._colors = _color_table()
+
+        # mundo -> pixel: px = (x - ex) * scale
+        self._ex = 0.0
+        self._ey = 0.0
+        self._scale = 1.0
+
+        self._dirty = set()
+        self._rebuild = True
+        self._image = None
+        self._dragging = False
+        self._press = QPointF()
+
+        self.view.scene.store.on_geometry = self.mark
+
+    # --- contagem ---
+
+    def mark(self, card_id=None):
+        # None = store inteiro mudou
+        if card_id is None:
+            self._rebuild = True
+            self._dirty.clear()
+        elif not self._rebuild:
+            self._dirty.add(card_id)
+        if self.isVisible():
+            self.update()
+
+    def _cell_rect(self, store, card_id):
+        s = self._scale
+        x, y = store.xs[card_id], store.ys[card_id]
+        c0 = int((x - self._ex) * s)
+        r0 = int((y - self._ey) * s)
+        c1 = max(c0, int((x + store.ws[card_id] - self._ex) * s))
+        r1 = max(r0, int((y + store.hs[card_id] - self._ey) * s))
+        if c0 < 0 or r0 < 0 or c1 >= self._cols or r1 >= self._rows:
+            return None
+        return c0, r0, c1, r1
+
+    def _add(self, cells, delta):
+        c0, r0, c1, r1 = cells
+        counts, levels, cols = self._counts, self._levels, self._cols
+        top = DENSITY_LEVELS - 1
+        for r in range(r0, r1 + 1):
+            base = r * cols
+            for i in range(base + c0, base + c1 + 1):
+                n = counts[i] + delta
+                counts[i] = n
+                levels[i] = n if n < top else top
+
+    def _fit_extent(self, store):
+        ids = store.ids()
+        if not ids:
+            self._ex, self._ey, self._scale = 0.0, 0.0, 1.0
+            return
+        xs, ys, ws, hs = store.xs, store.ys, store.ws, store.hs
+        left = min(xs[i] for i in ids)
+        top = min(ys[i] for i in ids)
+        right = max(xs[i] + ws[i] for i in ids)
+        bottom = max(ys[i] + hs[i] for i in ids)
+
+        w = max(right - left, 1.0)
+        h = max(bottom - top, 1.0)
+        mx, my = w * EXTENT_MARGIN, h * EXTENT_MARGIN
+        w += 2 * mx
+        h += 2 * my
+        self._scale = min((self._cols - 1) / w, (self._rows - 1) / h)
+        # centraliza o board no minimap
+        self._ex = left - mx - ((self._cols - 1) / self._scale - w) / 2
+        self._ey = top - my - ((self._rows - 1) / self._scale - h) / 2
+
+    def _refresh(self):
+        store = self.view.scene.store
+        if not self._rebuild and self._dirty:
+            cells = self._cells
+            for card_id in self._dirty:
+                old = cells.pop(card_id, None)
+                if old is not None:
+                    self._add(old, -1)
+                if card_id not in store:
+                    continue
+                new = self._cell_rect(store, card_id)
+                if new is None:
+                    # saiu da área coberta
+                    self._rebuild = True
+                    break
+                cells[card_id] = new
+                self._add(new, 1)
+            self._dirty.clear()
+            self._image = None
+
+        if self._rebuild:
+            self._rebuild = False
+            self._dirty.clear()
+            self._fit_extent(store)
+            self._recount(store)
+            self._image = None
+
+        if self._image is None:
+            image = QImage(bytes(self._levels), self._cols, self._rows, self._cols, QImage.Format_Indexed8)
+            image.setColorTable(self._colors)
+            # copia: o buffer de bytes acima é temporário
+            self._image = image.copy()
+
+    def _recount(self, store):
+        # mesmo que _cell_rect + _add pra cada card, só que numa passada só
+        # (abrir projeto de 100k cards)
+        cols, rows = self._cols, self._rows
+        counts = [0] * (cols * rows)
+        cells = {}
+        ex, ey, s = self._ex, self._ey, self._scale
+        xs, ys, ws, hs, alive = store.xs, store.ys, store.ws, store.hs, store.alive
+        for card_id in range(len(alive)):
+            if not alive[card_id]:
+                continue
+            x, y = xs[card_id], ys[card_id]
+            c0 = int((x - ex) * s)
+            r0 = int((y - ey) * s)
+            c1 = int((x + ws[card_id] - ex) * s)
+            r1 = int((y + hs[card_id] - ey) * s)
+            if c0 < 0 or r0 < 0 or c1 >= cols or r1 >= rows:
+                continue
+            cells[card_id] = (c0, r0, c1, r1)
+            if c0 == c1 and r0 == r1:
+                counts[r0 * cols + c0] += 1
+                continue
+            for r in range(r0, r1 + 1):
+                base = r * cols
+                for i in range(base + c0, base + c1 + 1):
+                    counts[i] += 1
+
+        top = DENSITY_LEVELS - 1
+        self._cells = cells
+        self._counts = array("I", counts)
+        self._levels = bytearray(n if n < top else top for n in counts)
+
+    # --- coordenadas ---
+
+    def _to_widget(self, x, y):
+        return QPointF(MINIMAP_PADDING + (x - self._ex) * self._scale,
+                       MINIMAP_PADDING + (y - self._ey) * self._scale)
+
+    def _to_world(self, pos):
+        return QPointF(self._ex + (pos.x() - MINIMAP_PADDING) / self._scale,
+                       self._ey + (pos.y() - MINIMAP_PADDING) / self._scale)
+
+    # --- Qt ---
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update()
+
+    def paintEvent(self, event):
+        self._refresh()
+
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), background_color)
+        painter.setPen(border_color)
+        painter.drawRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5))
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        painter.drawImage(QPointF(MINIMAP_PADDING, MINIMAP_PADDING), self._image)
+
+        # o que a câmera está vendo
+        camera = self.view.camera
+        visible = camera.visible_rect().translated(self.view.scene.origin)
+        box = QRectF(self._to_widget(visible.left(), visible.top()),
+                     self._to_widget(visible.right(), visible.bottom()))
+        inner = QRectF(self.rect()).adjusted(1, 1, -1, -1)
+        painter.setClipRect(inner)
+        painter.setPen(QPen(viewport_color, 1.5))
+        painter.setBrush(QColor(viewport_color.red(), viewport_color.green(), viewport_color.blue(), 40))
+        # nunca some de tão pequeno
+        if box.width() < 4 or box.height() < 4:
+            c = box.center()
+            box = QRectF(c.x() - 2, c.y() - 2, 4, 4)
+        painter.drawRect(box)
+        painter.end()
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        self._dragging = False
+        self._press = event.position()
+        event.accept()
+
+    def mouseMoveEvent(self, event):
+        if not event.buttons() & Qt.LeftButton:
+            return
+        if not self._dragging and (event.position() - self._press).manhattanLength() < 3:
+            return
+        # arrastando: câmera segue na hora, sem animação
+        self._dragging = True
+        camera = self.view.camera
+        camera.stop()
+        camera.center_on(self._to_world(event.position()) - self.view.scene.origin)
+        event.accept()
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        if not self._dragging:
+            self.view.camera.fly_to(self._to_world(event.position()))
+        self._dragging = False
+        event.accept()
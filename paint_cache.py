@@ -0,0 +1,118 @@
+import math
+import time
+from collections import OrderedDict
+
+# =========================
+# PAINT CACHE
+# =========================
+# Pixmaps com o desenho pronto de cada card (ver CanvasCard.paint), por
+# faixa de zoom. Um orçamento só pra todos os cards: quando passa, sai quem
+# foi desenhado (= apareceu na tela) há mais tempo.
+
+CARD_CACHE_BYTES = 64 * 1024 * 1024
+
+# faixas de zoom por oitava; dentro de uma faixa o mesmo pixmap serve
+SCALE_BUCKETS_PER_OCTAVE = 4
+# acima disso o card é desenhado direto (pixmap ficaria grande demais)
+MAX_CACHE_SCALE = 3.0
+# quanto de cada frame pode ir pra gerar pixmap novo; no zoom muitos cards
+# trocam de faixa juntos e o resto desenha direto até o próximo frame
+RENDER_BUDGET_MS = 3.0
+
+
+def scale_bucket(scale):
+    # arredonda pra cima: o pixmap é sempre reduzido na tela, nunca ampliado
+    n = SCALE_BUCKETS_PER_OCTAVE
+    return 2 ** (math.ceil(math.log2(scale) * n - 1e-9) / n)
+
+
+class PaintCache:
+    def __init__(self, max_bytes=CARD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        # desligado = cards sempre desenham direto (comparar no benchmark)
+        self.enabled = True
+        self.render_budget = RENDER_BUDGET_MS / 1000
+        self._deadline = math.inf
+
+        self._entries = OrderedDict()  # (uid, bucket, dpr) -> pixmap
+        self._by_owner = {}            # uid -> chaves
+        # sobe a cada invalidate/clear: pixmap gerado em pedaços (ver
+        # CanvasCard.warm_cache_steps) só entra se não mudou no meio
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @staticmethod
+    def _size(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+    def get(self, key):
+        pixmap = self._entries.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def begin_frame(self):
+        self._deadline = time.perf_counter() + self.render_budget
+
+    def can_render(self):
+        return time.perf_counter() < self._deadline
+
+    def put(self, key, pixmap):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= self._size(old)
+
+        self._entries[key] = pixmap
+        self._by_owner.setdefault(key[0], set()).add(key)
+        self.bytes += self._size(pixmap)
+        self._evict()
+
+    def invalidate(self, uid):
+        self.generation += 1
+        for key in self._by_owner.pop(uid, ()):
+            pixmap = self._entries.pop(key, None)
+            if pixmap is not None:
+                self.bytes -= self._size(pixmap)
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self._by_owner.clear()
+        self.bytes = 0
+
+    def set_budget(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            key, pixmap = self._entries.popitem(last=False)
+            self.bytes -= self._size(pixmap)
+            keys = self._by_owner.get(key[0])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_owner[key[0]]
+            self.evictions += 1
+
+
+_cache = None
+
+def card_cache():
+    global _cache
+    if _cache is None:
+        _cache = PaintCache()
+    return _cache
@@ -0,0 +1,208 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from PySide6.QtCore import Qt, QRect, QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QLabel
+
+# =========================
+# PERF HUD / TRACE
+# =========================
+# F3 mostra um painelzinho no canto com FPS, tempo de frame (p50/p95/p99),
+# quantos cards foram pintados por frame, quanto o drawBackground levou,
+# quanto do viewport foi repintado e quantos cards viraram item do Qt. Shift+F3 grava um trace: spans com
+# timestamp de paint, input, criação de card e carregamento de imagem/áudio
+# (de qualquer thread), salvos no formato JSON do Chrome (chrome://tracing
+# ou ui.perfetto.dev). Dá pra ver o que o usuário viu sem profiler.
+#
+# Desligado custa um perf_counter por frame e um += por card pintado.
+
+# frames guardados pros percentis
+FRAME_HISTORY = 240
+# eventos guardados no trace (os mais antigos saem)
+TRACE_MAX_EVENTS = 500_000
+HUD_REFRESH_MS = 250
+
+
+class FrameStats:
+    def __init__(self, history=FRAME_HISTORY):
+        self.enabled = False
+        # acumulados do frame atual (CanvasCard.paint / drawBackground)
+        self.items = 0
+        self.background = 0.0
+        self._frame_ms = deque(maxlen=history)
+        self._items = deque(maxlen=history)
+        self._background_ms = deque(maxlen=history)
+        # fração do viewport repintada (ver DamageTracker no main.py)
+        self._damage = deque(maxlen=history)
+        self._ends = deque(maxlen=history)
+        self.live = 0
+
+    def begin_frame(self):
+        self.items = 0
+        self.background = 0.0
+
+    def end_frame(self, t0, t1, live, damage=1.0):
+        if not self.enabled:
+            return
+        self._frame_ms.append((t1 - t0) * 1000)
+        self._items.append(self.items)
+        self._background_ms.append(self.background * 1000)
+        self._damage.append(damage)
+        self._ends.append(t1)
+        self.live = live
+
+    def reset(self):
+        for history in (self._frame_ms, self._items, self._background_ms, self._damage, self._ends):
+            history.clear()
+
+    def fps(self, now=None):
+        # frames pintados no último segundo (parado = 0, não tem repaint)
+        now = time.perf_counter() if now is None else now
+        return sum(1 for end in self._ends if now - end <= 1.0)
+
+    def summary(self):
+        frames = sorted(self._frame_ms)
+        damage = sorted(self._damage)
+
+        def at(values, p):
+            n = len(values)
+            return values[min(n - 1, int(round(p * (n - 1))))] if n else 0.0
+
+        count = len(self._items)
+        return {
+            "fps": self.fps(),
+            "p50": at(frames, 0.50),
+            "p95": at(frames, 0.95),
+            "p99": at(frames, 0.99),
+            "damage_p50": at(damage, 0.50),
+            "damage_p95": at(damage, 0.95),
+            "items": sum(self._items) / count if count else 0.0,
+            "background_ms": sum(self._background_ms) / count if count else 0.0,
+            "live": self.live,
+        }
+
+
+class Tracer:
+    def __init__(self, max_events=TRACE_MAX_EVENTS):
+        self.recording = False
+        self.events = deque(maxlen=max_events)
+        self._t0 = 0.0
+        self._threads = {}
+
+    def start(self):
+        self.events.clear()
+        self._threads.clear()
+        self._t0 = time.perf_counter()
+        self.recording = True
+
+    def stop(self):
+        self.recording = False
+
+    def add(self, name, category, t0, t1, args=None):
+        # span já medido (perf_counter de início e fim); qualquer thread
+        if not self.recording:
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = "interface" if tid == threading.main_thread().ident else f"worker {len(self._threads)}"
+        self.events.append((name, category, t0, t1, tid, args))
+
+    @contextmanager
+    def span(self, name, category, args=None):
+        if not self.recording:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, category, t0, time.perf_counter(), args)
+
+    def to_json(self):
+        # formato "Trace Event": spans completos (ph X) em microssegundos
+        t0 = self._t0
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        for name, category, start, end, tid, args in list(self.events):
+            event = {
+                "name": name, "cat": category, "ph": "X", "pid": 1, "tid": tid,
+                "ts": round((start - t0) * 1e6, 1), "dur": round((end - start) * 1e6, 1),
+            }
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path):
+        data = self.to_json()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return len(data["traceEvents"])
+
+
+frame_stats = FrameStats()
+tracer = Tracer()
+
+
+class PerfHud(QLabel):
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        # mesmo visual do indicador de zoom
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 120);
+                color: white;
+                padding: 6px 10px;
+                border-radius: 6px;
+            }
+        """)
+        font = QFont("monospace", 9)
+        font.setStyleHint(QFont.Monospace)
+        self.setFont(font)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hide()
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def toggle(self):
+        if self.isVisible():
+            self.hide()
+            self.timer.stop()
+            frame_stats.enabled = False
+            return
+        frame_stats.reset()
+        frame_stats.enabled = True
+        self.refresh()
+        self.move(12, 12)
+        self.show()
+        self.raise_()
+        self.timer.start(HUD_REFRESH_MS)
+
+    def owns(self, region):
+        # o label é translúcido: trocar o texto repinta o canvas embaixo
+        # dele. Esse repaint não é frame do usuário, fica fora das contas
+        if not self.isVisible():
+            return False
+        hud = QRect(self.view.viewport().mapFrom(self.view, self.pos()), self.size())
+        return hud.contains(region.boundingRect())
+
+    def refresh(self):
+        s = frame_stats.summary()
+        lines = [
+            f"{s['fps']:3d} fps   frame p50 {s['p50']:5.1f}  p95 {s['p95']:5.1f}  p99 {s['p99']:5.1f} ms",
+            f"pintados {s['items']:6.0f}/frame   fundo {s['background_ms']:5.2f} ms",
+            f"repintado p50 {s['damage_p50']:4.0%}  p95 {s['damage_p95']:4.0%} do viewport",
+            f"cards vivos (itens Qt) {s['live']}",
+        ]
+        if tracer.recording:
+            lines.append(f"● gravando trace ({len(tracer.events)} eventos)  Shift+F3 para")
+        self.setText("\n".join(lines))
+        self.adjustSize()
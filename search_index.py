@@ -0,0 +1,279 @@
+import os
+import re
+import bisect
+import heapq
+import time
+import unicodedata
+from functools import lru_cache
+
+# =========================
+# SEARCH INDEX
+# =========================
+# Índice invertido do conteúdo dos cards (palavra -> ids), lido direto do
+# CardStore. Não depende de item materializado nem de Qt.
+#
+# O store avisa quais cards mudaram (CardStore.on_content) e o índice só
+# marca como pendente; a cena vai indexando aos poucos no idle_scheduler. A
+# busca da interface indexa o que faltar só até um tempo limite e procura no
+# que já está no índice (logo depois de abrir um projeto grande o resultado
+# vem parcial, pending() diz quanto falta).
+# Placeholder nunca chega aqui: no store ele é None.
+#
+# Busca: todas as palavras da consulta precisam bater (E), cada uma como
+# prefixo ("mun" acha "mundo"). Palavra que não bate com nada tenta de novo
+# com erro de digitação (distância de edição 1, ou 2 em palavra comprida),
+# usando trigramas do vocabulário pra achar candidatos.
+
+_WORD = re.compile(r"\w+")
+_EMPTY = frozenset()
+
+# peso de cada tipo de acerto (o card fica com o melhor de cada palavra)
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+FUZZY_SCORE = 1
+
+FUZZY_MIN_LENGTH = 4
+# acima de tantas palavras novas reordena o vocabulário inteiro em vez de
+# inserir uma a uma
+RESORT_THRESHOLD = 2000
+# palavras que sumiram do índice mas ainda estão no _vocab: passando disso
+# reordena também, senão editar texto sem parar vai enchendo o _vocab
+DEAD_TERMS_THRESHOLD = 2000
+
+
+@lru_cache(maxsize=1 << 16)
+def _fold(word):
+    # tira acento ("olá" == "ola"); por palavra e com cache, o vocabulário
+    # se repete muito mais que o texto
+    if word.isascii():
+        return word
+    return "".join(c for c in unicodedata.normalize("NFKD", word) if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    words = set(_WORD.findall(text.casefold()))
+    if text.isascii():
+        return words
+    return {_fold(word) for word in words}
+
+
+def _trigrams(term):
+    padded = f"$${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _max_distance(term):
+    return 2 if len(term) >= 8 else 1
+
+
+def edit_distance(a, b, limit):
+    # Levenshtein que desiste quando passa de limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        best = i
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(cost)
+            if cost < best:
+                best = cost
+        if best > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    def __init__(self, store, file_kinds=()):
+        self.store = store
+        # cards cujo conteúdo é um caminho de arquivo: indexa só o nome
+        self.file_kinds = set(file_kinds)
+
+        self._postings = {}    # termo -> set(ids)
+        self._doc_terms = {}   # id -> termos indexados dele
+        self._trigram = {}     # trigrama -> set(termos), pro fuzzy
+
+        self._vocab = []       # termos em ordem, pra busca por prefixo
+        self._new_terms = []
+        self._dead_terms = 0   # no _vocab mas sem postings
+
+        self._pending = set()
+        self._all_pending = True
+        store.on_content = self.mark
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    # --- atualização ---
+
+    def mark(self, card_id=None):
+        # None = store inteiro mudou (abrir projeto)
+        if card_id is None:
+            self._all_pending = True
+            self._pending.clear()
+        elif not self._all_pending:
+            self._pending.add(card_id)
+
+    def pending(self):
+        return len(self.store) if self._all_pending else len(self._pending)
+
+    def flush(self, deadline=None):
+        # indexa o que está pendente; com deadline (perf_counter) para no
+        # meio e devolve False se ainda sobrou (ver CanvasScene._index_steps)
+        store = self.store
+        if self._all_pending:
+            self._reset()
+            self._pending = set(store.ids())
+            self._all_pending = False
+
+        pending = self._pending
+        while pending:
+            self._reindex(pending.pop(), store)
+            if deadline is not None and not len(pending) & 7 and time.perf_counter() > deadline:
+                return not pending
+        return True
+
+    def _reset(self):
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._trigram.clear()
+        self._vocab = []
+        self._new_terms = []
+        self._dead_terms = 0
+
+    def _terms_for(self, card_id, store):
+        if not store.alive[card_id]:
+            return _EMPTY
+        content = store.contents[card_id]
+        if not content or not isinstance(content, str):
+            return _EMPTY
+        if store.kinds[card_id] in self.file_kinds:
+            content = os.path.basename(content)
+        return tokenize(content)
+
+    def _reindex(self, card_id, store):
+        old = self._doc_terms.get(card_id, _EMPTY)
+        new = self._terms_for(card_id, store)
+        if old == new:
+            return
+
+        postings = self._postings
+        if old:
+            for term in old - new:
+                ids = postings[term]
+                ids.discard(card_id)
+                if not ids:
+                    # some do vocabulário; o _vocab é limpo no próximo resort
+                    del postings[term]
+                    self._dead_terms += 1
+                    for gram in _trigrams(term):
+                        terms = self._trigram.get(gram)
+                        if terms is not None:
+                            terms.discard(term)
+            added = new - old
+        else:
+            added = new
+
+        for term in added:
+            ids = postings.get(term)
+            if ids is None:
+                postings[term] = ids = set()
+                self._new_terms.append(term)
+                trigram = self._trigram
+                for gram in _trigrams(term):
+                    terms = trigram.get(gram)
+                    if terms is None:
+                        trigram[gram] = terms = set()
+                    terms.add(term)
+            ids.add(card_id)
+
+        if new:
+            self._doc_terms[card_id] = new
+        else:
+            self._doc_terms.pop(card_id, None)
+
+    def _sorted_vocab(self):
+        if self._dead_terms > DEAD_TERMS_THRESHOLD:
+            self._vocab = sorted(self._postings)
+            self._new_terms = []
+            self._dead_terms = 0
+        elif self._new_terms:
+            if len(self._new_terms) > RESORT_THRESHOLD:
+                self._vocab = sorted(self._postings)
+                self._dead_terms = 0
+            else:
+                vocab = self._vocab
+                for term in self._new_terms:
+                    i = bisect.bisect_left(vocab, term)
+                    if i == len(vocab) or vocab[i] != term:
+                        vocab.insert(i, term)
+            self._new_terms = []
+        return self._vocab
+
+    # --- busca ---
+
+    def _prefix_terms(self, prefix):
+        vocab = self._sorted_vocab()
+        postings = self._postings
+        i = bisect.bisect_left(vocab, prefix)
+        end = bisect.bisect_left(vocab, prefix + "\U0010ffff")
+        return [t for t in vocab[i:end] if t in postings]
+
+    def _fuzzy_terms(self, token):
+        if len(token) < FUZZY_MIN_LENGTH:
+            return []
+        limit = _max_distance(token)
+        grams = _trigrams(token)
+
+        shared = {}
+        for gram in grams:
+            for term in self._trigram.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        # cada edição estraga no máximo 3 trigramas
+        need = max(1, len(grams) - 3 * limit)
+        return [
+            term for term, n in shared.items()
+            if n >= need and term in self._postings
+            and edit_distance(token, term, limit) <= limit
+        ]
+
+    def _matches(self, token):
+        # id -> melhor peso desse token
+        postings = self._postings
+        found = {}
+        for term in self._prefix_terms(token):
+            score = EXACT_SCORE if term == token else PREFIX_SCORE
+            for card_id in postings[term]:
+                if found.get(card_id, 0) < score:
+                    found[card_id] = score
+        if not found:
+            for term in self._fuzzy_terms(token):
+                for card_id in postings[term]:
+                    found[card_id] = FUZZY_SCORE
+        return found
+
+    def search(self, query, limit=None, budget=None):
+        # ids ordenados por relevância (empate: id menor primeiro). budget
+        # (s): quanto pode gastar indexando o pendente antes; None = tudo
+        self.flush(None if budget is None else time.perf_counter() + budget)
+        tokens = sorted(tokenize(query), key=len, reverse=True)
+        if not tokens:
+            return []
+
+        scores = None
+        for token in tokens:
+            found = self._matches(token)
+            if scores is None:
+                scores = found
+            else:
+                scores = {i: s + found[i] for i, s in scores.items() if i in found}
+            if not scores:
+                return []
+
+        key = lambda i: (-scores[i], i)
+        if limit is not None and limit < len(scores):
+            return heapq.nsmallest(limit, scores, key=key)
+        return sorted(scores, key=key)
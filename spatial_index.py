@@ -0,0 +1,184 @@
+import math
+
+# =========================
+# SPATIAL INDEX
+# =========================
+# Hash de grade uniforme sobre a geometria dos cards (coordenadas do mundo):
+# cada card entra em todas as células de CELL_SIZE que ele encosta. Sem Qt,
+# funciona pra todos os cards do CardStore (não só os que viraram item).
+#
+# Mover um card que continua nas mesmas células só troca o retângulo dele;
+# trocar de célula é tirar de um set e pôr em outro. Nada de rebalancear
+# árvore, então arrastar milhares de cards custa o mesmo que um por um.
+
+# ~2 cards por lado; pequeno o bastante pra consulta de viewport não varrer
+# muita coisa de fora, grande o bastante pra quase todo card caber em 1-4
+CELL_SIZE = 512.0
+
+
+class GridIndex:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}   # (cx, cy) -> set(ids)
+        self._rects = {}   # id -> (left, top, right, bottom)
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __contains__(self, item_id):
+        return item_id in self._rects
+
+    def clear(self):
+        self._cells.clear()
+        self._rects.clear()
+
+    def _span(self, left, top, right, bottom):
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+
+    # --- atualização ---
+
+    def insert(self, item_id, x, y, w, h):
+        if item_id in self._rects:
+            self.update(item_id, x, y, w, h)
+            return
+        rect = (x, y, x + w, y + h)
+        self._rects[item_id] = rect
+        cells = self._cells
+        cx0, cy0, cx1, cy1 = self._span(*rect)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                key = (cx, cy)
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = bucket = set()
+                bucket.add(item_id)
+
+    def remove(self, item_id):
+        rect = self._rects.pop(item_id, None)
+        if rect is None:
+            return
+        self._unlink(item_id, self._span(*rect))
+
+    def _unlink(self, item_id, span):
+        cells = self._cells
+        cx0, cy0, cx1, cy1 = span
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                key = (cx, cy)
+                bucket = cells.get(key)
+                if bucket is not None:
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del cells[key]
+
+    def update(self, item_id, x, y, w, h):
+        old = self._rects.get(item_id)
+        if old is None:
+            self.insert(item_id, x, y, w, h)
+            return
+        rect = (x, y, x + w, y + h)
+        old_span = self._span(*old)
+        new_span = self._span(*rect)
+        self._rects[item_id] = rect
+        if old_span == new_span:
+            return
+        self._unlink(item_id, old_span)
+        cells = self._cells
+        cx0, cy0, cx1, cy1 = new_span
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                key = (cx, cy)
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = bucket = set()
+                bucket.add(item_id)
+
+    def rect(self, item_id):
+        return self._rects.get(item_id)
+
+    # --- consultas ---
+
+    def _candidates(self, cx0, cy0, cx1, cy1):
+        cells = self._cells
+        span = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+        found = set()
+        if span > len(cells):
+            # área enorme e quase vazia (zoom out longe): varre só as
+            # células ocupadas
+            for (cx, cy), bucket in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    found.update(bucket)
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = cells.get((cx, cy))
+                    if bucket:
+                        found.update(bucket)
+        return found
+
+    def query(self, left, top, right, bottom):
+        # ids que encostam no retângulo, em ordem crescente (= ordem de
+        # criação, mesma que a varredura linear devolvia)
+        rects = self._rects
+        return sorted(
+            i for i in self._candidates(*self._span(left, top, right, bottom))
+            if rects[i][0] < right and rects[i][2] > left
+            and rects[i][1] < bottom and rects[i][3] > top
+        )
+
+    def query_point(self, x, y):
+        size = self.cell_size
+        bucket = self._cells.get((math.floor(x / size), math.floor(y / size)), ())
+        rects = self._rects
+        return sorted(
+            i for i in bucket
+            if rects[i][0] <= x < rects[i][2] and rects[i][1] <= y < rects[i][3]
+        )
+
+    def nearest(self, x, y, max_distance=math.inf):
+        # (id, distância até a borda do card; 0 = em cima) ou None.
+        # Anda em anéis de células a partir do ponto e para quando o anel
+        # já está mais longe que o melhor achado.
+        if not self._rects:
+            return None
+        size = self.cell_size
+        cx, cy = math.floor(x / size), math.floor(y / size)
+        rects, cells = self._rects, self._cells
+
+        best, best_d = None, max_distance
+        ring = 0
+        while True:
+            # o anel "ring" fica a pelo menos (ring - 1) * size do ponto
+            if (ring - 1) * size > best_d:
+                break
+            if 8 * ring > len(cells):
+                # ponto longe de tudo: anéis vazios demais, compara com todos
+                keys = rects
+            else:
+                keys = (i for key in self._ring(cx, cy, ring) for i in cells.get(key, ()))
+            for i in keys:
+                left, top, right, bottom = rects[i]
+                dx = left - x if x < left else (x - right if x > right else 0.0)
+                dy = top - y if y < top else (y - bottom if y > bottom else 0.0)
+                d = math.hypot(dx, dy)
+                # empate: o de id maior (criado depois, fica por cima)
+                if d < best_d or (d == best_d and best is not None and i > best):
+                    best, best_d = i, d
+            if keys is rects:
+                break
+            ring += 1
+        return None if best is None else (best, best_d)
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
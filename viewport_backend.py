@@ -0,0 +1,82 @@
+import os
+import sys
+
+from PySide6.QtCore import Qt, QCoreApplication
+from PySide6.QtGui import QOpenGLContext, QSurfaceFormat
+
+# =========================
+# VIEWPORT BACKEND
+# =========================
+# Onde o CanvasView desenha:
+#
+#   raster           QWidget normal, paint engine de software do Qt (padrão)
+#   opengl           QOpenGLWidget, placa de vídeo
+#   opengl-software  QOpenGLWidget com o Mesa em software (llvmpipe), pra
+#                    máquina sem GPU
+#
+# Escolha com --renderer=<nome> ou INFINITYU_RENDERER=<nome>. Se o OpenGL
+# não funcionar volta pro raster sozinho.
+
+BACKENDS = ("raster", "opengl", "opengl-software")
+DEFAULT_BACKEND = "raster"
+
+# multisample pro antialiasing dos cards no OpenGL
+GL_SAMPLES = 4
+
+_gl_ok = None
+
+
+def requested_backend(argv=None):
+    argv = sys.argv if argv is None else argv
+    name = None
+    for arg in argv[1:]:
+        if arg.startswith("--renderer="):
+            name = arg.split("=", 1)[1]
+    if name is None:
+        name = os.environ.get("INFINITYU_RENDERER", DEFAULT_BACKEND)
+    name = name.strip().lower()
+    if name not in BACKENDS:
+        print(f"renderer '{name}' não existe (opções: {', '.join(BACKENDS)}), usando {DEFAULT_BACKEND}")
+        return DEFAULT_BACKEND
+    return name
+
+
+def prepare_application(backend):
+    # tem que rodar antes do QApplication existir
+    if backend == "raster":
+        return
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    if backend == "opengl-software":
+        QCoreApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+        os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+
+
+def _surface_format():
+    fmt = QSurfaceFormat.defaultFormat()
+    fmt.setSamples(GL_SAMPLES)
+    return fmt
+
+
+def opengl_available():
+    # cria um contexto de teste uma vez só; plataforma sem GL (offscreen,
+    # driver quebrado) dá False
+    global _gl_ok
+    if _gl_ok is None:
+        context = QOpenGLContext()
+        context.setFormat(_surface_format())
+        _gl_ok = bool(context.create())
+    return _gl_ok
+
+
+def make_viewport(backend):
+    # (widget, backend que ficou de verdade); widget None = raster padrão
+    if backend == "raster" or not opengl_available():
+        if backend != "raster":
+            print(f"OpenGL indisponível, usando raster no lugar de {backend}")
+        return None, "raster"
+
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+
+    widget = QOpenGLWidget()
+    widget.setFormat(_surface_format())
+    return widget, backend
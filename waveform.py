@@ -0,0 +1,342 @@
+import os
+import sys
+import wave
+import struct
+import threading
+import hashlib
+from array import array
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QStandardPaths, Signal
+
+from asset_pack import asset_pack, split_ref
+from perf_hud import tracer
+
+# =========================
+# WAVEFORM
+# =========================
+# Picos (mín/máx) do áudio em vários níveis: o nível 0 tem um par por
+# BASE_BLOCK amostras, cada nível seguinte junta LEVEL_FACTOR do anterior.
+# Na hora de desenhar pega o nível que dá ~1 bloco por pixel.
+
+BASE_BLOCK = 256
+LEVEL_FACTOR = 4
+READ_FRAMES = BASE_BLOCK * 4096
+# peaks guardados em memória pelo loader (LRU; card na tela segura o dele)
+PEAKS_MEMORY_BYTES = 64 * 1024 * 1024
+
+_MAGIC = b"IFUPEAK1"
+_HEADER = struct.Struct("<8sIQIII")  # magic, rate, amostras, base, fator, níveis
+
+_np = False
+
+def _numpy():
+    # numpy é opcional (sem ele fica bem mais lento) e só é importado quando
+    # o primeiro áudio aparece, pra não pesar na abertura do app
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+
+class Peaks:
+    def __init__(self, rate, samples, levels, base=BASE_BLOCK, factor=LEVEL_FACTOR):
+        self.rate = rate
+        self.samples = samples
+        self.levels = levels  # [(mins, maxs), ...] do mais fino pro mais grosso
+        self.base = base
+        self.factor = factor
+
+    @property
+    def duration(self):
+        return self.samples / self.rate if self.rate else 0.0
+
+    def nbytes(self):
+        # array("f") ou numpy, os dois têm itemsize
+        return sum(len(a) * a.itemsize for level in self.levels for a in level)
+
+    def columns(self, px):
+        # (mins, maxs) com px colunas, a partir do nível certo
+        np = _numpy()
+        px = max(1, int(px))
+        per_px = self.samples / px
+
+        level = 0
+        block = self.base
+        while level + 1 < len(self.levels) and block * self.factor <= per_px:
+            level += 1
+            block *= self.factor
+
+        mins, maxs = self.levels[level]
+        n = len(mins)
+        if n == 0:
+            return [0.0] * px, [0.0] * px
+
+        if np is not None:
+            edges = (np.arange(px) * n // px).astype(np.intp)
+            return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+        out_min, out_max = [], []
+        for i in range(px):
+            a = i * n // px
+            b = max(a + 1, (i + 1) * n // px)
+            out_min.append(min(mins[a:b]))
+            out_max.append(max(maxs[a:b]))
+        return out_min, out_max
+
+
+# --- decodificação ---
+
+def _to_mono(data, channels, width):
+    # bytes PCM -> amostras float em [-1, 1], média dos canais
+    np = _numpy()
+    if np is not None:
+        if width == 1:
+            s = (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128
+        elif width == 2:
+            s = np.frombuffer(data, "<i2").astype(np.float32) / 32768
+        elif width == 3:
+            b = np.frombuffer(data, np.uint8).reshape(-1, 3).astype(np.int32)
+            v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+            v = np.where(v & 0x800000, v - 0x1000000, v)
+            s = v.astype(np.float32) / 8388608
+        else:
+            s = np.frombuffer(data, "<i4").astype(np.float32) / 2147483648
+        if channels > 1:
+            s = s.reshape(-1, channels).mean(axis=1)
+        return s
+
+    if width == 1:
+        raw = [(b - 128) / 128 for b in data]
+    elif width == 3:
+        raw = [
+            int.from_bytes(data[i:i + 3], "little", signed=True) / 8388608
+            for i in range(0, len(data), 3)
+        ]
+    else:
+        a = array("h" if width == 2 else "i", data)
+        if sys.byteorder == "big":
+            a.byteswap()
+        scale = 32768 if width == 2 else 2147483648
+        raw = [v / scale for v in a]
+    if channels > 1:
+        raw = [sum(raw[i:i + channels]) / channels for i in range(0, len(raw), channels)]
+    return raw
+
+
+def _block_peaks(samples, block):
+    np = _numpy()
+    if np is not None:
+        n = len(samples) // block * block
+        mins = samples[:n].reshape(-1, block).min(axis=1)
+        maxs = samples[:n].reshape(-1, block).max(axis=1)
+        if n < len(samples):
+            mins = np.append(mins, samples[n:].min())
+            maxs = np.append(maxs, samples[n:].max())
+        return mins, maxs
+
+    mins = array("f", (min(samples[i:i + block]) for i in range(0, len(samples), block)))
+    maxs = array("f", (max(samples[i:i + block]) for i in range(0, len(samples), block)))
+    return mins, maxs
+
+
+def build_peaks(source):
+    # source: caminho ou arquivo aberto (áudio de asset pack, ver _PeaksJob)
+    np = _numpy()
+    with wave.open(source, "rb") as w:
+        channels = w.getnchannels()
+        width = w.getsampwidth()
+        rate = w.getframerate()
+        total = 0
+
+        # lê em pedaços pra um áudio de uma hora não ocupar a memória toda
+        chunks_min, chunks_max = [], []
+        while True:
+            data = w.readframes(READ_FRAMES)
+            if not data:
+                break
+            samples = _to_mono(data, channels, width)
+            total += len(samples)
+            mins, maxs = _block_peaks(samples, BASE_BLOCK)
+            chunks_min.append(mins)
+            chunks_max.append(maxs)
+
+    if np is not None:
+        mins = np.concatenate(chunks_min) if chunks_min else np.zeros(0, np.float32)
+        maxs = np.concatenate(chunks_max) if chunks_max else np.zeros(0, np.float32)
+    else:
+        mins, maxs = array("f"), array("f")
+        for a, b in zip(chunks_min, chunks_max):
+            mins.extend(a)
+            maxs.extend(b)
+
+    levels = [(mins, maxs)]
+    while len(levels[-1][0]) > LEVEL_FACTOR:
+        prev_min, prev_max = levels[-1]
+        if np is not None:
+            levels.append((_block_peaks(prev_min, LEVEL_FACTOR)[0], _block_peaks(prev_max, LEVEL_FACTOR)[1]))
+        else:
+            levels.append((
+                array("f", (min(prev_min[i:i + LEVEL_FACTOR]) for i in range(0, len(prev_min), LEVEL_FACTOR))),
+                array("f", (max(prev_max[i:i + LEVEL_FACTOR]) for i in range(0, len(prev_max), LEVEL_FACTOR))),
+            ))
+
+    return Peaks(rate, total, levels)
+
+
+# --- cache em disco ---
+
+def _f32_bytes(values):
+    np = _numpy()
+    if np is not None:
+        return np.asarray(values, dtype="<f4").tobytes()
+    a = array("f", values)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a.tobytes()
+
+
+def _f32_from(data):
+    np = _numpy()
+    if np is not None:
+        return np.frombuffer(data, dtype="<f4").astype(np.float32)
+    a = array("f")
+    a.frombytes(data)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+
+def save_peaks(peaks, file):
+    tmp = f"{file}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, peaks.rate, peaks.samples, peaks.base, peaks.factor, len(peaks.levels)))
+        for mins, maxs in peaks.levels:
+            f.write(struct.pack("<Q", len(mins)))
+            f.write(_f32_bytes(mins))
+            f.write(_f32_bytes(maxs))
+    os.replace(tmp, file)
+
+
+def load_peaks(file):
+    with open(file, "rb") as f:
+        magic, rate, samples, base, factor, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            return None
+        levels = []
+        for _ in range(count):
+            (n,) = struct.unpack("<Q", f.read(8))
+            levels.append((_f32_from(f.read(n * 4)), _f32_from(f.read(n * 4))))
+    return Peaks(rate, samples, levels, base, factor)
+
+
+def default_cache_dir():
+    base = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    return os.path.join(base or os.path.expanduser("~/.cache/infinityu"), "waveforms")
+
+
+def project_cache_dir(project_path):
+    # cache fica do lado do projeto: board.infinityu -> board.peaks/
+    return os.path.splitext(project_path)[0] + ".peaks"
+
+
+class _PeaksJob(QRunnable):
+    def __init__(self, loader, path, cache_dir):
+        super().__init__()
+        self.loader = loader
+        self.path = path
+        self.cache_dir = cache_dir
+
+    def run(self):
+        try:
+            with tracer.span("load peaks", "audio", {"path": self.path}):
+                peaks = peaks_for(self.path, self.cache_dir)
+        except Exception as e:
+            # qualquer erro (wav cortado, reshape do numpy, pack fechando)
+            # ainda tem que voltar: sem o emit o path fica em _waiters pra
+            # sempre e nenhum pedido novo desse arquivo sai
+            print(f"não deu pra ler o áudio {self.path}: {e!r}")
+            peaks = None
+
+        self.loader._finished.emit(self.path, peaks)
+
+
+def peaks_for(path, cache_dir):
+    # Peaks do cache em disco ou calculados (e guardados). Qualquer thread
+    ref = split_ref(path)
+    if ref is not None:
+        # áudio do asset pack: lido pelo mmap, conteúdo nunca muda
+        raw = f"asset|{ref[0]}"
+    else:
+        st = os.stat(path)
+        raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+    file = os.path.join(cache_dir, hashlib.sha1(raw.encode("utf-8")).hexdigest() + ".peaks")
+
+    peaks = load_peaks(file) if os.path.exists(file) else None
+    if peaks is None:
+        source = path
+        if ref is not None:
+            pack = asset_pack()
+            source = pack.reader(ref[0]) if pack is not None else None
+            if source is None:
+                raise OSError("asset não está no pack do projeto")
+        peaks = build_peaks(source)
+        os.makedirs(cache_dir, exist_ok=True)
+        save_peaks(peaks, file)
+    return peaks
+
+
+class WaveformLoader(QObject):
+    loaded = Signal(str, object)
+    _finished = Signal(str, object)
+
+    def __init__(self, cache_dir=None, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.pool = QThreadPool.globalInstance()
+
+        self._peaks = OrderedDict()
+        self._peaks_bytes = 0
+        self._waiters = {}
+
+        self._finished.connect(self._on_finished)
+
+    def request(self, path, callback=None):
+        # callback(path, peaks) na thread da interface (peaks None se falhou)
+        peaks = self._peaks.get(path)
+        if peaks is not None:
+            self._peaks.move_to_end(path)
+            if callback is not None:
+                callback(path, peaks)
+            return
+
+        first = path not in self._waiters
+        waiters = self._waiters.setdefault(path, [])
+        if callback is not None:
+            waiters.append(callback)
+        if first:
+            self.pool.start(_PeaksJob(self, path, self.cache_dir))
+
+    def _on_finished(self, path, peaks):
+        if peaks is not None:
+            self._peaks[path] = peaks
+            self._peaks_bytes += peaks.nbytes()
+            while self._peaks_bytes > PEAKS_MEMORY_BYTES and len(self._peaks) > 1:
+                _, old = self._peaks.popitem(last=False)
+                self._peaks_bytes -= old.nbytes()
+        for callback in self._waiters.pop(path, []):
+            callback(path, peaks)
+        self.loaded.emit(path, peaks)
+
+
+_loader = None
+
+def waveform_loader():
+    global _loader
+    if _loader is None:
+        _loader = WaveformLoader()
+    return _loader